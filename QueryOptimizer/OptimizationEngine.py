@@ -213,6 +213,8 @@ class OptimizationEngine:
         if len(list_nodes["JOIN"]) > 0:
             for node in list_nodes["SELECT"] :
                 self.QueryOptimizer.pushing_projection(node)
+        elif len(list_nodes["SELECT"]) > 0:
+            self.QueryOptimizer.determine_scan_type(list_nodes["SELECT"][0], list_nodes["WHERE"], database_name, self.get_stats)
 
     def get_cost(self, query: ParsedQuery, database_name: str) -> int:
         # implementasi sementara hanya menghitung size cost
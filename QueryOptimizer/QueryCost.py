@@ -3,6 +3,7 @@ from math import prod
 from time import sleep
 import re
 from StorageManager.classes import *
+from StorageManager.TableStats import histogram_fraction
 from .QueryTree import *
 
 class QueryCost:
@@ -22,6 +23,25 @@ class QueryCost:
     def __format_name(string: str) -> str:
         return string.strip().lower()
     
+    # split "table.attribute <op> operand" into (attribute, op, operand)
+    # operators with "=" in them are matched first so ">=" is not mistaken for "="
+    @staticmethod
+    def __parse_condition(condition: str) -> tuple[str, str, str]:
+        match = re.match(r"^\s*(\S+?)\s*(<>|>=|<=|=|<|>)\s*(.+?)\s*$", condition)
+        if match is None:
+            return None, None, None
+        attribute = QueryCost.__format_name(match.group(1).split(".")[-1])
+        return attribute, match.group(2), match.group(3)
+
+    # convert a constant from the query text to the value stored in the table
+    @staticmethod
+    def __parse_operand(operand: str) -> Union[int, float, str]:
+        if re.match(r"^-?\d+$", operand):
+            return int(operand)
+        if re.match(r"^-?\d+\.\d+$", operand):
+            return float(operand)
+        return operand.strip("'\"")
+
     @staticmethod
     def __is_right_side_constant(condition: str) -> bool:
         right_side = condition.split(" = ")[1]
@@ -49,16 +69,8 @@ class QueryCost:
             statistic = self.__get_size_cost(query_tree.childs[0])
             if "OR" in query_tree.val:
                 result = statistic
-            elif "=" in query_tree.val:
-                attribute = query_tree.val.split(" = ")[0].split(".")[1]
-                attribute = QueryCost.__format_name(attribute)
-                result = self.__where_equals(statistic, attribute)
-            elif "<>" in query_tree.val:
-                attribute = query_tree.val.split(" <> ")[0].split(".")[1]
-                attribute = QueryCost.__format_name(attribute)
-                result = self.__where_not_equals(statistic, attribute)
             else:
-                result = self.__where_comparison(statistic)
+                result = self.__where(statistic, query_tree.val)
         
         elif query_tree.type == "JOIN":
             statistic1 = self.__get_size_cost(query_tree.childs[0])
@@ -123,6 +135,16 @@ class QueryCost:
         result: Statistic = Statistic(n_r=n_r_result, V_a_r=V_a_r_result, b_r=None, l_r=None, f_r=None)
         return result
 
+    def __where(self, statistic: Statistic, condition: str) -> Statistic:
+        attribute, operator, operand = QueryCost.__parse_condition(condition)
+        if operator == "=":
+            return self.__where_equals(statistic, attribute)
+        if operator == "<>":
+            return self.__where_not_equals(statistic, attribute, QueryCost.__parse_operand(operand))
+        if operator is None:
+            return self.__where_comparison(statistic)
+        return self.__where_comparison(statistic, attribute, operator, QueryCost.__parse_operand(operand))
+
     def __where_equals(self, statistic: Statistic, attribute: str) -> Statistic:
         if (statistic.n_r == 0) or (0 in statistic.V_a_r.values()):
             V_a_r_result = {}
@@ -141,7 +163,8 @@ class QueryCost:
         result: Statistic = Statistic(n_r=n_r_result, V_a_r=V_a_r_result, b_r=None, l_r=None, f_r=None)
         return result
 
-    def __where_not_equals(self, statistic: Statistic, attribute: str) -> Statistic:
+    # with an MCV list (from ANALYZE) the excluded fraction is known exactly for common values
+    def __where_not_equals(self, statistic: Statistic, attribute: str, operand = None) -> Statistic:
         if (statistic.n_r == 0) or (0 in statistic.V_a_r.values()):
             V_a_r_result = {}
             for attribute in statistic.V_a_r:
@@ -150,7 +173,11 @@ class QueryCost:
             result: Statistic = Statistic(n_r=0, V_a_r=V_a_r_result, b_r=None, l_r=None, f_r=None)
             return result
         
-        n_r_result = statistic.n_r - self.__where_equals(statistic, attribute).n_r
+        frequency = dict(statistic.col_mcv.get(attribute, [])).get(operand)
+        if frequency is not None:
+            n_r_result = statistic.n_r - round(statistic.n_r * frequency)
+        else:
+            n_r_result = statistic.n_r - self.__where_equals(statistic, attribute).n_r
         
         V_a_r_result = {}
         for attribute in statistic.V_a_r:
@@ -159,7 +186,8 @@ class QueryCost:
         result: Statistic = Statistic(n_r=n_r_result, V_a_r=V_a_r_result, b_r=None, l_r=None, f_r=None)
         return result
 
-    def __where_comparison(self, statistic: Statistic) -> Statistic:
+    # range selectivity from the equi-depth histogram (from ANALYZE), half of the rows without one
+    def __where_comparison(self, statistic: Statistic, attribute: str = None, operator: str = None, operand = None) -> Statistic:
         if (statistic.n_r == 0) or (0 in statistic.V_a_r.values()):
             V_a_r_result = {}
             for attribute in statistic.V_a_r:
@@ -168,7 +196,18 @@ class QueryCost:
             result: Statistic = Statistic(n_r=0, V_a_r=V_a_r_result, b_r=None, l_r=None, f_r=None)
             return result
         
-        n_r_result = statistic.n_r // 2
+        fraction = None
+        histogram = statistic.col_histogram.get(attribute)
+        if histogram:
+            if operator in ("<", "<="):
+                fraction = histogram_fraction(histogram, operand, inclusive=(operator == "<="))
+            elif operator in (">", ">="):
+                below = histogram_fraction(histogram, operand, inclusive=(operator == ">"))
+                fraction = None if below is None else 1 - below
+        if fraction is None:
+            n_r_result = statistic.n_r // 2
+        else:
+            n_r_result = round(statistic.n_r * fraction)
         
         V_a_r_result = {}
         for attribute in statistic.V_a_r:
@@ -228,16 +267,8 @@ class QueryCost:
         
         if "OR" in condition:
             result_where = result_cross
-        elif "=" in condition:
-            attribute = condition.split(" = ")[0].split(".")[1]
-            attribute = QueryCost.__format_name(attribute)
-            result_where = self.__where_equals(result_cross, attribute)
-        elif "<>" in condition:
-            attribute = condition.split(" <> ")[0].split(".")[1]
-            attribute = QueryCost.__format_name(attribute)
-            result_where = self.__where_not_equals(result_cross, attribute)
         else:
-            result_where = self.__where_comparison(result_cross)
+            result_where = self.__where(result_cross, condition)
 
         return result_where
     
@@ -271,35 +302,65 @@ class QueryCost:
     # Time Cost
     # Calculate the time cost of the query tree
     # Time Cost dengan waktu block transfer = waktu seeks = 1
+
+    # Each table is read once, by the cheapest scan among the WHERE nodes right above it (their method is set by the optimizer)
+    def calculate_time_cost(self, query_tree: QueryTree) -> int:
+        if query_tree.type == "TABLE":
+            table = QueryCost.__format_name(query_tree.val)
+            costs = [self.linearScan(table)]
+            node = query_tree.parent
+            while node is not None and node.type == "WHERE":
+                costs.append(self.scanCost(table, node))
+                node = node.parent
+            return min(costs)
+        return sum(self.calculate_time_cost(child) for child in query_tree.childs)
+
+    def scanCost(self, table: str, node: QueryTree):
+        attribute, _, _ = QueryCost.__parse_condition(node.val)
+        if attribute is None:
+            return self.linearScan(table)
+        if node.method == "INDEX ONLY SCAN":
+            return self.indexOnlyScan(table, attribute)
+        if node.method == "INDEX SCAN":
+            return self.indexScanKey(table, attribute)
+        return self.linearScan(table)
     
     def linearScan(self, table: str):
-        statistics = self.__storage_engine.get_stats(database_name=self.__database, table_name=table)
+        statistics = self.__get_stats(self.__database, table)
         return statistics.b_r + 1
-    
-    #Asumsi tinggi pohon diketahui
-    def indexScanKey(self, table: str, levelPohon): 
-        statistics = self.__storage_engine.get_stats(database_name=self.__database, table_name=table)
-        return 2*(levelPohon + 1)
-    
-    #Asumsi tinggi pohon diketahui
-    def indexScanNonkey(self, table: str, levelPohon): 
-        statistics = self.__storage_engine.get_stats(database_name=self.__database, table_name=table)
-        return 2*(levelPohon) + statistics.b_r + 1
+
+    # Tinggi pohon diambil dari statistik (col_bplus_tree_level), hash index dianggap satu level
+    def __tree_height(self, statistics: Statistic, attribute: str) -> int:
+        return (statistics.col_bplus_tree_level or {}).get(attribute.strip().split(".")[-1], 1)
+
+    def indexScanKey(self, table: str, attribute: str):
+        statistics = self.__get_stats(self.__database, table)
+        return 2*(self.__tree_height(statistics, attribute) + 1)
+
+    def indexScanNonkey(self, table: str, attribute: str):
+        statistics = self.__get_stats(self.__database, table)
+        return 2*(self.__tree_height(statistics, attribute)) + statistics.b_r + 1
+
+    # Index-only scan: every column the query reads is in the B+ tree key or its INCLUDE columns (covering index),
+    # so only the tree is read and no table block is transferred
+    def indexOnlyScan(self, table: str, attribute: str):
+        statistics = self.__get_stats(self.__database, table)
+        return 2*(self.__tree_height(statistics, attribute))
     
     def nestedLoopJoin(self, table1: str, table2: str) :
-        statistics1 = self.__storage_engine.get_stats(database_name=self.__database, table_name=table1)
-        statistics2 = self.__storage_engine.get_stats(database_name=self.__database, table_name=table2)
+        statistics1 = self.__get_stats(self.__database, table1)
+        statistics2 = self.__get_stats(self.__database, table2)
         return statistics1.n_r * statistics2.b_r +statistics1.b_r + statistics1.n_r +statistics1.b_r
         
     def blockNestedLoopJoin(self, table1: str, table2: str) :
-        statistics1 = self.__storage_engine.get_stats(database_name=self.__database, table_name=table1)
-        statistics2 = self.__storage_engine.get_stats(database_name=self.__database, table_name=table2)
+        statistics1 = self.__get_stats(self.__database, table1)
+        statistics2 = self.__get_stats(self.__database, table2)
         return statistics1.b_r * statistics2.b_r + statistics1.b_r + 2*statistics1.b_r
     
     # Asumsi kedua tabel sudah di-sort dan block buffer berukuran 1
     def mergeJoin(self, table1: str, table2: str) :
-        statistics1 = self.__storage_engine.get_stats(database_name=self.__database, table_name=table1)
-        statistics2 = self.__storage_engine.get_stats(database_name=self.__database, table_name=table2)
+        statistics1 = self.__get_stats(self.__database, table1)
+        statistics2 = self.__get_stats(self.__database, table2)
         return 2*(statistics1.b_r * statistics2.b_r)
     
 
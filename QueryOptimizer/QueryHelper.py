@@ -137,10 +137,22 @@ class QueryHelper:
             return table_name, column_name
         return None, None
     
+    @staticmethod
+    def extract_equal_columns(conditions: list[str]) -> dict[str, set[str]]:
+        # columns compared to a constant with "=" in AND-ed conditions, per table
+        equal_columns = {}
+        for condition in conditions:
+            match = re.match(r'^\s*([a-zA-Z0-9_]+)\.([a-zA-Z0-9_]+)\s*=\s*(-?\d+(\.\d+)?|\'[^\']*\'|"[^"]*")\s*$', condition)
+            if match:
+                equal_columns.setdefault(match.group(1), set()).add(match.group(2))
+        return equal_columns
+
     @staticmethod
     def parse_where_clause(where_clause: str, current_node: QueryTree, database_name: str) -> QueryTree:
         storage_engine = StorageEngine()
         parsed_result = re.split(r'\sAND\s', where_clause)
+        # a condition can also be answered by a composite index together with the other AND-ed equalities
+        equal_columns = QueryHelper.extract_equal_columns([parse for parse in parsed_result if "OR" not in parse])
 
         for parse in parsed_result:
             if "OR" in parse:
@@ -151,6 +163,7 @@ class QueryHelper:
                     # print(table_name, column)
                     try:
                         if (storage_engine.is_hash_index_in_block(database_name, table_name, column) or 
+                            storage_engine.is_composite_index_usable(database_name, table_name, column, set()) or
                             storage_engine.is_bplus_index_in_block(database_name, table_name, column)):
                             method = "INDEX SCAN"
                     except Exception as e:
@@ -168,6 +181,7 @@ class QueryHelper:
                 # print(table_name, column)
                 try:
                     if (storage_engine.is_hash_index_in_block(database_name, table_name, column) or 
+                        storage_engine.is_composite_index_usable(database_name, table_name, column, equal_columns.get(table_name, set())) or
                         storage_engine.is_bplus_index_in_block(database_name, table_name, column)):
                         method = "INDEX SCAN"
                 except Exception as e:
@@ -368,6 +368,40 @@ class QueryOptimizer:
         tables_where = [item.split(".")[0] for item in node.val.split(" = ")]
         return all(table_where in tables for table_where in tables_where)
 
+    def determine_scan_type(self, node_select: QueryTree, node_where: List[QueryTree], database_name: str, get_stats: Callable[[str, str, int], Union[Statistic, Exception]]):
+        """Mark the WHERE nodes as "INDEX ONLY SCAN" when a B+ tree covers the single-table query."""
+        if node_select is None or not node_where or not isinstance(node_select.val, list):
+            return
+        # ORed conditions can only be answered from the tree when there is a single one
+        if any(len(re.split(r"""\sOR\s(?=(?:[^'"]|'[^']*'|"[^"]*")*$)""", node.val)) > 1 for node in node_where):
+            return
+        selected = [attribute.split(".") for attribute in node_select.val]
+        if any(len(parts) != 2 or parts[1] == "*" for parts in selected):
+            return
+        compared = set()
+        filtered = set()
+        for node in node_where:
+            for table, column in (attribute.split(".") for attribute in QueryHelper.get_attributes_regex(node.val) if "." in attribute):
+                filtered.add((table, column))
+            match = re.match(r'^\s*(\w+)\.(\w+)\s*(=|>=|<=|>|<)\s*(-?\d+(\.\d+)?|\'[^\']*\'|"[^"]*")\s*$', node.val)
+            if match:
+                compared.add((match.group(1), match.group(2)))
+        tables = {table for table, _ in selected} | {table for table, _ in filtered}
+        if len(tables) != 1:
+            return
+        table = tables.pop()
+        needed = {column for _, column in selected} | {column for _, column in filtered}
+        compared = {column for _, column in compared}
+        try:
+            stats = get_stats(database_name, table)
+        except Exception:
+            return
+        if isinstance(stats, Exception):
+            return
+        if StorageEngine.covering_index(stats.col_index_include, needed, compared) is not None:
+            for node in node_where:
+                node.method = "INDEX ONLY SCAN"
+
     def determine_join_type(self,node_join: List[QueryTree], database_name: str, get_stats: Callable[[str, str, int], Union[Statistic, Exception]]):
         for node in node_join:
             if node.type == "JOIN":
@@ -393,11 +427,11 @@ class QueryOptimizer:
                         stats = get_stats(database_name,inner_table)
                         print(stats.col_index)
                         if attribute in stats.col_index:
-                            if stats.col_index[0] == 1:
+                            if stats.col_index[attribute][0] == 1:
                                 found = True
                                 node.method = "BPLUS JOIN"
                                 break
-                            if stats.col_index[1] == 1:
+                            if stats.col_index[attribute][1] == 1:
                                 found = True
                                 node.method = "HASH JOIN"
                                 break
@@ -407,10 +441,10 @@ class QueryOptimizer:
                     for outer_table in defined_outer:
                         stats = get_stats(database_name,outer_table)
                         if attribute in stats.col_index:
-                            if stats.col_index[0] == 1:
+                            if stats.col_index[attribute][0] == 1:
                                 node.method = "BPLUS JOIN"
                                 self.perform_commutative(node)
                                 break
-                            if stats.col_index[1] == 1:
+                            if stats.col_index[attribute][1] == 1:
                                 node.method = "HASH JOIN"
                                 break
\ No newline at end of file
@@ -13,7 +13,7 @@ class QueryParser:
     # Valid Keywords
     keywords = [
         'SELECT', 'DELETE', 'FROM', 'WHERE', 'JOIN', 'NATURAL', 'ON', 'ORDER', 
-        'BY', 'LIMIT', 'UPDATE', 'SET', 'AS', 'DESC' , 'ASC', 'CREATE','INDEX','USING'
+        'BY', 'LIMIT', 'UPDATE', 'SET', 'AS', 'DESC' , 'ASC', 'CREATE','INDEX','USING','INCLUDE'
     ]
     
     # Main Components
@@ -222,4 +222,8 @@ class QueryValidator:
                 
             elif key == "INDEX":
                 splitted = components_values[key].split()
-                self.validate_attribute(splitted[4],database_name,get_stats,table_arr)
+                # every column between the parentheses (a composite index lists several separated by commas),
+                # followed by the columns of an optional INCLUDE ( ... ) list
+                for column in splitted[4:]:
+                    if column not in ("(", ")", ",", "INCLUDE"):
+                        self.validate_attribute(column,database_name,get_stats,table_arr)
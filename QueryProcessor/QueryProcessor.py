@@ -1,11 +1,13 @@
 import signal
 import re
+from itertools import islice
 
 from FailureRecovery.failure_recovery_log_entry import LogEntry
 from ConcurrencyControlManager.ConcurrencyControlManager import *
 from QueryOptimizer.OptimizationEngine import *
 from StorageManager.classes import *
-from typing import Tuple
+from StorageManager.Record import Record, Schema
+from typing import Tuple, Iterable, Iterator, Optional, Union
 from client_class import Client
 
 import FailureRecovery.failure_recovery as FailureRecovery
@@ -67,6 +69,15 @@ class QueryProcessor:
                     client_state["on_begin"] = False
                     client_state["transactionId"] = None
 
+        elif(query.upper().rstrip(";").split()[:1] == ["ANALYZE"]):
+                try:
+                    table_name = query.rstrip(";").split()[1:2]
+                    analyzed = self.sm.analyze(self.db_name, table_name[0] if table_name else None)
+                    self.sm.save()
+                    return f"Analyzed {len(analyzed)} table(s): {', '.join(analyzed)}"
+                except Exception as e:
+                    return str(e)
+
         else:
             retry = True
             while retry:
@@ -117,7 +128,7 @@ class QueryProcessor:
 
                             transaction_id = client_state["transactionId"]
                             print("select", transaction_id)
-                            result = self.evaluateSelectTree(self.parsedQuery.query_tree,[],"", transaction_id)
+                            result = self.evaluateSelectTree(self.parsedQuery.query_tree,[],[], transaction_id)
                             ret_val = self.printResult(result)
                             print(f"Read {len(result)} row(s).")
                             return ret_val                            
@@ -133,7 +144,7 @@ class QueryProcessor:
                         try:
                             index = self.ParsedQueryToSetIndex()
                             # TODO: nama index ada di index[3], belum tau mau dipake di mana
-                            self.sm.set_index(self.db_name, index[0], index[1], self.current_transactionId, index[2])
+                            self.sm.set_index(self.db_name, index[0], index[1], self.current_transactionId, index[2], order=index[4], include=index[5])
                         except Exception as e:
                             print(e)
                     
@@ -150,40 +161,72 @@ class QueryProcessor:
                         client_state["on_begin"] = True
     
 
-    def  evaluateSelectTree(self, tree: QueryTree, select: list[str], where: str, transaction_id: int) -> list[dict]:
+    def  evaluateSelectTree(self, tree: QueryTree, select: list[str], where: list[str], transaction_id: int) -> list[dict]:
         """Evaluate the select tree and return the result.
 
         Args:
             tree (QueryTree): The tree to evaluate.
             select (list[str]): The columns to select.
-            where (str): The where clause.
+            where (list[str]): The AND-ed where conditions, each a single condition or an OR group.
             transaction_id (int): The transaction ID.
 
         Returns:
             list[dict]: The result of the evaluation.
         """
+        return list(self.iterSelectTree(tree, select, where, transaction_id))
+
+    def iterSelectTree(self, tree: QueryTree, select: list[str], where: list[str], transaction_id: int) -> Iterator[Record]:
+        """Evaluate the select tree lazily, yielding one row at a time.
+
+        Table rows are read through storage cursors, so a LIMIT stops the
+        scan as soon as enough rows have been produced. Only ORDER BY and
+        the inner side of a join hold their input in memory.
+
+        Args:
+            tree (QueryTree): The tree to evaluate.
+            select (list[str]): The columns to select.
+            where (list[str]): The AND-ed where conditions, each a single condition or an OR group.
+            transaction_id (int): The transaction ID.
+
+        Yields:
+            Record: The rows of the result.
+        """
         if not tree.childs: # leaf node
-            condition = []
-            if len(where) > 0:
-                condition = self.__makeCondition(where)
+            groups = [self.__makeCondition(part) for part in where]
             select = self.removeTablename(select)
-            dataRetriev = DataRetrieval([tree.val], select, condition)
-            
-            temp = self.transformData(tree.val,self.__getData(dataRetriev, transaction_id))
-            
-            return temp
+            or_groups = [group for group in groups if len(group) > 1]
+            if len(groups) == 1 and or_groups:
+                # a single OR group is read as one disjunction
+                dataRetriev = DataRetrieval([tree.val], select, or_groups[0], all_of=False)
+                or_groups = []
+            else:
+                # the single conditions are AND-ed in one pass, so the storage engine can answer them with a composite index;
+                # OR groups next to them are checked on the rows, which then need every column
+                condition = [group[0] for group in groups if len(group) == 1]
+                dataRetriev = DataRetrieval([tree.val], [] if or_groups else select, condition, all_of=True)
+
+            with self.__openCursor(dataRetriev, transaction_id) as cursor:
+                for row in cursor:
+                    if or_groups:
+                        if not all(self.__matchesAny(row, group) for group in or_groups):
+                            continue
+                        if select:
+                            if not isinstance(row, Record):
+                                row = Schema.of(row.keys()).record(row)
+                            row = row.project(select)
+                    yield self.addTablename(tree.val, row)
         else: # non-leaf node
             if tree.type == "JOIN" or tree.type == "NATURAL JOIN":
                 temp = []
                 if tree.type == "JOIN":
                     temp = self.__joinOn(
-                        self.evaluateSelectTree(tree.childs[0], [], [], transaction_id),
+                        self.iterSelectTree(tree.childs[0], [], [], transaction_id),
                         self.evaluateSelectTree(tree.childs[1], [], [], transaction_id),
                         tree.val
                     )
                 elif tree.type == "NATURAL JOIN":
                     temp = self.__naturalJoin(
-                        self.evaluateSelectTree(tree.childs[0], [], [], transaction_id),
+                        self.iterSelectTree(tree.childs[0], [], [], transaction_id),
                         self.evaluateSelectTree(tree.childs[1], [], [], transaction_id),
                         tree.val
                         )
@@ -194,26 +237,33 @@ class QueryProcessor:
                     temp = self.__filterSelect(temp, select)
                 elif len(where) > 0:
                     temp = self.__filterWhere(temp, where)
-                return temp
+                yield from temp
             elif tree.type == "ORDER BY":
                 parse = tree.val.split()
                 order_by_column = parse[0]
                 is_asc = parse[1] == "ASC"
-                return self.__orderBy(
-                    self.evaluateSelectTree(tree.childs[0], select, where, transaction_id),
+                yield from self.__orderBy(
+                    self.iterSelectTree(tree.childs[0], select, where, transaction_id),
                     order_by_column,
                     is_asc
                 )
             elif tree.type == "LIMIT":
                 limit = int(tree.val)
-                return self.evaluateSelectTree(tree.childs[0], select, where, transaction_id)[:limit]
+                rows = self.iterSelectTree(tree.childs[0], select, where, transaction_id)
+                try:
+                    yield from islice(rows, limit)
+                finally:
+                    # stop the child's scan and release its cursor right away
+                    rows.close()
             else:
                 if tree.type == "SELECT":
                     select = tree.val
                 elif tree.type == "WHERE":
-                    where = tree.val
+                    # consecutive WHERE nodes are AND-ed, an OR group stays one of the conjuncts
+                    where = list(where) + self.splitWhere(tree.val, "AND")
                 for child in tree.childs:
-                    return self.evaluateSelectTree(child, select, where, transaction_id)
+                    yield from self.iterSelectTree(child, select, where, transaction_id)
+                    return
     
     def removeTablenameCond(self, conds: list[Condition]) -> None:
         """Remove the table name from the column in the conditions.
@@ -239,44 +289,51 @@ class QueryProcessor:
             result.append(col.split(".")[1])
         return result
     
-    def addTablename(self, tablename: str, row: map) -> map:
+    def addTablename(self, tablename: str, row: Record) -> Record:
         """Add the table name to the column in the row.
 
+        Only the row's schema is renamed; the values tuple is shared, not copied.
+
         Args:
             tablename (str): The table name to add.
-            row (map): The row to add the table name to.
+            row (Record): The row to add the table name to.
 
         Returns:
-            map: The row with the table name added.
+            Record: The row with the table name added.
         """
-        return {f"{tablename}.{key}": value for key, value in row.items()}
+        if not isinstance(row, Record):
+            row = Schema.of(row.keys()).record(row)
+        return row.prefixed(f"{tablename}.")
     
-    def transformData(self, tablename: str, data: list[map]) -> list[map]:
+    def transformData(self, tablename: str, data: list[Record]) -> list[Record]:
         """Transform the data by adding the table name to the column.
 
         Args:
             tablename (str): The table name to add.
-            data (list[map]): The data to transform.
+            data (list[Record]): The data to transform.
 
         Returns:
-            list[map]: The transformed data.
+            list[Record]: The transformed data.
         """
         result = []
         for row in data:
             result.append(self.addTablename(tablename,row))
         return result
     
-    def __filterSelect(self, data: List[dict], select: list[str]) -> List[dict]:
+    def __filterSelect(self, data: Iterable[Record], select: list[str]) -> Iterator[Record]:
         """Filter the data by selecting only the specified columns.
 
+        Columns keep the row's own order; the projection is an index selection
+        cached on the row schema.
+
         Args:
-            data (List[dict]): The data to filter.
+            data (Iterable[Record]): The data to filter.
             select (list[str]): The columns to select.
 
         Returns:
-            List[dict]: The filtered data.
+            Iterator[Record]: The filtered data, produced lazily.
         """
-        return [{key: value for key, value in row.items() if key in select} for row in data]
+        return (row.project(select, keep_order=True) for row in data)
     
     def __evalWhere(self, row: map, conds: list[Condition]) -> bool:
         """Evaluate the where clause.
@@ -317,23 +374,53 @@ class QueryProcessor:
                     return True
         return False
     
-    def __filterWhere(self,data: list[map], where: str) -> list[map]:
+    def __filterWhere(self,data: Iterable[map], where: list[str]) -> Iterator[map]:
         """Filter the data by the where clause.
 
         Args:
-            data (list[map]): The data to filter.
-            where (str): The where clause.
+            data (Iterable[map]): The data to filter.
+            where (list[str]): The AND-ed where conditions, each a single condition or an OR group.
 
         Returns:
-            list[map]: The filtered data.
+            Iterator[map]: The filtered data, produced lazily.
         """
-        result = []
-        cond = self.__makeCondition(where)
-        for row in data:
-            if self.__evalWhere(row,cond):
-                result.append(row)
-        return result
+        conds = [self.__makeCondition(part) for part in where]
+        return (row for row in data if all(self.__evalWhere(row, cond) for cond in conds))
     
+    @staticmethod
+    def __matchesAny(row: map, conds: list[Condition]) -> bool:
+        """Check a row against an OR group of conditions on constants.
+
+        Args:
+            row (map): The row to check.
+            conds (list[Condition]): The ORed conditions.
+
+        Returns:
+            bool: True if the row satisfies at least one condition, a NULL value satisfies none.
+        """
+        return any(row[cond.column] is not None and cond.evaluate(row[cond.column]) for cond in conds)
+
+    @staticmethod
+    def splitWhere(where: str, keyword: str) -> list[str]:
+        """Split a where clause on the AND or OR keyword, leaving quoted literals intact.
+
+        Args:
+            where (str): The where clause.
+            keyword (str): "AND" or "OR".
+
+        Returns:
+            list[str]: The parts of the clause.
+        """
+        parts = [""]
+        for i, token in enumerate(re.split(r"('[^']*'|\"[^\"]*\")", where)):
+            if i % 2:  # quoted literal
+                parts[-1] += token
+                continue
+            pieces = re.split(rf"\s{keyword}\s", token)
+            parts[-1] += pieces[0]
+            parts.extend(pieces[1:])
+        return [part.strip() for part in parts]
+
     def __makeCondition(self, where: str) -> List[Condition]:
         """Make the conditions from the where clause.
 
@@ -343,7 +430,7 @@ class QueryProcessor:
         Returns:
             List[Condition]: The conditions.
         """  
-        eqs = where.split("OR")
+        eqs = self.splitWhere(where, "OR")
         cond = [] 
         for eq in eqs:
             number_pattern = r"^-?\d+(\.\d+)?$"
@@ -440,22 +527,30 @@ class QueryProcessor:
         return data_deletion
 
 
-    def ParsedQueryToSetIndex(self) -> Tuple[str, str, str, str]:
-        """Convert the parsed query to a tuple containing the index name, table, column, and index type.
+    def ParsedQueryToSetIndex(self) -> Tuple[str, Union[str, Tuple[str, ...]], str, str, Optional[int], Tuple[str, ...]]:
+        """Convert the parsed query to a tuple containing the index name, table, column, index type, B+ tree order, and included columns.
+
+        The order is given as `USING bplus(<order>)` and is None when the storage engine should pick it.
+        `ON table ( a , b )` creates a composite index and gives its columns as a tuple, in order.
+        `INCLUDE ( c , d )` makes a covering B+ tree that also stores those columns in its leaves; it is empty when omitted.
 
         Returns:
-            Tuple[str, str, str, str]: The index name, table, column, and index type.
+            Tuple[str, Union[str, Tuple[str, ...]], str, str, Optional[int], Tuple[str, ...]]: The table, column(s), index type, index name, order, and included columns.
         """
-        # Retreive index_name, table, and column
+        # Retreive index_name, table, column(s), and the optional included columns
         main_query = self.parsedQuery.query_tree.childs[0].childs[0].val
-        pattern = r"(\w+)\sON\s(\w+)\s\(\s(\w+)\s\)"
+        pattern = r"(\w+)\sON\s(\w+)\s\(\s(\w+(?:\s*,\s*\w+)*)\s\)(?:\sINCLUDE\s\(\s(\w+(?:\s*,\s*\w+)*)\s\))?"
         match = re.match(pattern, main_query)
         if (match):
-            nama_index, table, column = match.groups()
+            nama_index, table, columns, included = match.groups()
+            columns = tuple(column.strip() for column in columns.split(","))
+            column = columns[0] if len(columns) == 1 else columns
+            include = tuple(column.strip() for column in included.split(",")) if included else ()
 
-        # Retreive index_type
-        index_type = self.parsedQuery.query_tree.childs[0].childs[0].childs[0].val
-        return table, column, index_type, nama_index
+        # Retreive index_type and the optional order
+        using = self.parsedQuery.query_tree.childs[0].childs[0].childs[0].val
+        index_type, order = re.match(r"(\w+)\s*(?:\(\s*(\d+)\s*\))?", using).groups()
+        return table, column, index_type, nama_index, int(order) if order else None, include
 
     def printResult(self, data:list[map]) -> str:
         """Print the result of the query.
@@ -528,6 +623,8 @@ class QueryProcessor:
         undo_list = self.rm.write_log_entry(transaction_id, "ABORT", None, None, None)
         print (undo_list)
 
+        # Drop the transaction's uncommitted blocks, indexes and index operations
+        self.sm.discard_buffer(transaction_id)
 
         # Retrieve undo instructions from FailureRecovery
         for instruction in undo_list['undo']:
@@ -579,8 +676,8 @@ class QueryProcessor:
         primary_key_value = obj.get('primary_key_value')
         return db, table, column, primary_key, primary_key_value    
     
-    def __getData(self, data_retrieval: DataRetrieval, transaction_id: int) -> list[dict]|Exception:
-        """Get the data from the storage manager.
+    def __openCursor(self, data_retrieval: DataRetrieval, transaction_id: int) -> Cursor:
+        """Open a storage cursor over the data.
 
         Args:
             data_retrieval (DataRetrieval): The data retrieval object.
@@ -590,15 +687,18 @@ class QueryProcessor:
             Exception: If the data retrieval fails.
 
         Returns:
-            list[dict]|Exception: The data or an exception.
+            Cursor: The cursor, which the caller must close.
         """
-        data = self.sm.read_block(data_retrieval, self.db_name, transaction_id)
-        response = self.cc.validate_object(data, transaction_id, "read")
+        cursor = self.sm.open_cursor(data_retrieval, self.db_name, transaction_id)
+        if isinstance(cursor, Exception):
+            raise cursor
+        response = self.cc.validate_object(cursor, transaction_id, "read")
         if not response.allowed:
+            cursor.close()
             print("Validation failed. Handling rollback.")
             print("Retrying query after rollback.")
             raise Exception(response)
-        return data.data
+        return cursor
     
     def __transCond(self, cond: str) -> list:
         """Transform the condition string to a list of conditions.
@@ -616,18 +716,17 @@ class QueryProcessor:
             result.append([temp[0].strip(),temp[1].strip()])
         return result
 
-    def __joinOn(self, table1: list[map], table2: list[map], cond: str) -> list[map]:
+    def __joinOn(self, table1: Iterable[map], table2: list[map], cond: str) -> Iterator[map]:
         """Join two tables on the specified condition.
 
         Args:
-            table1 (list[map]): The first table to join.
+            table1 (Iterable[map]): The first table to join, read once.
             table2 (list[map]): The second table to join.
             cond (str): The condition to join on.
 
         Returns:
-            list[map]: The joined table.
+            Iterator[map]: The joined table, produced lazily.
         """
-        result = []
         condList = self.__transCond(cond)      
         for r1 in table1:
             for r2 in table2:
@@ -642,39 +741,36 @@ class QueryProcessor:
                             isValid = False
                             break
                 if(isValid):
-                    result.append(r1 | r2) 
-        return result
+                    yield r1 | r2
     
-    def __naturalJoin(self, table1: list[dict], table2: list[dict], cols: list[str]) -> list[dict]:
+    def __naturalJoin(self, table1: Iterable[dict], table2: list[dict], cols: list[str]) -> Iterator[dict]:
         """Join two tables on the specified columns.
 
         Args:
-            table1 (list[dict]): row of table1
+            table1 (Iterable[dict]): row of table1, read once
             table2 (list[dict]): row of table2
             cols (list[str]): The columns to join on.
 
         Returns:
-            list[dict]: The joined table.
+            Iterator[dict]: The joined table, produced lazily.
         """
-        joined_table = []
-        col1 = list(table1[0].keys())
-        name1 = col1[0].split(".")[0]
+        if not table2:
+            return
         col2 = list(table2[0].keys())
         name2 = col2[0].split(".")[0]
         for row1 in table1:
+            name1 = next(iter(row1)).split(".")[0]
             for row2 in table2:
                 # Check if rows match on all specified columns
                 if all(row1[name1+"."+col] == row2[name2+"."+col] for col in cols):
                     # Merge rows, avoiding duplicate keys from table2
-                    joined_row = {**row1, **{k: v for k, v in row2.items() if k not in row1}}
-                    joined_table.append(joined_row)
-        return joined_table
+                    yield row1.join(row2, overwrite=False)
     
-    def __orderBy(self, data: List[dict], order_by: str, is_asc: bool) -> List[dict]:
+    def __orderBy(self, data: Iterable[dict], order_by: str, is_asc: bool) -> List[dict]:
         """Order the data by the specified column.
 
         Args:
-            data (List[dict]): The data to order.
+            data (Iterable[dict]): The data to order.
             order_by (str): The column to order by.
             is_asc (bool): Whether to order in ascending order.
 
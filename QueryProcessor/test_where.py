@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from StorageManager.classes import StorageEngine
+from ConcurrencyControlManager.ConcurrencyControlManager import ConcurrencyControlManager
+from QueryOptimizer.QueryTree import QueryTree
+
+from .QueryProcessor import QueryProcessor
+
+class TestWhereNodes(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        storage = StorageEngine()
+        storage.create_database("test_db")
+        storage.create_table("test_db", "users", {"id": "INTEGER", "city": "VARCHAR(20)"}, {"id": ["PRIMARY KEY"], "city": []})
+        for i in range(10):
+            storage.insert_data("test_db", "users", {"id": i, "city": "ORANGE" if i % 2 == 0 else "LEMON"}, 1)
+        storage.commit_buffer(1)
+        # without __init__, which starts failure recovery and signal handlers
+        self.qp = QueryProcessor.__new__(QueryProcessor)
+        self.qp.sm = storage
+        self.qp.cc = ConcurrencyControlManager()
+        self.qp.db_name = "test_db"
+        self.transaction_id = self.qp.cc.begin_transaction()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+
+    def select_ids(self, *wheres):
+        tree = QueryTree("TABLE", "users")
+        for where in reversed(wheres):
+            tree = QueryTree("WHERE", where, childs=[tree])
+        return sorted(row["users.id"] for row in self.qp.evaluateSelectTree(tree, [], [], self.transaction_id))
+
+    def testConsecutiveWhereNodesAreAnded(self):
+        self.assertEqual(self.select_ids("city = ORANGE", "id < 5"), [0, 2, 4])
+        self.assertEqual(self.select_ids("id < 5", "city = ORANGE"), [0, 2, 4])
+
+    def testOrGroupIsAnded(self):
+        self.assertEqual(self.select_ids("id = 1 OR id = 2", "city = ORANGE"), [2])
+        self.assertEqual(self.select_ids("city = ORANGE", "id = 1 OR id = 2"), [2])
+        self.assertEqual(self.select_ids("id > 3", "id = 4 OR city = LEMON"), [4, 5, 7, 9])
+        self.assertEqual(self.select_ids("id = 1 OR id = 8"), [1, 8])
+
+    def testOrGroupKeepsProjection(self):
+        tree = QueryTree("WHERE", "id = 1 OR id = 2", childs=[QueryTree("WHERE", "id < 5", childs=[QueryTree("TABLE", "users")])])
+        rows = self.qp.evaluateSelectTree(tree, ["users.city"], [], self.transaction_id)
+        self.assertEqual([dict(row) for row in rows], [{"users.city": "LEMON"}, {"users.city": "ORANGE"}])
+
+    def testSplitWhereSkipsQuotedText(self):
+        self.assertEqual(QueryProcessor.splitWhere("city = 'ORANGE' AND id < 5", "AND"), ["city = 'ORANGE'", "id < 5"])
+        self.assertEqual(QueryProcessor.splitWhere("city = 'ORANGE'", "OR"), ["city = 'ORANGE'"])
+        self.assertEqual(QueryProcessor.splitWhere("city = 'A AND B' AND id = 1", "AND"), ["city = 'A AND B'", "id = 1"])
+        self.assertEqual(QueryProcessor.splitWhere("id = 1 OR city = \"X OR Y\"", "OR"), ["id = 1", "city = \"X OR Y\""])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,91 +1,293 @@
-import math
+from bisect import bisect_left, bisect_right
+from .HeapFile import NO_PAGE, PAGE_CAPACITY
+from .NodeStore import MemoryNodeStore, NodeFile, PagedNodeStore as BasePagedNodeStore
+
+# perkiraan ukuran entry node selain key-nya (posisi record atau page id anak, plus overhead pickle) dan overhead satu node
+ENTRY_OVERHEAD = 16
+NODE_OVERHEAD = 64
+MIN_ORDER = 4
+MAX_ORDER = 256
+
+
+def order_for_page(key_width:int, page_size:int = PAGE_CAPACITY) -> int:
+    """
+    order (jumlah anak maksimal) terbesar yang node-nya masih muat di satu page untuk key selebar key_width byte,
+    dibatasi MIN_ORDER..MAX_ORDER. key integer dapat order sekitar 200, jadi tabel jutaan record cukup 3 level
+    """
+    order = (page_size - NODE_OVERHEAD) // (key_width + ENTRY_OVERHEAD)
+    return max(MIN_ORDER, min(MAX_ORDER, order))
+
 
 class BTreeNode:
+    __slots__ = ("page_id", "keys", "values", "children", "is_leaf", "next", "order")
+
     def __init__(self, order, is_leaf=False):
-        self.keys = []  # The keys stored in the node
+        self.page_id = NO_PAGE  # Page id of this node, set by the node store
+        self.keys = []  # The keys stored in the node, always sorted
         self.values = []  # Pointers to the data or "buckets" of pointers , bucker if it is secondary index
-        self.children = []  # Child pointers used only for internal nodes
+        self.children = []  # Page ids of the children, used only for internal nodes
         self.is_leaf = is_leaf  # True if the node is a leaf node
-        self.next = None  # Pointer to the next leaf node (for range queries)
+        self.next = NO_PAGE  # Page id of the next leaf node (for range queries)
         self.order = order  # Maximum number of children
-        self.parent = None
-        self.min_children = math.ceil(order / 2) 
-        self.min_key = math.ceil(order / 2) - 1
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in BTreeNode.__slots__}
+
+    def __setstate__(self, state):
+        # node versi lama di-pickle dengan __dict__ (bisa juga berisi parent, min_key, dll), yang tidak ada di slot diabaikan
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **(state[1] or {})}
+        self.page_id = NO_PAGE
+        self.children = []
+        self.next = NO_PAGE
+        for name, value in state.items():
+            if name in BTreeNode.__slots__:
+                setattr(self, name, value)
 
     def is_full(self):
         return len(self.keys) >= self.order - 1
 
+    def find(self, key):
+        """posisi key di node ini, None kalau tidak ada"""
+        index = bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            return index
+        return None
+
+
+def store_from_nodes(root) -> MemoryNodeStore:
+    """
+    Mindahin tree format lama (node saling mereferensi sebagai objek) ke node store.
+    """
+    store = MemoryNodeStore()
+    leaves = []
+
+    def convert(old):
+        node = BTreeNode(old.order, is_leaf=old.is_leaf)
+        node.keys = list(old.keys)
+        if old.is_leaf:
+            node.values = list(old.values)
+            leaves.append(node)
+        else:
+            node.children = [convert(child) for child in old.children]
+        return store.add(node)
+
+    store.root_id = convert(root)
+    for leaf, next_leaf in zip(leaves, leaves[1:]):
+        leaf.next = next_leaf.page_id
+    return store
+
+
+class IndexFile(NodeFile):
+    """
+    Page file berisi node B+ tree, satu node satu page. Page META_PAGE berisi page id root.
+    """
+    def decode_node(self, page_id:int, data):
+        is_leaf, order, keys, pointers, next_leaf = data
+        node = BTreeNode(order, is_leaf=is_leaf)
+        node.page_id = page_id
+        node.keys = keys
+        if is_leaf:
+            node.values = pointers
+        else:
+            node.children = pointers
+        node.next = next_leaf
+        return node
+
+    def encode_node(self, node):
+        return (node.is_leaf, node.order, node.keys, node.values if node.is_leaf else node.children, node.next)
+
+
+class PagedNodeStore(BasePagedNodeStore):
+    """
+    Node store B+ tree di disk (lihat NodeStore.PagedNodeStore), node disimpan di IndexFile.
+    """
+    file_class = IndexFile
+
 
 class BPlusTree:
-    def __init__(self, order=4):
-        self.root = BTreeNode(order, is_leaf=True)
+    def __init__(self, order=4, store=None):
+        if order < 3:
+            raise ValueError("order B+ tree minimal 3")
         self.order = order
+        self.store = store if store is not None else MemoryNodeStore()
+        if self.store.root_id == NO_PAGE:
+            self.store.root_id = self.store.add(BTreeNode(order, is_leaf=True))
+            self.store.release()
 
-    def insert(self, key, value):
-        result = self._insert_recursive(self.root, key, value)
-        if isinstance(result, tuple):  # Root was split
-            middle_key, new_node = result
-            new_root = BTreeNode(self.order, is_leaf=False)
-            new_root.keys = [middle_key]
-            new_root.children = [self.root, new_node]
-
-            # Update parent references
-            self.root.parent = new_root
-            new_node.parent = new_root
+    @classmethod
+    def bulk_load(cls, entries, order=4, fill_factor=1.0, store=None):
+        """
+        Membangun tree dari bawah ke atas dari entries (key, value) yang sudah terurut berdasarkan key,
+        tanpa insert satu per satu : leaf diisi berurutan lalu level internal dibangun dari key terkecil tiap node.
+        fill_factor (0 < fill_factor <= 1) : bagian node yang diisi, sisanya disisakan untuk insert berikutnya
+        biar tidak langsung split. Key yang sama digabung jadi satu entry dengan list value, seperti insert.
+        """
+        if order < 3:
+            raise ValueError("order B+ tree minimal 3")
+        if not 0 < fill_factor <= 1:
+            raise ValueError("fill_factor harus di antara 0 dan 1")
+        tree = cls.__new__(cls)
+        tree.order = order
+        tree.store = store if store is not None else MemoryNodeStore()
+        leaf_keys = max(1, int((order - 1) * fill_factor))
+        fanout = max(2, int(order * fill_factor))
+
+        # level leaf : (key terkecil, page id) tiap leaf untuk membangun level di atasnya
+        level = []
+        leaf = None
+        for key, value in entries:
+            if leaf is not None and leaf.keys and leaf.keys[-1] == key:
+                if isinstance(leaf.values[-1], list):
+                    leaf.values[-1].append(value)
+                else:
+                    leaf.values[-1] = [leaf.values[-1], value]
+                continue
+            if leaf is None or len(leaf.keys) >= leaf_keys:
+                new_leaf = BTreeNode(order, is_leaf=True)
+                tree.store.add(new_leaf)
+                if leaf is not None:
+                    leaf.next = new_leaf.page_id
+                    tree.store.release_node(leaf)
+                leaf = new_leaf
+                level.append((key, leaf.page_id))
+            leaf.keys.append(key)
+            leaf.values.append(value)
+        if leaf is None:
+            level.append((None, tree.store.add(BTreeNode(order, is_leaf=True))))
+        tree.store.release()
+
+        while len(level) > 1:
+            groups = [level[start:start + fanout] for start in range(0, len(level), fanout)]
+            if len(groups[-1]) == 1:
+                # node internal minimal punya dua anak
+                if len(groups[-2]) < order:
+                    groups[-2].extend(groups.pop())
+                else:
+                    groups[-1].insert(0, groups[-2].pop())
+            level = []
+            for group in groups:
+                node = BTreeNode(order, is_leaf=False)
+                node.keys = [key for key, _ in group[1:]]
+                node.children = [page_id for _, page_id in group]
+                level.append((group[0][0], tree.store.add(node)))
+                tree.store.release_node(node)
+        tree.store.root_id = level[0][1]
+        return tree
+
+    def __setstate__(self, state):
+        if "root" in state:
+            # format lama : seluruh node ikut di-pickle sebagai objek
+            state = {"order": state["order"], "store": store_from_nodes(state["root"])}
+        self.__dict__.update(state)
+
+    @property
+    def root(self):
+        return self.store.get(self.store.root_id)
 
-            self.root = new_root
+    def insert(self, key, value):
+        try:
+            result = self._insert_recursive(self.store.root_id, key, value)
+            if result is not None:  # Root was split
+                middle_key, new_page = result
+                new_root = BTreeNode(self.order, is_leaf=False)
+                new_root.keys = [middle_key]
+                new_root.children = [self.store.root_id, new_page]
+                self.store.root_id = self.store.add(new_root)
+        finally:
+            self.store.release()
 
     def get_bplus_tree_level(self) -> int:
         """
         Mengembalikan tinggi (level) dari B+ tree.
         """
-        height = 0
-        current_node = self.root
-
-        while current_node:
-            height += 1
-            if current_node.is_leaf:
-                break
-            current_node = current_node.children[0]  # Traverse down the first child
+        try:
+            height = 1
+            current_node = self.root
+            while not current_node.is_leaf:
+                height += 1
+                current_node = self.store.get(current_node.children[0])  # Traverse down the first child
+            return height
+        finally:
+            self.store.release()
+
+    def _leftmost_leaf(self):
+        node = self.root
+        while not node.is_leaf:
+            node = self.store.get(node.children[0])
+        return node
 
-        return height
+    def _leaves(self, node):
+        """
+        ngeiterasi leaf chain mulai dari node, node yang sudah lewat langsung di-unpin
+        """
+        while True:
+            yield node
+            next_leaf = node.next
+            self.store.release()
+            if next_leaf == NO_PAGE:
+                return
+            node = self.store.get(next_leaf)
 
+    def min_key(self):
+        """
+        Key terkecil di tree (None kalau tree kosong).
+        """
+        try:
+            for node in self._leaves(self._leftmost_leaf()):
+                if node.keys:
+                    return node.keys[0]
+            return None
+        finally:
+            self.store.release()
 
-    def _insert_recursive(self, node, key, value):
+    def max_key(self):
+        """
+        Key terbesar di tree (None kalau tree kosong).
+        """
+        try:
+            node = self.root
+            while not node.is_leaf:
+                node = self.store.get(node.children[-1])
+            if node.keys:
+                return node.keys[-1]
+            # leaf paling kanan bisa kosong setelah delete, cari lewat leaf chain
+            last = None
+            for node in self._leaves(self._leftmost_leaf()):
+                if node.keys:
+                    last = node.keys[-1]
+            return last
+        finally:
+            self.store.release()
+
+    def _insert_recursive(self, page_id, key, value):
+        node = self.store.get(page_id)
         if node.is_leaf:
-            if key in node.keys:
-                index = node.keys.index(key)
+            index = bisect_left(node.keys, key)
+            if index < len(node.keys) and node.keys[index] == key:
                 if isinstance(node.values[index], list):
                     node.values[index].append(value)
                 else:
                     node.values[index] = [node.values[index], value]
             else:
-                node.keys.append(key)
-                node.values.append(value)
-
-                # Ensure keys and values remain sorted
-                sorted_indices = sorted(range(len(node.keys)), key=lambda i: node.keys[i])
-                node.keys = [node.keys[i] for i in sorted_indices]
-                node.values = [node.values[i] for i in sorted_indices]
+                # Insert at the sorted position
+                node.keys.insert(index, key)
+                node.values.insert(index, value)
         else:
             index = self._find_child_index(node, key)
             child_result = self._insert_recursive(node.children[index], key, value)
+            if child_result is None:
+                return None
 
-            if isinstance(child_result, tuple):
-                middle_key, new_node = child_result
-                node.keys.insert(index, middle_key)
-                node.children.insert(index + 1, new_node)
-
-                # Update parent references
-                new_node.parent = node
-                for child in node.children:
-                    child.parent = node
+            middle_key, new_page = child_result
+            node.keys.insert(index, middle_key)
+            node.children.insert(index + 1, new_page)
 
+        self.store.mark_dirty(node)
         if len(node.keys) > self.order - 1:
             return self._split_node(node)
 
-        return node
-
+        return None
 
     def _split_node(self, node):
         mid = len(node.keys) // 2
@@ -101,7 +303,7 @@ class BPlusTree:
 
             # Update leaf chain
             new_node.next = node.next
-            node.next = new_node
+            node.next = self.store.add(new_node)
         else:
             # Split internal node
             new_node.keys = node.keys[mid + 1:]
@@ -109,482 +311,147 @@ class BPlusTree:
             middle_key = node.keys[mid]
             node.keys = node.keys[:mid]
             node.children = node.children[:mid + 1]
+            self.store.add(new_node)
 
-            # Update parent for new_node's children
-            for child in new_node.children:
-                child.parent = new_node
-
-        # Set parent for the new node
-        new_node.parent = node.parent
-
-        return middle_key, new_node
-
+        return middle_key, new_node.page_id
 
     def _find_child_index(self, node, key):
-        for i, k in enumerate(node.keys):
-            if key < k:
-                return i
-        return len(node.keys)
-
-    def _find_child_index_deletion(self, node, key):
-        for i, k in enumerate(node.keys):
-            if key < k and node.keys[i - 1] != key :
-                return i, -999
-            if key < k and node.keys[i - 1] == key : 
-                return i, -1000
-        return len(node.keys), -1001
+        # first child whose separator is greater than key
+        return bisect_right(node.keys, key)
+
+    def _find_leaf(self, key):
+        node = self.root
+        while not node.is_leaf:
+            node = self.store.get(node.children[self._find_child_index(node, key)])
+        return node
 
     def search(self, key):
-        return self._search_recursive(self.root, key)
+        try:
+            node = self._find_leaf(key)
+            index = node.find(key)
+            return node.values[index] if index is not None else None
+        finally:
+            self.store.release()
+
+    def remove(self, key, value):
+        """
+        Menghapus satu value dari key (key ikut hilang dari leaf kalau value-nya habis).
+        Leaf tidak di-rebalance (lazy deletion), separator di node internal tetap valid untuk pencarian.
+        """
+        try:
+            node = self._find_leaf(key)
+            index = node.find(key)
+            if index is None:
+                return False
+            values = node.values[index]
+            if isinstance(values, list):
+                if value not in values:
+                    return False
+                values.remove(value)
+                if len(values) == 1:
+                    node.values[index] = values[0]
+                elif not values:
+                    node.keys.pop(index)
+                    node.values.pop(index)
+            elif values == value:
+                node.keys.pop(index)
+                node.values.pop(index)
+            else:
+                return False
+            self.store.mark_dirty(node)
+            return True
+        finally:
+            self.store.release()
 
-    def _search_recursive(self, node, key):
-        if node.is_leaf:
-            if key in node.keys:
-                index = node.keys.index(key)
-                return node.values[index]
-            return None
-        else:
-            index = self._find_child_index(node, key)
-            return self._search_recursive(node.children[index], key)
+    def delete(self, key):
+        """
+        Menghapus key beserta semua value-nya, lazy seperti remove.
+        """
+        try:
+            node = self._find_leaf(key)
+            index = node.find(key)
+            if index is None:
+                return False
+            node.keys.pop(index)
+            node.values.pop(index)
+            self.store.mark_dirty(node)
+            return True
+        finally:
+            self.store.release()
 
     def search_range(self, start, end):
-        current_leaf = self.root
-        while not current_leaf.is_leaf:
-            for i, key in enumerate(current_leaf.keys):
-                if start < key:
-                    current_leaf = current_leaf.children[i]
-                    break
-            else:
-                current_leaf = current_leaf.children[-1]
-        
+        return [value for _, value in self.items_range(start, end)]
+
+    def items_range(self, start, end):
+        """
+        Pasangan (key, value) untuk semua key di antara start dan end (inklusif), urut sesuai key.
+        Key dengan beberapa value muncul sekali per value.
+        """
         result = []
-        while current_leaf:
-            for i, key in enumerate(current_leaf.keys):
-                if start <= key <= end:
-                    result.extend(current_leaf.values[i] if isinstance(current_leaf.values[i], list) else [current_leaf.values[i]])
-                elif key > end:
+        try:
+            for leaf in self._leaves(self._find_leaf(start)):
+                low = bisect_left(leaf.keys, start)
+                high = bisect_right(leaf.keys, end)
+                for key, values in zip(leaf.keys[low:high], leaf.values[low:high]):
+                    if isinstance(values, list):
+                        result.extend((key, value) for value in values)
+                    else:
+                        result.append((key, values))
+                if high < len(leaf.keys):
                     return result
-            current_leaf = current_leaf.next
-        
-        return result
+            return result
+        finally:
+            self.store.release()
 
-    def print_tree(self, node=None, prefix="", is_last=True):
-        if node is None:
-            node = self.root
+    def print_tree(self, page_id=None, prefix="", is_last=True):
+        if page_id is None:
+            page_id = self.store.root_id
+        node = self.store.get(page_id)
 
         print(prefix, end="")
         print("└── " if is_last else "├── ", end="")
-        
+
         node_type = "L" if node.is_leaf else "I"
         print(f"{node_type}: {node.keys} | {node.values if node.is_leaf else ''}")
 
-        if not node.is_leaf:
-            new_prefix = prefix + ("    " if is_last else "│   ")
-            for i in range(len(node.children)):
-                is_last_child = (i == len(node.children) - 1)
-                self.print_tree(
-                    node=node.children[i], 
-                    prefix=new_prefix, 
-                    is_last=is_last_child
-                )
+        children = [] if node.is_leaf else list(node.children)
+        self.store.release()
+        new_prefix = prefix + ("    " if is_last else "│   ")
+        for i, child in enumerate(children):
+            self.print_tree(page_id=child, prefix=new_prefix, is_last=(i == len(children) - 1))
 
     def print_leaf_chain(self):
         print("\nLeaf Chain:")
-        current_leaf = self.root
-        while not current_leaf.is_leaf:
-            current_leaf = current_leaf.children[0]
-        while current_leaf:
-            print(f"[{current_leaf.keys}] → ", end="")
-            current_leaf = current_leaf.next
+        try:
+            for leaf in self._leaves(self._leftmost_leaf()):
+                print(f"[{leaf.keys}] → ", end="")
+        finally:
+            self.store.release()
         print("None")
-        
-    # DELETION
-    # def delete(self, value):
-    #     if not self.root:
-    #         return
-    #     print("======= deleting", value, "=======")
-    #     self._delete_recursive(self.root, value)
-
-    #     # If the root becomes empty and is not a leaf, promote its only child
-    #     if not self.root.keys and not self.root.is_leaf:
-    #         self.root = self.root.children[0]
-
-    # def _delete_recursive(self, node, value):
-    #     if node.is_leaf:
-    #         if value in node.keys:
-    #             index = node.keys.index(value)
-    #             node.keys.remove(value)
-    #             node.values.remove(node.values[index])
-    #     else:
-    #         # delete from internal node
-    #         idx, status = self._find_child_index_deletion(node, value)
-    #         print(status)
-            
-    #         if value in node.keys:
-    #             print("idx ditemukannya value sama =", idx)
-                
-    #             current = node.children[idx]
-    #             # print("parent:", current.parent.keys)
-    #             # print(f"isi node children[{idx}]", current.keys)
-    #             while (not current.is_leaf) : 
-    #                 current = current.children[0]
-    #             #     print("banyak anak:", len(current.children))
-    #             #     print(f"-- isi node children[{idx}]", current.keys)
-                
-    #             # print("panjang node children =", len(current.keys))
-    #             # print("isi node: ")
-    #             for all in current.keys :
-    #                 print(all)
-
-    #             if len(current.keys) > node.min_key :
-    #                 successor = self._find_successor(node, idx)
-    #                 print("successor =", successor)
-    #                 print("node keys sebelum dihapus =", node.keys)
-    #                 print("idx", idx)
-    #                 if status != -999 :
-    #                     node.keys[idx - 1] = successor
-    #                     # print("1001:", node.keys)
-    #                 #     node.keys[idx] = successor
-    #                 # print("jumlah keys")
-    #                 # print("node keys baru =", node.keys[idx - 1])
-    #                 self._delete_recursive(node.children[idx], value)
-    #             else : 
-    #                 # handle underflow
-    #                 parent =  current.parent
-    #                 # print("=====================================")
-    #                 # print("parent:", parent.keys)
-    #                 # print("how much children they have:", len(parent.children))
-    #                 # print(f"children 1", parent.children[0].keys)
-    #                 # print(f"children 2", parent.children[1].keys)
-    #                 # print("idx", idx)
-    #                 left_sibling, right_sibling = None, None
-    #                 index_from_parent = parent.children.index(current)
-    #                 # print("index from parent for key", value, "is", index_from_parent)
-    #                 if index_from_parent > 0 : 
-    #                     left_sibling = parent.children[index_from_parent - 1]
-    #                     # print("left sibling", left_sibling.keys)
-    #                 if len(parent.children) > 1 :
-    #                     right_sibling = parent.children[index_from_parent + 1]
-    #                 # if index_from_parent <= parent.min_children - 1 : 
-    #                 #     right_sibling = parent.children[idx]
-                    
-    #                 if left_sibling and len(left_sibling.keys) > parent.min_key :
-    #                     # print("masuk sini kan ya pt. 2")
-    #                     borrowed_key = left_sibling.keys.pop(-1)
-    #                     borrowed_value = left_sibling.values.pop(-1)
-    #                     node.keys.remove(value)
-    #                     current.keys.remove(value)
-
-    #                     current.keys.insert(0, borrowed_key)
-    #                     current.values.insert(0, borrowed_value)
-
-    #                     node.keys.insert(0, borrowed_key)
-    #                     node.values.insert(0, borrowed_value)
-    #                     # print("parent.keys[idx-1]", parent.keys[idx - 1])
-    #                     print()
-    #                     print("___otak-atik parent key___")
-    #                     print(parent.keys)
-    #                     # parent.keys[idx - 1] = borrowed_key
-    #                     # if len(parent.keys) > idx :
-    #                     #     for i in range (len(parent.keys) - 1) :
-    #                     #         parent.keys[idx + i] = parent.children[idx + i + 1].keys[0]
-    #                         # parent.keys[idx] = parent.children[idx].keys[0]
-    #                     for i in range (len(parent.keys)) :
-    #                         parent.keys[idx - 1 + i] = parent.children[idx + i].keys[0]
-    #                 else :
-    #                     if right_sibling and len(right_sibling.keys) > parent.min_key :
-    #                         borrowed_key = right_sibling.keys.pop(0)
-    #                         # print("borrowed_key", borrowed_key)
-    #                         borrowed_value = right_sibling.values.pop(0)
-    #                         node.keys.remove(value)
-    #                         current.keys.remove(value)
-    #                         print(value)
-    #                         print(node.keys)
-    #                         # print("masuk sini kan ya")
-    #                         # print(node.keys)
-    #                         current.keys.append(borrowed_key)
-    #                         current.values.append(borrowed_value)
-    #                         # print("curr keys", current.keys)
-    #                         node.keys.append(borrowed_key)
-    #                         node.values.append(borrowed_value)
-    #                         # print("node keys", node.keys)
-    #                         for i in range (len(parent.keys) - 1) :
-    #                             parent.keys[idx - 1 + i] = parent.children[idx + i].keys[0]
-    #                     else : 
-                            
-    #                         if left_sibling : 
-    #                             # extend itu buat merge seluruh keys dari left sibling ke current
-    #                             left_sibling.keys.extend(node.keys)
-    #                             left_sibling.next = node.next
-    #                             parent.keys.pop(idx - 1)
-    #                             parent.children.pop(idx)
-    #                         else : 
-    #                             node.keys.extend(right_sibling.keys)
-    #                             node.next = right_sibling.next
-    #                             parent.keys.pop(index_from_parent)
-    #                             parent.children.pop(index_from_parent)
-    #                         self._delete_recursive(parent, value)
-    #         else:
-    #             self._delete_recursive(node.children[idx], value)
-
-    #     # handle underflow
-    #     # if len(node.keys) < (self.order // 2) - 1:
-    #     #     self._handle_underflow(node)
-    
-
-    # def _find_successor(self, node, idx):
-    #     current = node.children[idx]
-    #     while not current.is_leaf:
-    #         current = current.children[0]
-    #     return current.keys[1]
-
-    def delete(self, key):
-        if not self.root:
-            return
-
-        print(f"Deleting key: {key}")
-        self._delete_recursive(self.root, key)
-
-        # If the root becomes empty and is not a leaf, promote its only child
-        if not self.root.keys and not self.root.is_leaf:
-            self.root = self.root.children[1]
-
-    def _delete_recursive(self, node, key):
-        if node.is_leaf:
-            # Delete from leaf node
-            if key in node.keys:
-                index = node.keys.index(key)
-                print("key =", key)
-                print("index yg akan dihapus =", index)
-                print("yang akan dipop=", node.keys, "=", node.keys[index])
-                node.keys.pop(index)
-                node.values.pop(index)
-            else:
-                print(f"Key {key} not found in the tree.")
-                return
-        else:
-            # Find child to recurse into
-            index = self._find_child_index(node, key)
-            child = node.children[index]
-
-            if key in node.keys:
-                # if len(child.keys) > child.min_key :
-                    # Key is in the internal node
-                self._delete_recursive(child, key)
-                successor = self._find_successor(child)
-                node.keys[index - 1] = successor
-                # else : 
-                #     self._rebalance_leaf(child)
-                # so that it would be like this
-            else:
-                # Recurse into the child
-                self._delete_recursive(child, key)
-
-        # Handle underflow after deletion
-        self._handle_underflow(node)
-
-    # def _handle_underflow(self, node):
-    #     if node.is_leaf:
-    #         # Underflow condition for leaf nodes
-    #         if len(node.keys) < node.min_key:
-    #             self._rebalance_leaf(node)
-    #     else:
-    #         # Underflow condition for internal nodes
-    #         if len(node.keys) < node.min_children - 1:
-    #             self._rebalance_internal(node)
-    def _handle_underflow(self, node):
-        if node.is_leaf and len(node.keys) < node.min_key:
-            self._rebalance_leaf(node)
-        elif not node.is_leaf and len(node.keys) < node.min_children - 1:
-            self._rebalance_internal(node)
-
-    # mekanisme borrow leaf dari sibling
-    def _rebalance_leaf(self, node):
-        parent = node.parent
-        if not parent:
-            return
-
-        index = parent.children.index(node)
-        left_sibling = parent.children[index - 1] if index > 0 else None
-        right_sibling = parent.children[index + 1] if index < len(parent.children) - 1 else None
-
-        if left_sibling and len(left_sibling.keys) > left_sibling.min_key:
-            # Borrow from left sibling
-            node.keys.insert(0, left_sibling.keys.pop(-1))
-            node.values.insert(0, left_sibling.values.pop(-1))
-            parent.keys[index - 1] = node.keys[0]
-        elif right_sibling and len(right_sibling.keys) > right_sibling.min_key:
-            # Borrow from right sibling
-            node.keys.append(right_sibling.keys.pop(0))
-            node.values.append(right_sibling.values.pop(0))
-            parent.keys[index] = right_sibling.keys[0]
-        else: 
-            # Merge with a sibling
-            if left_sibling:
-                left_sibling.keys.extend(node.keys)
-                left_sibling.values.extend(node.values)
-                left_sibling.next = node.next
-                parent.keys.pop(index - 1)
-                parent.children.pop(index)
-            elif right_sibling:
-                node.keys.extend(right_sibling.keys)
-                node.values.extend(right_sibling.values)
-                node.next = right_sibling.next
-                parent.keys.pop(index)
-                parent.children.pop(index + 1)
-
-    def _rebalance_internal(self, node):
-        parent = node.parent
-        if not parent:
-            return
-
-        index = parent.children.index(node)
-        left_sibling = parent.children[index - 1] if index > 0 else None
-        right_sibling = parent.children[index + 1] if index < len(parent.children) - 1 else None
-
-        if left_sibling and len(left_sibling.keys) > left_sibling.min_key:
-            # Borrow from left sibling
-            node.keys.insert(0, parent.keys[index - 1])
-            node.children.insert(0, left_sibling.children.pop(-1))
-            parent.keys[index - 1] = left_sibling.keys.pop(-1)
-        elif right_sibling and len(right_sibling.keys) > right_sibling.min_key:
-            # Borrow from right sibling
-            node.keys.append(parent.keys[index])
-            node.children.append(right_sibling.children.pop(0))
-            parent.keys[index] = right_sibling.keys.pop(0)
-        else:
-            # Merge with a sibling
-            if left_sibling:
-                left_sibling.keys.append(parent.keys.pop(index - 1))
-                left_sibling.keys.extend(node.keys)
-                left_sibling.children.extend(node.children)
-                parent.children.pop(index)
-            elif right_sibling:
-                node.keys.append(parent.keys.pop(index))
-                node.keys.extend(right_sibling.keys)
-                node.children.extend(right_sibling.children)
-                parent.children.pop(index + 1)
-
-    def _find_successor(self, node):
-        current = node
-        while not current.is_leaf:
-            current = current.children[0]
-        return current.keys[0]
-
-        # def _find_successor(self, node, idx):
-    #     current = node.children[idx]
-    #     while not current.is_leaf:
-    #         current = current.children[0]
-    #     return current.keys[1]
-    
-
-    # def _borrow_from_left(self, parent, index, left_sibling):
-    #     child = parent.children[index]
-    #     borrowed_key = left_sibling.keys.pop(-1)
-        
-    #     if child.is_leaf:
-    #         child.keys.insert(0, borrowed_key)
-    #         parent.keys[index - 1] = borrowed_key
-    #     else:
-    #         borrowed_child = left_sibling.children.pop(-1)
-    #         child.keys.insert(0, parent.keys[index - 1])
-    #         child.children.insert(0, borrowed_child)
-    #         parent.keys[index - 1] = borrowed_key
-
-    # def _borrow_from_right(self, parent, index, right_sibling):
-    #     child = parent.children[index]
-    #     borrowed_key = right_sibling.keys.pop(0)
-        
-    #     if child.is_leaf:
-    #         child.keys.append(borrowed_key)
-    #         parent.keys[index] = right_sibling.keys[0] if right_sibling.keys else borrowed_key
-    #     else:
-    #         borrowed_child = right_sibling.children.pop(0)
-    #         child.keys.append(parent.keys[index])
-    #         child.children.append(borrowed_child)
-    #         parent.keys[index] = borrowed_key
-
-    # def _merge_with_left(self, parent, index, left_sibling):
-    #     child = parent.children[index]
-        
-    #     if child.is_leaf:
-    #         left_sibling.keys.extend(child.keys)
-    #         left_sibling.next = child.next
-    #     else:
-    #         left_sibling.keys.append(parent.keys[index - 1])
-    #         left_sibling.keys.extend(child.keys)
-    #         left_sibling.children.extend(child.children)
-        
-    #     parent.keys.pop(index - 1)
-    #     parent.children.pop(index)
-
-    # def _merge_with_right(self, parent, index, right_sibling):
-    #     child = parent.children[index]
-        
-    #     if child.is_leaf:
-    #         child.keys.extend(right_sibling.keys)
-    #         child.next = right_sibling.next
-    #     else:
-    #         child.keys.append(parent.keys[index])
-    #         child.keys.extend(right_sibling.keys)
-    #         child.children.extend(right_sibling.children)
-        
-    #     parent.keys.pop(index)
-    #     parent.children.pop(index + 1)
-
-
-
 
 
 def main():
     tree = BPlusTree(order=4)
-    
+
     values = [[10, "A"], [20, "B"], [5, "C"], [15, "D"], [25, "E"], [30, "F"], [8, "G"], [12, "H"], [7, "I"], [18, "J"], [22, "K"], [35, "L"], [40, "M"], [50, "N"], [55, "O"], [60, "P"], [33, "Q"], [56, "R"], [11, "S"], [19, "T"], [13, "U"], [57, "V"], [58, "W"], [14, "X"], [6, "Y"], [36, "Z"], [37, "AA"], [38, "BB"], [39, "CC"]]
-    
+
     for key, value in values:
         print(f"\nInserting {value}")
         tree.insert(key, value)
-        
+
         print("\nTree Structure:")
         tree.print_tree()
-        
+
         tree.print_leaf_chain()
-        
+
         print("\n" + "-" * 50)
 
     print(tree.search_range(10,20))
 
-    # tree.delete(60)
-    print()
-    tree.delete(37)
-    tree.print_tree()
-    print()
-    tree.delete(38)
-    tree.print_tree()
-    print()
-    tree.delete(7)
-    tree.print_tree()
-    print()
-    tree.delete(8)
-    tree.print_tree()
-    print()
-    tree.delete(6)
-    tree.print_tree()
-    print()
-    tree.delete(56)
-    tree.print_tree()
-    print()
-    tree.delete(57)
-    tree.print_tree()
-    print()
-    tree.delete(39)
-    tree.print_tree()
-    print()
-    tree.delete(55)
-    tree.print_tree()
-    print()
-    # tree.delete(58)
-    # tree.print_tree()
+    for key in [37, 38, 7, 8, 6, 56, 57, 39, 55]:
+        print(f"\nDeleting key: {key}")
+        tree.delete(key)
+        tree.print_tree()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,133 @@
+import threading
+from collections import OrderedDict
+
+class Frame:
+    __slots__ = ("file", "page_id", "page", "pin_count", "dirty", "referenced")
+
+    def __init__(self, file, page_id:int, page) -> None:
+        self.file = file  # pemilik page, harus punya read_block(page_id) dan write_block(page_id, page)
+        self.page_id = page_id
+        self.page = page
+        self.pin_count = 0
+        self.dirty = False
+        self.referenced = True
+
+
+class BufferPool:
+    """
+    Buffer pool berisi maksimal `capacity` page (block tabel ataupun node index).
+    Page yang sedang dipakai di-pin biar tidak dievict, page yang diubah ditandai dirty
+    dan baru ditulis ke file saat dievict atau saat flush.
+    Eviction pakai algoritma clock (second chance).
+    """
+    def __init__(self, capacity:int = 1024) -> None:
+        if capacity < 1:
+            raise ValueError("Kapasitas buffer pool minimal 1 page")
+        self.capacity = capacity
+        self.frames = OrderedDict()  # urutan frames = urutan jarum clock
+        self.dirty = set()  # key frame yang dirty, biar flush tidak perlu nyisir semua frame
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(file, page_id:int) -> tuple:
+        return (file.path, page_id)
+
+    def fetch(self, file, page_id:int):
+        """
+        ngambil page (dibaca dari file kalau belum ada di pool) dan nge-pin page tersebut.
+        setiap fetch harus dipasangkan dengan unpin
+        """
+        with self._lock:
+            key = BufferPool._key(file, page_id)
+            frame = self.frames.get(key)
+            if frame is None:
+                self.misses += 1
+                self._make_room()
+                frame = Frame(file, page_id, file.read_block(page_id))
+                self.frames[key] = frame
+            else:
+                self.hits += 1
+                frame.referenced = True
+            frame.pin_count += 1
+            return frame.page
+
+    def unpin(self, file, page_id:int, dirty:bool = False) -> None:
+        with self._lock:
+            frame = self.frames[BufferPool._key(file, page_id)]
+            if frame.pin_count > 0:
+                frame.pin_count -= 1
+            if dirty:
+                self._set_dirty(frame)
+
+    def put(self, file, page_id:int, page, dirty:bool = True) -> None:
+        """
+        ngeganti isi page di pool (misal hasil commit), page tidak di-pin
+        """
+        with self._lock:
+            key = BufferPool._key(file, page_id)
+            frame = self.frames.get(key)
+            if frame is None:
+                self._make_room()
+                frame = Frame(file, page_id, page)
+                self.frames[key] = frame
+            else:
+                frame.page = page
+                frame.referenced = True
+            if dirty:
+                self._set_dirty(frame)
+
+    def mark_dirty(self, file, page_id:int) -> None:
+        with self._lock:
+            self._set_dirty(self.frames[BufferPool._key(file, page_id)])
+
+    def _set_dirty(self, frame:Frame) -> None:
+        frame.dirty = True
+        self.dirty.add(BufferPool._key(frame.file, frame.page_id))
+
+    def is_cached(self, file, page_id:int) -> bool:
+        return BufferPool._key(file, page_id) in self.frames
+
+    def flush(self, file = None) -> int:
+        """
+        nulis semua page dirty (atau hanya milik file tertentu) ke file masing-masing,
+        mengembalikan jumlah page yang ditulis
+        """
+        with self._lock:
+            written = 0
+            # urut per file lalu page_id biar penulisannya sekuensial
+            for key in sorted(self.dirty):
+                frame = self.frames[key]
+                if file is None or frame.file is file:
+                    frame.file.write_block(frame.page_id, frame.page)
+                    frame.dirty = False
+                    self.dirty.discard(key)
+                    written += 1
+            return written
+
+    def discard(self, file, from_page:int = 0) -> None:
+        """
+        buang page milik file mulai dari page ke-from_page tanpa ditulis (misal setelah truncate)
+        """
+        with self._lock:
+            for key in [key for key, frame in self.frames.items() if frame.file is file and frame.page_id >= from_page]:
+                del self.frames[key]
+                self.dirty.discard(key)
+
+    def _make_room(self) -> None:
+        if len(self.frames) < self.capacity:
+            return
+        # jarum clock jalan dari depan: page yang masih referenced dikasih kesempatan kedua (pindah ke belakang)
+        for _ in range(2 * len(self.frames)):
+            key, frame = next(iter(self.frames.items()))
+            if frame.pin_count > 0 or frame.referenced:
+                frame.referenced = False
+                self.frames.move_to_end(key)
+                continue
+            if frame.dirty:
+                frame.file.write_block(frame.page_id, frame.page)
+                self.dirty.discard(key)
+            del self.frames[key]
+            return
+        raise RuntimeError("Buffer pool penuh, semua page sedang di-pin")
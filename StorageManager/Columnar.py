@@ -0,0 +1,267 @@
+import sys
+import struct
+import pickle
+import operator
+from array import array
+from .Record import Record, Schema
+
+try:
+    import numpy as np
+except ImportError:  # numpy opsional, tanpa numpy kolom angka disimpan pakai modul array bawaan
+    np = None
+
+# kind kolom : kode untuk page, typecode array, dtype numpy
+_NUMERIC = {"int": (1, "q", "<i8"), "float": (2, "d", "<f8")}
+_KIND_CODE = {"int": 1, "float": 2, "str": 3, "object": 4}
+_CODE_KIND = {code: kind for kind, code in _KIND_CODE.items()}
+
+# operator perbandingan Condition ("!" diperlakukan seperti "<=", sama dengan Condition.evaluate)
+OPERATORS = {"=": operator.eq, "<>": operator.ne, ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le, "!": operator.le}
+
+_HEADER = struct.Struct("<BB")  # kind, ada null atau tidak
+_COUNT = struct.Struct("<H")
+_LEN = struct.Struct("<I")
+
+
+def column_kind(column_type:str) -> str:
+    """kind penyimpanan kolom berdasarkan tipe di create_table"""
+    if column_type == "INTEGER":
+        return "int"
+    if column_type == "FLOAT":
+        return "float"
+    if "CHAR" in column_type or column_type == "TEXT":
+        return "str"
+    return "object"
+
+
+def _numeric_array(kind:str, values:list):
+    _, typecode, dtype = _NUMERIC[kind]
+    if np is not None:
+        return np.array(values, dtype=dtype)
+    return array(typecode, values)
+
+
+def _numeric_from_bytes(kind:str, data:bytes):
+    _, typecode, dtype = _NUMERIC[kind]
+    if np is not None:
+        return np.frombuffer(data, dtype=dtype)
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _numeric_to_bytes(kind:str, values) -> bytes:
+    if np is not None:
+        return np.asarray(values, dtype=_NUMERIC[kind][2]).tobytes()
+    values = array(_NUMERIC[kind][1], values)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+class Column:
+    def __init__(self, kind:str, values, nulls:frozenset = frozenset(), data:bytes = b"") -> None:
+        """
+        Satu kolom di dalam ColumnBlock.
+        int/float : values berupa array numpy (atau array bawaan), posisi null dicatat di nulls
+        str       : values berupa offset (panjang n+1) ke dalam data (utf-8 semua nilai disambung)
+        object    : values berupa list biasa (fallback kalau ada nilai yang tidak cocok tipenya)
+        """
+        self.kind = kind
+        self.values = values
+        self.nulls = nulls
+        self.data = data
+
+    def __len__(self) -> int:
+        if self.kind == "str":
+            return len(self.values) - 1
+        return len(self.values)
+
+    def get(self, offset:int):
+        if offset in self.nulls:
+            return None
+        if self.kind == "str":
+            return self.data[self.values[offset]:self.values[offset + 1]].decode("utf-8")
+        if self.kind == "object":
+            return self.values[offset]
+        return self.values[offset].item() if np is not None else self.values[offset]
+
+    def to_list(self) -> list:
+        if self.kind == "object":
+            return list(self.values)
+        if self.kind == "str":
+            result = [self.get(offset) for offset in range(len(self))]
+        else:
+            result = self.values.tolist()
+        for offset in self.nulls:
+            result[offset] = None
+        return result
+
+    @staticmethod
+    def from_values(kind:str, values:list) -> "Column":
+        nulls = frozenset(offset for offset, value in enumerate(values) if value is None)
+        if kind == "int" and all(type(value) is int and -2**63 <= value < 2**63 for value in values if value is not None):
+            return Column(kind, _numeric_array(kind, [0 if value is None else value for value in values]), nulls)
+        if kind == "float" and all(type(value) in (int, float) for value in values if value is not None):
+            return Column(kind, _numeric_array(kind, [0.0 if value is None else float(value) for value in values]), nulls)
+        if kind == "str" and all(type(value) is str for value in values if value is not None):
+            encoded = [b"" if value is None else value.encode("utf-8") for value in values]
+            offsets = array("I", [0])
+            for item in encoded:
+                offsets.append(offsets[-1] + len(item))
+            return Column(kind, offsets, nulls, b"".join(encoded))
+        return Column("object", list(values))
+
+
+class ColumnBlock:
+    def __init__(self, columns:list[str], data:dict[str, Column], length:int) -> None:
+        """
+        Block tabel dengan layout kolom (dipilih lewat create_table(..., layout="columnar")).
+        Dari luar tetap kelihatan seperti list record: len(), iterasi dan block[offset] menghasilkan Record.
+        Isinya tidak diubah in-place, transaksi yang mengubah block bekerja di salinan list record-nya.
+        """
+        self.columns = columns
+        self.schema = Schema.of(columns)
+        self.data = data
+        self.length = length
+
+    @staticmethod
+    def from_rows(rows:list[Record], columns:list[str], kinds:dict[str, str]) -> "ColumnBlock":
+        # kolom yang tidak ada di record dianggap None
+        data = {column: Column.from_values(kinds[column], [row.get(column) for row in rows]) for column in columns}
+        return ColumnBlock(columns, data, len(rows))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, offset:int) -> Record:
+        if offset < 0:
+            offset += self.length
+        if not 0 <= offset < self.length:
+            raise IndexError("offset di luar block")
+        return Record(self.schema, tuple(self.data[column].get(offset) for column in self.columns))
+
+    def __iter__(self):
+        return self.iter_rows()
+
+    def column(self, name:str) -> Column:
+        return self.data[name]
+
+    def iter_rows(self, columns:list[str] = None, offsets:list[int] = None):
+        """
+        record per baris, cukup kolom yang diminta saja yang dibentuk (None = semua kolom)
+        dan kalau offsets diisi cukup baris di offset tersebut saja
+        """
+        columns = self.columns if columns is None else [column for column in self.columns if column in columns]
+        schema = Schema.of(columns)
+        if offsets is not None:
+            for offset in offsets:
+                yield Record(schema, tuple(self.data[column].get(offset) for column in columns))
+            return
+        values = [self.data[column].to_list() for column in columns]
+        for row in zip(*values) if values else (() for _ in range(self.length)):
+            yield Record(schema, row)
+
+
+def column_mask(column:Column, operation:str, operand) -> list[bool]:
+    """
+    membandingkan seluruh nilai satu kolom dengan operand sekaligus.
+    kolom angka dibandingkan pakai numpy (hasilnya array bool), selain itu pakai loop biasa.
+    nilai NULL tidak memenuhi kondisi apa pun
+    """
+    compare = OPERATORS[operation]
+    if np is not None and column.kind in _NUMERIC and type(operand) in (int, float):
+        mask = compare(column.values, operand)
+        if column.nulls:
+            mask[list(column.nulls)] = False
+        return mask
+    if column.kind in _NUMERIC:
+        mask = [compare(value, operand) for value in column.values]
+    else:
+        mask = []
+        for value in column.to_list():
+            try:
+                mask.append(value is not None and compare(value, operand))
+            except TypeError:
+                mask.append(False)
+    for offset in column.nulls:
+        mask[offset] = False
+    return mask
+
+
+def combine_masks(left, right, any_of:bool = False):
+    """AND (atau OR kalau any_of) dua mask"""
+    if np is not None and (isinstance(left, np.ndarray) or isinstance(right, np.ndarray)):
+        return np.logical_or(left, right) if any_of else np.logical_and(left, right)
+    if any_of:
+        return [a or b for a, b in zip(left, right)]
+    return [a and b for a, b in zip(left, right)]
+
+
+def selected_offsets(mask) -> list[int]:
+    """offset-offset yang bernilai True di mask"""
+    if np is not None and isinstance(mask, np.ndarray):
+        return np.flatnonzero(mask).tolist()
+    return [offset for offset, hit in enumerate(mask) if hit]
+
+
+def encode_column_block(block:ColumnBlock) -> bytes:
+    out = bytearray(_COUNT.pack(block.length))
+    for name in block.columns:
+        column = block.data[name]
+        out += _HEADER.pack(_KIND_CODE[column.kind], 1 if column.nulls else 0)
+        if column.nulls:
+            bitmap = bytearray((block.length + 7) // 8)
+            for offset in column.nulls:
+                bitmap[offset // 8] |= 1 << (offset % 8)
+            out += bitmap
+        if column.kind in _NUMERIC:
+            out += _numeric_to_bytes(column.kind, column.values)
+        elif column.kind == "str":
+            offsets = array("I", column.values)
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            out += offsets.tobytes()
+            out += column.data
+        else:
+            data = pickle.dumps(column.values)
+            out += _LEN.pack(len(data))
+            out += data
+    return bytes(out)
+
+
+def decode_column_block(payload, columns:list[str]) -> ColumnBlock:
+    payload = memoryview(payload)
+    length = _COUNT.unpack_from(payload, 0)[0]
+    position = _COUNT.size
+    data = {}
+    for name in columns:
+        code, has_nulls = _HEADER.unpack_from(payload, position)
+        position += _HEADER.size
+        kind = _CODE_KIND[code]
+        nulls = frozenset()
+        if has_nulls:
+            size = (length + 7) // 8
+            bitmap = payload[position:position + size]
+            nulls = frozenset(offset for offset in range(length) if bitmap[offset // 8] & (1 << (offset % 8)))
+            position += size
+        if kind in _NUMERIC:
+            size = 8 * length
+            data[name] = Column(kind, _numeric_from_bytes(kind, bytes(payload[position:position + size])), nulls)
+            position += size
+        elif kind == "str":
+            offsets = array("I")
+            offsets.frombytes(payload[position:position + 4 * (length + 1)])
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            position += 4 * (length + 1)
+            data[name] = Column(kind, offsets, nulls, bytes(payload[position:position + offsets[-1]]))
+            position += offsets[-1]
+        else:
+            size = _LEN.unpack_from(payload, position)[0]
+            position += _LEN.size
+            data[name] = Column(kind, pickle.loads(payload[position:position + size]))
+            position += size
+    return ColumnBlock(columns, data, length)
@@ -0,0 +1,65 @@
+from itertools import islice
+
+class Cursor:
+    def __init__(self, rows, identifier:str, on_close = None) -> None:
+        """
+        Hasil read yang dibaca sedikit-sedikit (lihat StorageEngine.open_cursor), record baru dibaca dari block saat diminta.
+        Bisa diiterasi per record atau diambil per batch (fetch / batches), dan harus ditutup (close atau with)
+        kalau tidak dibaca sampai habis, biar page yang sedang dipin dan mmap-nya dilepas.
+        on_close : fungsi tanpa argumen yang dipanggil sekali saat cursor ditutup.
+        identifier dan hash-nya sama dengan Rows hasil read_block, jadi bisa langsung divalidasi concurrency control.
+        """
+        self.rows = rows
+        self.identifier = identifier
+        self.hash = hash(identifier)
+        self.on_close = on_close
+        self.closed = False
+        self.rows_read = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.closed:
+            raise StopIteration
+        try:
+            row = next(self.rows)
+        except StopIteration:
+            self.close()
+            raise
+        self.rows_read += 1
+        return row
+
+    def fetch(self, n:int) -> list:
+        """ambil paling banyak n record berikutnya, list kosong kalau sudah habis"""
+        return list(islice(self, n))
+
+    def batches(self, size:int):
+        """ngeiterasi sisa record per batch berisi paling banyak size record"""
+        while True:
+            batch = self.fetch(size)
+            if not batch:
+                return
+            yield batch
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        close = getattr(self.rows, "close", None)
+        if close is not None:
+            close()
+        if self.on_close is not None:
+            self.on_close()
+
+    def __enter__(self) -> "Cursor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        return self.__hash__() == other.__hash__()
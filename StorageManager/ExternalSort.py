@@ -0,0 +1,49 @@
+import heapq
+import pickle
+import tempfile
+from itertools import islice
+
+# banyak item per pickle di dalam file run, biar run bisa dibaca ulang sedikit-sedikit
+_BATCH = 4096
+
+
+def _write_run(items:list):
+    run = tempfile.TemporaryFile()
+    for start in range(0, len(items), _BATCH):
+        pickle.dump(items[start:start + _BATCH], run, protocol=pickle.HIGHEST_PROTOCOL)
+    run.seek(0)
+    return run
+
+
+def _read_run(run):
+    while True:
+        try:
+            batch = pickle.load(run)
+        except EOFError:
+            return
+        yield from batch
+
+
+def external_sort(items, key=None, run_size:int = 100_000):
+    """
+    Mengurutkan items yang bisa jadi tidak muat di memori : items dipotong per run_size item,
+    tiap run diurutkan lalu ditulis ke file sementara, kemudian semua run digabung (k-way merge).
+    Kalau semua item muat dalam satu run tidak ada file yang ditulis. Urutan item dengan key sama tetap (stabil).
+    """
+    items = iter(items)
+    first = sorted(islice(items, run_size), key=key)
+    if len(first) < run_size:
+        yield from first
+        return
+    runs = [_write_run(first)]
+    del first
+    try:
+        while True:
+            chunk = sorted(islice(items, run_size), key=key)
+            if not chunk:
+                break
+            runs.append(_write_run(chunk))
+        yield from heapq.merge(*(_read_run(run) for run in runs), key=key)
+    finally:
+        for run in runs:
+            run.close()
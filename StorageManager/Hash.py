@@ -1,93 +1,249 @@
+import math
+import os
+from .HeapFile import NO_PAGE, PAGE_CAPACITY
+from .HyperLogLog import value_hash
+from .NodeStore import MemoryNodeStore, NodeFile, PagedNodeStore
+
+# rough size of one bucket entry besides its key (cached hash, list of record positions plus pickle overhead) and of one bucket
+ENTRY_OVERHEAD = 34
+BUCKET_OVERHEAD = 64
+# buckets stop splitting at this depth (bounding the directory at 2^MAX_DEPTH slots), keys whose hashes agree on
+# every bit up to here just share an overflowing bucket
+MAX_DEPTH = 24
+
+
+def bucket_capacity_for_page(key_width:int, page_size:int = PAGE_CAPACITY) -> int:
+    # number of keys that fit in one page-sized bucket for keys of key_width bytes
+    return max(4, (page_size - BUCKET_OVERHEAD) // (key_width + ENTRY_OVERHEAD))
+
+
+class HashBucket:
+    __slots__ = ("page_id", "local_depth", "hashes", "keys", "values")
+
+    def __init__(self, local_depth):
+        self.page_id = NO_PAGE  # Page id of this bucket, set by the node store
+        self.local_depth = local_depth  # Number of low hash bits shared by every key in this bucket
+        self.hashes = []  # Hash of each key, computed once on insert
+        self.keys = []  # The keys stored in the bucket
+        self.values = []  # List of values (record positions) for each key
+
+    def find(self, key, hashed):
+        # position of key (whose hash is hashed) in this bucket, None when it is missing
+        # only keys with the same hash are compared, the hash scan itself runs in C
+        hashes = self.hashes
+        i = -1
+        while True:
+            try:
+                i = hashes.index(hashed, i + 1)
+            except ValueError:
+                return None
+            if self.keys[i] == key:
+                return i
+
+    def append(self, hashed, key, values):
+        self.hashes.append(hashed)
+        self.keys.append(key)
+        self.values.append(values)
+
+    def pop(self, index):
+        # remove the entry at index and return its values
+        self.hashes.pop(index)
+        self.keys.pop(index)
+        return self.values.pop(index)
+
+
+class BucketFile(NodeFile):
+    """
+    Page file of a hash index, one bucket per page. The META_PAGE page holds the directory.
+    """
+    def decode_node(self, page_id:int, data):
+        bucket = HashBucket(data[0])
+        bucket.page_id = page_id
+        bucket.hashes, bucket.keys, bucket.values = data[1], data[2], data[3]
+        return bucket
+
+    def encode_node(self, bucket):
+        return (bucket.local_depth, bucket.hashes, bucket.keys, bucket.values)
+
+
+class BucketStore(PagedNodeStore):
+    """
+    On-disk node store of a hash index (see NodeStore.PagedNodeStore), buckets are kept in a BucketFile.
+    """
+    file_class = BucketFile
+
+
 class HashTable:
-    def __init__(self, size=10):
-        self.size = size
-        self.table = [[] for _ in range(size)]
+    """
+    Hash index with extendible hashing. A directory of 2^global_depth slots points to buckets;
+    a bucket with local depth d holds the keys whose hashes share their lowest d bits, so several slots can share a bucket.
+    A full bucket is split in two (doubling the directory when its local depth equals the global depth),
+    so a lookup is one directory probe plus one bucket read at any table size.
+    Buckets live in a node store: in memory by default, or one page each in a BucketStore.
+    Keys are hashed with a seeded blake2b once, on insert; the hash is kept next to the key in its bucket,
+    so splits never rehash and lookups compare hashes before keys.
+    """
+    def __init__(self, size=10, bucket_capacity=None, store=None, seed=None):
+        self.bucket_capacity = bucket_capacity or bucket_capacity_for_page(8)
+        self.store = store if store is not None else MemoryNodeStore()
+        if not self.store.meta:
+            # start with at least size buckets, rounded up to a power of two
+            depth = math.ceil(math.log2(size)) if size > 1 else 0
+            directory = [self.store.add(HashBucket(depth)) for _ in range(1 << depth)]
+            # the seed is drawn per index and stored with the directory, so key placement stays stable on disk
+            self.store.meta = {"global_depth": depth, "directory": directory, "seed": seed if seed is not None else os.urandom(8)}
+            self.store.release()
+        self.seed = self.store.meta["seed"]
+
+    def __setstate__(self, state):
+        if "table" in state:
+            # old fixed-size table (list of [key, values] lists per bucket), rebuilt with extendible hashing
+            self.__init__()
+            for bucket in state["table"]:
+                for key, values in bucket:
+                    for value in values:
+                        self.insert(key, value)
+            return
+        self.__dict__.update(state)
+
+    @property
+    def global_depth(self):
+        return self.store.meta["global_depth"]
+
+    @property
+    def size(self):
+        # number of directory slots
+        return len(self.store.meta["directory"])
 
     def hash_function(self, key):
-        if type(key) is int or type(key) is float:
-            return round(key % self.size)
-        else :
-            # DJB2 algorithm for String Hashing
-            hash_value = 5381
-            for char in key:
-                hash_value = ((hash_value << 5) + hash_value) + ord(char)  # hash_value * 33 + ord(char)
-            # print("hash_value of", key, "is", hash_value)
-        return hash_value % self.size
-    
+        # stable 64 bit hash of the key (it decides where keys live on disk, so Python's per-process str hash won't do),
+        # seeded per index so one index's collisions say nothing about another's
+        return value_hash(key, self.seed)
+
+    def _bucket(self, hashed):
+        meta = self.store.meta
+        return self.store.get(meta["directory"][hashed & ((1 << meta["global_depth"]) - 1)])
+
     def insert(self, key, value):
         # insert a key-value pair into the hash table
-        index = self.hash_function(key)
-        # print("index", index)
-        # print("value inserted:",value)
-        # print(index)
-        for i, pair in enumerate(self.table[index]):
-            if pair[0] == key:
-                if pair[1].count(value) == 0:
-                    self.table[index][i][1].append(value)
-                    return
-                else :
-                    raise ValueError("Key-Value already exists in hash table.")
-        self.table[index].append([key, [value]])
+        hashed = self.hash_function(key)
+        try:
+            while True:
+                bucket = self._bucket(hashed)
+                index = bucket.find(key, hashed)
+                if index is not None:
+                    if value in bucket.values[index]:
+                        raise ValueError("Key-Value already exists in hash table.")
+                    bucket.values[index].append(value)
+                    break
+                if len(bucket.keys) < self.bucket_capacity or bucket.local_depth >= MAX_DEPTH or self._same_hash(bucket, hashed):
+                    bucket.append(hashed, key, [value])
+                    break
+                self._split(bucket, hashed)
+            self.store.mark_dirty(bucket)
+        finally:
+            self.store.release()
+
+    def _same_hash(self, bucket, hashed):
+        # splitting never separates keys with equal hashes
+        return bucket.hashes.count(hashed) == len(bucket.hashes)
+
+    def _split(self, bucket, hashed):
+        # split a full bucket on its next hash bit, hashed is the hash of any key that maps to the bucket
+        meta = self.store.meta
+        directory = meta["directory"]
+        if bucket.local_depth == meta["global_depth"]:
+            directory.extend(list(directory))
+            meta["global_depth"] += 1
+        bit = 1 << bucket.local_depth
+        bucket.local_depth += 1
+        sibling = HashBucket(bucket.local_depth)
+        entries = zip(bucket.hashes, bucket.keys, bucket.values)
+        bucket.hashes, bucket.keys, bucket.values = [], [], []
+        for key_hash, key, positions in entries:
+            (sibling if key_hash & bit else bucket).append(key_hash, key, positions)
+        self.store.add(sibling)
+        self.store.mark_dirty(bucket)
+        # slots that pointed to the bucket and have the new bit set now point to the sibling
+        for slot in range((hashed & (bit - 1)) | bit, len(directory), bit << 1):
+            directory[slot] = sibling.page_id
+        self.store.meta = meta
 
     def search(self, key):
         # search for a key in the hash table and return its value (list of value(s) which has (have) the searched key)
-        # print("self table =", self.table)
-        # print()
-        index = self.hash_function(key)
-        # print(index)
-        # print(self.table[index])
-        for pair in self.table[index]:
-            # print(pair)
-            if pair[0] == key:
-                return pair[1]
-        print("Key not found in hash table.")  # key not found
+        values = self.get(key)
+        if values is None:
+            print("Key not found in hash table.")  # key not found
+        return values
+
+    def get(self, key, default=None):
+        # like search, but returns default instead of printing when the key is missing
+        hashed = self.hash_function(key)
+        try:
+            bucket = self._bucket(hashed)
+            index = bucket.find(key, hashed)
+            return list(bucket.values[index]) if index is not None else default
+        finally:
+            self.store.release()
+
+    def remove(self, key, value):
+        # like delete_key_value, but silent and does nothing when the pair is missing
+        hashed = self.hash_function(key)
+        try:
+            bucket = self._bucket(hashed)
+            index = bucket.find(key, hashed)
+            if index is None:
+                return
+            if value in bucket.values[index]:
+                bucket.values[index].remove(value)
+            if not bucket.values[index]:
+                bucket.pop(index)
+            self.store.mark_dirty(bucket)
+        finally:
+            self.store.release()
 
     def delete(self, key, value):
         # delete a key-value pair from the hash table.
-        bucket = self.hash_function(key)
-        for i, pair in enumerate(self.table[bucket]):
-            if pair[0] == key:
-                if pair[1].count(value) > 0:
-                    self.table[bucket][i][1].remove(value)
-                if len(self.table[bucket][i][1]) == 0:
-                    self.table[bucket].remove(pair)
-                print("Delete success")
-                return
-        raise ValueError("Key not found in hash table.")  # key not found
+        return self.delete_key_value(key, value)
 
     def delete_key_value(self, key, value):
         # delete a key-value pair from the hash table.
-        bucket = self.hash_function(key)
-        for i, pair in enumerate(self.table[bucket]):
-            if pair[0] == key:
-                if pair[1].count(value) > 0:
-                    self.table[bucket][i][1].remove(value)
-                if len(self.table[bucket][i][1]) == 0:
-                    self.table[bucket].remove(pair)
-                print("Delete success")
-                return
-        raise ValueError("Key not found in hash table.")  # key not found
-    
+        if self.get(key) is None:
+            raise ValueError("Key not found in hash table.")  # key not found
+        self.remove(key, value)
+        print("Delete success")
+
     def delete_key(self, key):
         # delete a key from the hash table.
-        bucket = self.hash_function(key)
-        for i, pair in enumerate(self.table[bucket]):
-            if pair[0] == key:
-                removed_value = pair[1]
-                self.table[bucket].remove(pair)
-                print("Delete success")
-                return removed_value
-        raise ValueError("Key not found in hash table.")
-    
+        hashed = self.hash_function(key)
+        try:
+            bucket = self._bucket(hashed)
+            index = bucket.find(key, hashed)
+            if index is None:
+                raise ValueError("Key not found in hash table.")
+            removed_value = bucket.pop(index)
+            self.store.mark_dirty(bucket)
+            print("Delete success")
+            return removed_value
+        finally:
+            self.store.release()
+
     def print_table(self):
-        for i, bucket in enumerate(self.table):
-            print(f"Bucket {i}: {bucket}")      
-    
+        # buckets shared by several directory slots are printed once, under their first slot
+        seen = set()
+        for i, page_id in enumerate(self.store.meta["directory"]):
+            if page_id in seen:
+                continue
+            seen.add(page_id)
+            bucket = self.store.get(page_id)
+            print(f"Bucket {i} (depth {bucket.local_depth}): {[[key, values] for key, values in zip(bucket.keys, bucket.values)]}")
+            self.store.release()
+
 def test_hash_table_with_visualization():
     print("Testing HashTable with Visualization...")
 
-    # Create a hash table of size 10
-    hash_table = HashTable(size=10)
+    # Create a hash table with 2 buckets and room for 2 keys per bucket, so it has to split
+    hash_table = HashTable(size=2, bucket_capacity=2)
 
     print("hasil hash 'alice' :", hash_table.hash_function("alice"))
     print("hasil hash 15 :", hash_table.hash_function(15))
@@ -97,16 +253,10 @@ def test_hash_table_with_visualization():
     hash_table.insert("Physics",(2,1))
     hash_table.insert("Physics",(3,5))
     hash_table.insert("Biology",(3,1))
-    hash_table.insert("Sicysph",(5,2)) 
+    hash_table.insert("Sicysph",(5,2))
     print("\nHash table after insertion:")
     print("Hash table size :", hash_table.size)
     hash_table.print_table()
-    
-
-    # Delete a key
-    # hash_table.delete(5)
-    print("\nHash table after deleting key 5:")
-    hash_table.print_table()
 
     # Update a key
     hash_table.insert(15, (8,7))
@@ -114,15 +264,10 @@ def test_hash_table_with_visualization():
     hash_table.print_table()
 
     # Test search functionality
-    print("\nSearching for key 15:", hash_table.search("Biology"))  # Expected: "(3, 1)"
-    # print("Searching for key 25:", hash_table.search(26))  # Expected: "Bob"
-    # print("Searching for key 35:", hash_table.search(35))  # Expected: "Charlie"
-    # print("Searching for non-existing key 45:", hash_table.search(45))  # Expected: None
-    print("\nHash raw print:")
-    print(hash_table.table)
+    print("\nSearching for key Biology:", hash_table.search("Biology"))  # Expected: "[(3, 1)]"
 
     print("\nTesting completed.")
 
 # Run the test
 if __name__ == "__main__":
-    test_hash_table_with_visualization()
\ No newline at end of file
+    test_hash_table_with_visualization()
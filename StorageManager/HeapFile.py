@@ -0,0 +1,437 @@
+import os
+import mmap
+import struct
+import pickle
+import threading
+import zlib
+from .Columnar import ColumnBlock, encode_column_block, decode_column_block
+from .Record import Record, Schema, MISSING
+
+# 1 page = 1 block, sama dengan asumsi create_table waktu ngitung max_record
+PAGE_SIZE = 4096
+
+# header tiap page : panjang payload di page ini, flags, page lanjutan (-1 = tidak ada)
+PAGE_HEADER = struct.Struct("<HHi")
+PAGE_CAPACITY = PAGE_SIZE - PAGE_HEADER.size
+NO_PAGE = -1
+# flags page : isi block disimpan per kolom (ColumnBlock), bukan per record
+FLAG_COLUMNAR = 1
+# flags page : payload dikompresi zlib (hanya kalau hasilnya lebih kecil), di-decompress waktu block dibaca
+FLAG_COMPRESSED = 2
+# metode kompresi page heap file yang dikenal, level zlib rendah karena page ditulis ulang tiap evict/flush
+COMPRESSION_METHODS = ("zlib",)
+ZLIB_LEVEL = 1
+
+# header file PageFile (disimpan di page 0) : magic, jumlah page, awal free list
+FILE_HEADER = struct.Struct("<4sii")
+FILE_MAGIC = b"PGSQ"
+
+# tag untuk encoding nilai di dalam record
+_TAG_MISSING = 0  # kolom tidak ada di record
+_TAG_NONE = 1
+_TAG_INT = 2
+_TAG_BIGINT = 3
+_TAG_FLOAT = 4
+_TAG_STR = 5
+_TAG_OBJECT = 6  # fallback pickle untuk tipe lain
+
+_COUNT = struct.Struct("<H")
+_INT = struct.Struct("<i")
+_BIGINT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_LEN = struct.Struct("<I")
+_MISSING = MISSING
+
+
+def encode_value(value, out:bytearray) -> None:
+    value_type = type(value)
+    if value_type is int and -2**31 <= value < 2**31:
+        out.append(_TAG_INT)
+        out += _INT.pack(value)
+    elif value_type is int and -2**63 <= value < 2**63:
+        out.append(_TAG_BIGINT)
+        out += _BIGINT.pack(value)
+    elif value_type is float:
+        out.append(_TAG_FLOAT)
+        out += _FLOAT.pack(value)
+    elif value_type is str:
+        data = value.encode("utf-8")
+        out.append(_TAG_STR)
+        out += _LEN.pack(len(data))
+        out += data
+    elif value is None:
+        out.append(_TAG_NONE)
+    elif value is _MISSING:
+        out.append(_TAG_MISSING)
+    else:
+        data = pickle.dumps(value)
+        out.append(_TAG_OBJECT)
+        out += _LEN.pack(len(data))
+        out += data
+
+
+def value_size(column_type:str, columnar:bool = False) -> int:
+    """
+    ukuran encoding terbesar satu nilai kolom bertipe column_type (tipe create_table), string dianggap sepanjang batas
+    VARCHAR/CHAR-nya (1 byte per karakter). layout row : tag + nilai, layout columnar : int64/float64 atau offset string + isinya
+    """
+    if column_type in ("INTEGER", "FLOAT"):
+        if columnar:
+            return _BIGINT.size
+        return 1 + (_INT.size if column_type == "INTEGER" else _FLOAT.size)
+    if "CHAR" in column_type:
+        length = 1 if column_type == "CHAR" else int(column_type[column_type.index("(") + 1:-1])
+        return _LEN.size + length + (0 if columnar else 1)
+    raise ValueError(f"Ada tipe bentukan yang tidak cocok, {column_type}")
+
+
+def records_per_page(column_types:list[str], columnar:bool = False) -> int:
+    """
+    jumlah record terbanyak yang encoding-nya pasti muat di satu page tanpa overflow chain (dipakai untuk max_record tabel).
+    block columnar juga menyimpan header tiap kolom, offset awal kolom string, dan bitmap NULL 1 bit per record per kolom
+    """
+    available = PAGE_CAPACITY - _COUNT.size
+    per_record = max(1, sum(value_size(column_type, columnar) for column_type in column_types))
+    if not columnar:
+        return max(1, available // per_record)
+    # header (kind, ada null) 2 byte + offset awal string + 1 byte sisa pembulatan bitmap, per kolom
+    available -= sum(2 + (_LEN.size if "CHAR" in column_type else 0) + 1 for column_type in column_types)
+    return max(1, available * 8 // (per_record * 8 + len(column_types)))
+
+
+def decode_value(payload, offset:int):
+    """mengembalikan (nilai, offset berikutnya)"""
+    tag = payload[offset]
+    offset += 1
+    if tag == _TAG_INT:
+        return _INT.unpack_from(payload, offset)[0], offset + 4
+    if tag == _TAG_BIGINT:
+        return _BIGINT.unpack_from(payload, offset)[0], offset + 8
+    if tag == _TAG_FLOAT:
+        return _FLOAT.unpack_from(payload, offset)[0], offset + 8
+    if tag == _TAG_STR or tag == _TAG_OBJECT:
+        length = _LEN.unpack_from(payload, offset)[0]
+        offset += 4
+        data = bytes(payload[offset:offset + length])
+        if tag == _TAG_STR:
+            return data.decode("utf-8"), offset + length
+        return pickle.loads(data), offset + length
+    if tag == _TAG_NONE:
+        return None, offset
+    if tag == _TAG_MISSING:
+        return _MISSING, offset
+    raise ValueError(f"Tag nilai tidak dikenal: {tag}")
+
+
+def encode_records(records:list[Record], columns:list[str]) -> bytes:
+    """
+    encode isi satu block jadi bytes, urutan nilai mengikuti columns (nama kolom tidak ikut disimpan)
+    """
+    schema = Schema.of(columns)
+    out = bytearray(_COUNT.pack(len(records)))
+    for record in records:
+        for value in schema.record(record).values:
+            encode_value(value, out)
+    return bytes(out)
+
+
+def decode_records(payload, columns:list[str]) -> list[Record]:
+    schema = Schema.of(columns)
+    count = _COUNT.unpack_from(payload, 0)[0]
+    offset = _COUNT.size
+    records = []
+    n_columns = len(schema.columns)
+    for _ in range(count):
+        values = [None] * n_columns
+        for position in range(n_columns):
+            values[position], offset = decode_value(payload, offset)
+        records.append(Record(schema, tuple(values)))
+    return records
+
+
+class _PagedFile:
+    """
+    dasar untuk file yang isinya page berukuran PAGE_SIZE.
+    payload yang lebih besar dari satu page disambung ke page lanjutan (overflow chain)
+    """
+    def __init__(self, path:str) -> None:
+        self.path = path
+        self._file = None
+        self._lock = threading.RLock()
+
+    def _handle(self):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            mode = "r+b" if os.path.isfile(self.path) else "w+b"
+            self._file = open(self.path, mode)
+        return self._file
+
+    def page_count(self) -> int:
+        if self._file is None and not os.path.isfile(self.path):
+            return 0
+        with self._lock:
+            handle = self._handle()
+            handle.seek(0, os.SEEK_END)
+            return handle.tell() // PAGE_SIZE
+
+    def read_page(self, page_id:int) -> bytes:
+        with self._lock:
+            handle = self._handle()
+            handle.seek(page_id * PAGE_SIZE)
+            data = handle.read(PAGE_SIZE)
+        if len(data) != PAGE_SIZE:
+            raise ValueError(f"Page {page_id} tidak ada di {self.path}")
+        return data
+
+    def write_page(self, page_id:int, data:bytes) -> None:
+        with self._lock:
+            handle = self._handle()
+            handle.seek(page_id * PAGE_SIZE)
+            handle.write(data.ljust(PAGE_SIZE, b"\x00"))
+
+    def _read_payload(self, page_id:int, overflow:"PageFile") -> tuple[bytes, int]:
+        page = self.read_page(page_id)
+        length, flags, next_page = PAGE_HEADER.unpack_from(page, 0)
+        chunks = [page[PAGE_HEADER.size:PAGE_HEADER.size + length]]
+        while next_page != NO_PAGE:
+            page = overflow.read_page(next_page)
+            length, _, next_page = PAGE_HEADER.unpack_from(page, 0)
+            chunks.append(page[PAGE_HEADER.size:PAGE_HEADER.size + length])
+        return b"".join(chunks), flags
+
+    def _write_payload(self, page_id:int, payload:bytes, flags:int, overflow:"PageFile") -> None:
+        chunks = [payload[i:i + PAGE_CAPACITY] for i in range(0, len(payload), PAGE_CAPACITY)] or [b""]
+        # page lanjutan ditulis dari belakang biar pointer next-nya sudah diketahui
+        next_page = NO_PAGE
+        for chunk in reversed(chunks[1:]):
+            overflow_page = overflow.allocate()
+            overflow.write_page(overflow_page, PAGE_HEADER.pack(len(chunk), flags, next_page) + chunk)
+            next_page = overflow_page
+        self.write_page(page_id, PAGE_HEADER.pack(len(chunks[0]), flags, next_page) + chunks[0])
+
+    def _overflow_head(self, page_id:int) -> int:
+        if page_id >= self.page_count():
+            return NO_PAGE
+        return PAGE_HEADER.unpack_from(self.read_page(page_id), 0)[2]
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class PageFile(_PagedFile):
+    """
+    file page dengan alokasi bebas. page 0 adalah header file (magic, jumlah page, awal free list),
+    page yang dibebaskan disambung jadi free list dan dipakai ulang saat allocate
+    """
+    def __init__(self, path:str) -> None:
+        super().__init__(path)
+        self._n_pages = None
+        self._free_head = NO_PAGE
+
+    def _load_header(self) -> None:
+        if self._n_pages is not None:
+            return
+        if self.page_count() == 0:
+            self._n_pages = 1
+            self._free_head = NO_PAGE
+            self._save_header()
+            return
+        magic, n_pages, free_head = FILE_HEADER.unpack_from(self.read_page(0), 0)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{self.path} bukan page file")
+        self._n_pages = n_pages
+        self._free_head = free_head
+
+    def _save_header(self) -> None:
+        self.write_page(0, FILE_HEADER.pack(FILE_MAGIC, self._n_pages, self._free_head))
+
+    def allocate(self) -> int:
+        with self._lock:
+            self._load_header()
+            if self._free_head != NO_PAGE:
+                page_id = self._free_head
+                self._free_head = PAGE_HEADER.unpack_from(self.read_page(page_id), 0)[2]
+                # putus pointer free list-nya biar tidak kebaca sebagai overflow chain
+                self.write_page(page_id, PAGE_HEADER.pack(0, 0, NO_PAGE))
+            else:
+                page_id = self._n_pages
+                self._n_pages += 1
+                # page baru langsung ditulis kosong, page yang belum ditulis terbaca nol (seolah punya page lanjutan 0)
+                self.write_page(page_id, PAGE_HEADER.pack(0, 0, NO_PAGE))
+            self._save_header()
+            return page_id
+
+    def free(self, page_id:int) -> None:
+        with self._lock:
+            self._load_header()
+            self.write_page(page_id, PAGE_HEADER.pack(0, 0, self._free_head))
+            self._free_head = page_id
+            self._save_header()
+
+    def free_chain(self, page_id:int) -> None:
+        while page_id != NO_PAGE:
+            next_page = PAGE_HEADER.unpack_from(self.read_page(page_id), 0)[2]
+            self.free(page_id)
+            page_id = next_page
+
+    def read(self, page_id:int) -> tuple[bytes, int]:
+        return self._read_payload(page_id, self)
+
+    def write(self, page_id:int, payload:bytes, flags:int = 0) -> None:
+        with self._lock:
+            self.free_chain(self._overflow_head(page_id))
+            self._write_payload(page_id, payload, flags, self)
+
+
+class HeapFile(_PagedFile):
+    """
+    heap file satu tabel. block ke-i disimpan di page ke-i file .tbl (jadi baca/tulis satu block = satu page),
+    sisa block yang tidak muat satu page disambung ke overflow chain di file .ovf.
+    kalau column_kinds diisi ({kolom: "int"/"float"/"str"/"object"}), block disimpan dengan layout kolom.
+    kalau compression diisi ("zlib"), payload block dikompresi saat ditulis dan di-decompress saat dibaca
+    (block di buffer pool tetap dalam bentuk biasa), ukuran sebelum dan sesudahnya dicatat di page_bytes
+    """
+    def __init__(self, path:str, columns:list[str], column_kinds:dict[str, str] = None, compression:str = None) -> None:
+        super().__init__(path)
+        if compression is not None and compression not in COMPRESSION_METHODS:
+            raise ValueError(f"Kompresi {compression} tidak dikenal")
+        self.columns = columns
+        self.schema = Schema.of(columns)
+        self.column_kinds = column_kinds
+        self.compression = compression
+        self.page_bytes = {}  # block_index -> (ukuran payload asli, ukuran yang ditulis), hanya untuk heap terkompresi
+        self.overflow = PageFile(os.path.splitext(path)[0] + ".ovf")
+
+    @property
+    def columnar(self) -> bool:
+        return self.column_kinds is not None
+
+    def to_page(self, records):
+        """bentuk block yang disimpan di buffer pool untuk file ini (list Record atau ColumnBlock)"""
+        if self.columnar and not isinstance(records, ColumnBlock):
+            return ColumnBlock.from_rows(records, self.columns, self.column_kinds)
+        if not self.columnar:
+            return [self.schema.record(record) for record in records]
+        return records
+
+    def _encode(self, records) -> tuple[bytes, int]:
+        if self.columnar:
+            return encode_column_block(self.to_page(records)), FLAG_COLUMNAR
+        return encode_records(records, self.columns), 0
+
+    @property
+    def n_blocks(self) -> int:
+        return self.page_count()
+
+    def _compress(self, payload:bytes, flags:int) -> tuple[bytes, int]:
+        if self.compression == "zlib":
+            packed = zlib.compress(payload, ZLIB_LEVEL)
+            if len(packed) < len(payload):
+                return packed, flags | FLAG_COMPRESSED
+        return payload, flags
+
+    def decode(self, payload, flags:int) -> list[Record]|ColumnBlock:
+        """block dari payload page (bytes atau memoryview) beserta flags-nya"""
+        if flags & FLAG_COMPRESSED:
+            payload = zlib.decompress(payload)
+        if flags & FLAG_COLUMNAR:
+            return decode_column_block(payload, self.columns)
+        return decode_records(payload, self.columns)
+
+    def read_block(self, block_index:int) -> list[Record]|ColumnBlock:
+        return self.decode(*self._read_payload(block_index, self.overflow))
+
+    def write_block(self, block_index:int, records:list[Record]|ColumnBlock) -> None:
+        with self._lock:
+            self.overflow.free_chain(self._overflow_head(block_index))
+            # block yang dilewati (kalau ada) diisi page kosong biar posisi page tetap = index block
+            for empty_index in range(self.page_count(), block_index):
+                self._write_payload(empty_index, *self._encode([]), self.overflow)
+            payload, flags = self._encode(records)
+            stored, flags = self._compress(payload, flags)
+            if self.compression is not None:
+                self.page_bytes[block_index] = (len(payload), len(stored))
+            self._write_payload(block_index, stored, flags, self.overflow)
+
+    def compression_ratio(self) -> float:
+        """
+        ukuran total block sebelum dibanding sesudah dikompresi untuk block yang tercatat di page_bytes, 1.0 kalau tidak ada
+        """
+        raw = sum(size for size, _ in self.page_bytes.values())
+        stored = sum(size for _, size in self.page_bytes.values())
+        return raw / stored if stored else 1.0
+
+    def map(self) -> "MappedHeap":
+        """buka heap file lewat mmap untuk scan, jangan lupa close"""
+        return MappedHeap(self)
+
+    def truncate(self, n_blocks:int) -> None:
+        with self._lock:
+            for block_index in range(n_blocks, self.page_count()):
+                self.overflow.free_chain(self._overflow_head(block_index))
+                self.page_bytes.pop(block_index, None)
+            handle = self._handle()
+            handle.truncate(n_blocks * PAGE_SIZE)
+
+    def flush(self) -> None:
+        super().flush()
+        self.overflow.flush()
+
+    def close(self) -> None:
+        super().close()
+        self.overflow.close()
+
+
+class MappedHeap:
+    """
+    pembaca heap file lewat mmap. page dibaca langsung dari page cache OS dan record di-decode dari memoryview
+    buffer hasil map (tanpa read() ke bytes dulu dan tanpa masuk buffer pool), cocok untuk scan tabel besar.
+    block yang punya overflow chain tetap dibaca lewat HeapFile.read_block
+    """
+    def __init__(self, heap:HeapFile) -> None:
+        self.heap = heap
+        self._mmap = None
+        self._view = None
+        with heap._lock:
+            if heap.page_count() == 0:
+                self.size = 0
+                return
+            handle = heap._handle()
+            handle.flush()
+            self.size = os.fstat(handle.fileno()).st_size
+            self._mmap = mmap.mmap(handle.fileno(), self.size, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+    def read_block(self, block_index:int) -> list[Record]|ColumnBlock:
+        start = block_index * PAGE_SIZE
+        if self._view is None or start + PAGE_SIZE > self.size:
+            return self.heap.read_block(block_index)
+        length, flags, next_page = PAGE_HEADER.unpack_from(self._view, start)
+        if next_page != NO_PAGE:
+            return self.heap.read_block(block_index)
+        with self._view[start + PAGE_HEADER.size:start + PAGE_HEADER.size + length] as payload:
+            return self.heap.decode(payload, flags)
+
+    def close(self) -> None:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "MappedHeap":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
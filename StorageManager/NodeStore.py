@@ -0,0 +1,170 @@
+import os
+import pickle
+from abc import ABC, abstractmethod
+from .BufferPool import BufferPool
+from .HeapFile import PageFile, NO_PAGE
+
+# page pertama yang dialokasikan di file index, isinya metadata index (dict, misal page id root B+ tree)
+META_PAGE = 1
+
+
+class MemoryNodeStore:
+    """
+    Node store di memori : node disimpan di dict (page id -> node) dan ikut di-pickle bersama index-nya.
+    Dipakai untuk index yang berdiri sendiri dan index lama di indexes.dat.
+    """
+    def __init__(self):
+        self.nodes = {}
+        self.next_page = 0
+        self.root_id = NO_PAGE
+        self.meta = {}
+
+    def get(self, page_id):
+        return self.nodes[page_id]
+
+    def add(self, node) -> int:
+        node.page_id = self.next_page
+        self.nodes[node.page_id] = node
+        self.next_page += 1
+        return node.page_id
+
+    def mark_dirty(self, node) -> None:
+        pass
+
+    def release_node(self, node) -> None:
+        pass
+
+    def release(self) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+
+class NodeFile(PageFile, ABC):
+    """
+    Page file berisi node index, satu node satu page (node yang kebesaran disambung ke page lanjutan).
+    Page META_PAGE berisi metadata index (dict). Subclass menentukan bentuk node di page lewat encode_node/decode_node.
+    """
+    def read_block(self, page_id:int):
+        payload, _ = self.read(page_id)
+        data = pickle.loads(payload)
+        if isinstance(data, dict):
+            return data
+        return self.decode_node(page_id, data)
+
+    def write_block(self, page_id:int, node) -> None:
+        data = node if isinstance(node, dict) else self.encode_node(node)
+        self.write(page_id, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @abstractmethod
+    def encode_node(self, node):
+        pass
+
+    @abstractmethod
+    def decode_node(self, page_id:int, data):
+        pass
+
+
+class PagedNodeStore:
+    """
+    Node store di disk : node dibaca dari file_class lewat buffer pool saat dibutuhkan, bukan di-load semua.
+    Node yang dipakai satu operasi index tetap di-pin sampai release, node yang diubah ditandai dirty
+    dan baru ditulis ke file saat dievict atau saat flush buffer pool.
+    Yang ikut di-pickle hanya path-nya, buffer pool dipasang ulang lewat attach.
+    """
+    file_class = NodeFile
+
+    def __init__(self, path:str, pool:BufferPool = None):
+        self.path = path
+        self.file = self.file_class(path)
+        self.pool = pool if pool is not None else BufferPool(256)
+        self._pinned = {}  # page id -> [node, dirty]
+        self._meta = None
+        if self.file.page_count() == 0:
+            meta_page = self.file.allocate()
+            assert meta_page == META_PAGE
+            self.meta = {}
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"])
+
+    def __deepcopy__(self, memo):
+        # isi index ada di file, salinannya akan ikut mengubah file yang sama
+        raise TypeError("Index yang disimpan di file tidak bisa di-deepcopy")
+
+    def attach(self, pool:BufferPool) -> None:
+        self.release()
+        self.pool.flush(self.file)
+        self.pool.discard(self.file)
+        self.pool = pool
+
+    @property
+    def meta(self) -> dict:
+        if self._meta is None:
+            self._meta = self.pool.fetch(self.file, META_PAGE)
+            self.pool.unpin(self.file, META_PAGE)
+        return self._meta
+
+    @meta.setter
+    def meta(self, meta:dict) -> None:
+        self._meta = meta
+        self.pool.put(self.file, META_PAGE, meta)
+
+    @property
+    def root_id(self) -> int:
+        return self.meta.get("root", NO_PAGE)
+
+    @root_id.setter
+    def root_id(self, page_id:int) -> None:
+        self.meta = {**self.meta, "root": page_id}
+
+    def get(self, page_id:int):
+        pinned = self._pinned.get(page_id)
+        if pinned is None:
+            pinned = [self.pool.fetch(self.file, page_id), False]
+            self._pinned[page_id] = pinned
+        return pinned[0]
+
+    def add(self, node) -> int:
+        node.page_id = self.file.allocate()
+        self.pool.put(self.file, node.page_id, node)
+        self.pool.fetch(self.file, node.page_id)
+        self._pinned[node.page_id] = [node, True]
+        return node.page_id
+
+    def mark_dirty(self, node) -> None:
+        self._pinned[node.page_id][1] = True
+
+    def release_node(self, node) -> None:
+        """
+        unpin satu node yang sudah selesai dipakai sebelum operasinya selesai
+        """
+        pinned = self._pinned.pop(node.page_id, None)
+        if pinned is not None:
+            self.pool.unpin(self.file, node.page_id, pinned[1])
+
+    def release(self) -> None:
+        """
+        unpin semua node yang dipakai sejak release terakhir
+        """
+        for page_id, (_, dirty) in self._pinned.items():
+            self.pool.unpin(self.file, page_id, dirty)
+        self._pinned.clear()
+
+    def flush(self) -> None:
+        self.pool.flush(self.file)
+        self.file.flush()
+
+    def drop(self) -> None:
+        """
+        buang index beserta file-nya
+        """
+        self._pinned.clear()
+        self.pool.discard(self.file)
+        self.file.close()
+        if os.path.isfile(self.path):
+            os.remove(self.path)
@@ -0,0 +1,155 @@
+from collections.abc import Mapping
+from operator import itemgetter
+
+class _Missing:
+    """penanda kolom yang tidak ada di record (beda dengan kolom yang nilainya None)"""
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __reduce__(self):
+        # di-pickle sebagai referensi ke MISSING, biar tetap objek yang sama setelah di-load
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+def _getter(positions:list[int]):
+    """fungsi pengambil nilai di posisi-posisi tertentu dari tuple, hasilnya selalu tuple"""
+    if len(positions) == 1:
+        position = positions[0]
+        return lambda values: (values[position],)
+    if not positions:
+        return lambda values: ()
+    return itemgetter(*positions)
+
+
+class Schema:
+    """
+    Urutan kolom yang dipakai bersama oleh semua Record sebuah tabel (nama kolom tidak disimpan di tiap record).
+    Schema dengan kolom yang sama selalu objek yang sama (lihat Schema.of), hasil prefix/project/join juga dicache
+    di schema asalnya, jadi operasi per record tinggal ambil posisi di tuple.
+    """
+    _interned = {}
+
+    def __init__(self, columns:tuple[str]) -> None:
+        self.columns = columns
+        self.index = {column: position for position, column in enumerate(columns)}
+        self._derived = {}
+
+    @staticmethod
+    def of(columns) -> "Schema":
+        columns = tuple(columns)
+        schema = Schema._interned.get(columns)
+        if schema is None:
+            schema = Schema._interned.setdefault(columns, Schema(columns))
+        return schema
+
+    def __reduce__(self):
+        return (Schema.of, (self.columns,))
+
+    def __repr__(self) -> str:
+        return f"Schema{self.columns}"
+
+    def record(self, data:Mapping) -> "Record":
+        """bikin Record dari dict, kolom yang tidak ada di data ditandai MISSING"""
+        if isinstance(data, Record) and data.schema is self:
+            return data
+        return Record(self, tuple(data.get(column, MISSING) for column in self.columns))
+
+    def prefixed(self, prefix:str) -> "Schema":
+        key = ("prefix", prefix)
+        if key not in self._derived:
+            self._derived[key] = Schema.of(prefix + column for column in self.columns)
+        return self._derived[key]
+
+    def project(self, columns, keep_order:bool = False) -> tuple["Schema", object]:
+        """
+        schema hasil proyeksi dan fungsi pengambil nilainya, kolom yang tidak ada di schema dilewati.
+        keep_order = True berarti urutan kolom mengikuti schema ini, bukan urutan columns
+        """
+        key = ("project", tuple(columns), keep_order)
+        if key not in self._derived:
+            if keep_order:
+                wanted = set(columns)
+                selected = [column for column in self.columns if column in wanted]
+            else:
+                selected = [column for column in dict.fromkeys(columns) if column in self.index]
+            self._derived[key] = (Schema.of(selected), _getter([self.index[column] for column in selected]))
+        return self._derived[key]
+
+    def join(self, other:"Schema", overwrite:bool = True) -> tuple["Schema", object]:
+        """
+        schema gabungan (kolom schema ini lalu kolom baru dari other) dan fungsi pengambil nilainya dari values kiri + values kanan.
+        kolom yang sama diambil dari other kalau overwrite (seperti dict | dict), kalau tidak dari schema ini
+        """
+        key = ("join", other, overwrite)
+        if key not in self._derived:
+            columns = list(self.columns) + [column for column in other.columns if column not in self.index]
+            positions = []
+            for column in columns:
+                if column in other.index and (overwrite or column not in self.index):
+                    positions.append(len(self.columns) + other.index[column])
+                else:
+                    positions.append(self.index[column])
+            self._derived[key] = (Schema.of(columns), _getter(positions))
+        return self._derived[key]
+
+
+class Record(Mapping):
+    """
+    Satu record tabel : tuple nilai + Schema yang dipakai bersama.
+    Read-only dan bisa dipakai seperti dict (record["kolom"], .get, .items, dibandingkan dengan dict),
+    untuk mengubah nilai pakai replace yang menghasilkan Record baru.
+    """
+    __slots__ = ("schema", "values")
+
+    def __init__(self, schema:Schema, values:tuple) -> None:
+        self.schema = schema
+        self.values = values
+
+    def __getitem__(self, column:str):
+        value = self.values[self.schema.index[column]]
+        if value is MISSING:
+            raise KeyError(column)
+        return value
+
+    def __contains__(self, column) -> bool:
+        position = self.schema.index.get(column)
+        return position is not None and self.values[position] is not MISSING
+
+    def __iter__(self):
+        for column, value in zip(self.schema.columns, self.values):
+            if value is not MISSING:
+                yield column
+
+    def __len__(self) -> int:
+        return sum(1 for value in self.values if value is not MISSING)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __or__(self, other:"Record") -> "Record":
+        return self.join(other)
+
+    def replace(self, updates:Mapping) -> "Record":
+        values = list(self.values)
+        for column, value in updates.items():
+            values[self.schema.index[column]] = value
+        return Record(self.schema, tuple(values))
+
+    def prefixed(self, prefix:str) -> "Record":
+        """record yang sama dengan nama kolom diberi prefix (misal "users."), nilainya tidak dicopy"""
+        return Record(self.schema.prefixed(prefix), self.values)
+
+    def project(self, columns, keep_order:bool = False) -> "Record":
+        schema, getter = self.schema.project(columns, keep_order)
+        return Record(schema, getter(self.values))
+
+    def join(self, other:"Record", overwrite:bool = True) -> "Record":
+        if not isinstance(other, Record):
+            other = Schema.of(other.keys()).record(other)
+        schema, getter = self.schema.join(other.schema, overwrite)
+        return Record(schema, getter(self.values + other.values))
@@ -0,0 +1,177 @@
+import os
+import pickle
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
+from numbers import Number
+from random import Random
+from .HyperLogLog import HyperLogLog
+
+
+def build_histogram(values:list, n_buckets:int) -> list|None:
+    """
+    histogram equi-depth dari nilai-nilai yang sudah diurutkan : batas bucket [b0, b1, ..., bk],
+    tiap bucket (b_i sampai b_i+1) berisi kira-kira jumlah nilai yang sama
+    """
+    if not values:
+        return None
+    k = max(1, min(n_buckets, len(values)))
+    return [values[i * len(values) // k] for i in range(k)] + [values[-1]]
+
+
+def histogram_fraction(bounds:list, value, inclusive:bool = False) -> float|None:
+    """
+    perkiraan fraksi nilai yang < value (atau <= value kalau inclusive) menurut histogram equi-depth,
+    None kalau value tidak bisa dibandingkan dengan isi histogram
+    """
+    k = len(bounds) - 1
+    try:
+        if value < bounds[0] or (value == bounds[0] and not inclusive):
+            return 0.0
+        if value > bounds[-1] or (value == bounds[-1] and inclusive):
+            return 1.0
+        bucket = (bisect_right(bounds, value) if inclusive else bisect_left(bounds, value)) - 1
+        bucket = min(max(bucket, 0), k - 1)
+        low, high = bounds[bucket], bounds[bucket + 1]
+    except TypeError:
+        return None
+    if isinstance(value, Number) and isinstance(low, Number) and high > low:
+        within = (value - low) / (high - low)
+    else:
+        within = 0.5
+    return (bucket + within) / k if k > 0 else None
+
+
+class TableStats:
+    """
+    Statistik sebuah tabel yang diperbarui sedikit-sedikit (tidak perlu scan ulang) :
+    n_r dan jumlah kemunculan tiap nilai per kolom, V(A,r) = banyaknya nilai dengan jumlah > 0.
+    Transaksi mencatat perubahannya di TableStats sendiri (delta, jumlahnya boleh negatif)
+    yang baru digabung ke statistik tabel saat commit.
+    histograms dan mcv diisi oleh ANALYZE dan baru diperbarui di ANALYZE berikutnya.
+    Tabel besar (lihat use_sketches) tidak lagi menyimpan counts, V(A,r) diperkirakan dari sketch HyperLogLog per kolom.
+    """
+    sample_rows = 30_000  # ukuran sampel ANALYZE untuk histogram dan MCV
+
+    def __init__(self) -> None:
+        self.n_r = 0
+        self.counts = {}  # kolom -> {nilai : jumlah record}
+        self.sketches = None  # kolom -> HyperLogLog, None = V(A,r) dihitung exact dari counts
+        self.histograms = {}  # kolom -> batas bucket histogram equi-depth
+        self.mcv = {}  # kolom -> [(nilai, frekuensi relatif)] nilai yang paling sering muncul
+        self.page_bytes = {}  # block_index -> (ukuran asli, ukuran di disk) block heap file terkompresi (dipakai bersama HeapFile)
+
+    def use_sketches(self, min_rows:int|None) -> None:
+        """
+        ganti counts dengan sketch HyperLogLog kalau tabel sudah punya minimal min_rows record (None = tidak pernah),
+        memori statistik jadi tetap berapa pun besar tabelnya. sekali pakai sketch tidak balik ke counts
+        """
+        if self.sketches is not None or min_rows is None or self.n_r < min_rows:
+            return
+        self.sketches = {}
+        for column, counts in self.counts.items():
+            self.sketches[column] = HyperLogLog()
+            self.sketches[column].update(counts)
+        self.counts = {}
+
+    def add(self, record:Mapping, sign:int = 1) -> None:
+        """catat record yang masuk (sign = 1) atau keluar (sign = -1) dari tabel"""
+        self.n_r += sign
+        if self.sketches is not None:
+            # sketch tidak bisa dikurangi, nilai yang keluar tetap terhitung sampai ANALYZE berikutnya
+            if sign > 0:
+                for column, value in record.items():
+                    self.sketches.setdefault(column, HyperLogLog()).add(value)
+            return
+        for column, value in record.items():
+            counts = self.counts.setdefault(column, {})
+            counts[value] = counts.get(value, 0) + sign
+
+    def apply(self, delta:"TableStats") -> None:
+        """gabungkan delta hasil transaksi, nilai yang jumlahnya habis dibuang"""
+        self.n_r += delta.n_r
+        if self.sketches is not None:
+            for column, delta_counts in delta.counts.items():
+                sketch = self.sketches.setdefault(column, HyperLogLog())
+                sketch.update(value for value, count in delta_counts.items() if count > 0)
+            return
+        for column, delta_counts in delta.counts.items():
+            counts = self.counts.setdefault(column, {})
+            for value, count in delta_counts.items():
+                total = counts.get(value, 0) + count
+                if total > 0:
+                    counts[value] = total
+                else:
+                    counts.pop(value, None)
+
+    def distinct(self, columns:list[str]) -> dict[str, int]:
+        if self.sketches is not None:
+            # perkiraan sketch bisa sedikit di atas n_r
+            return {column: min(len(self.sketches[column]), self.n_r) if column in self.sketches else 0 for column in columns}
+        return {column: len(self.counts.get(column, ())) for column in columns}
+
+    def analyze(self, rows, columns:list[str], n_buckets:int = 10, n_mcv:int = 10, sample_rows:int = None, seed:int = 0) -> None:
+        """
+        ngebangun histogram equi-depth dan daftar most common values tiap kolom dari sampel acak sample_rows record
+        (reservoir sampling, None = TableStats.sample_rows), memori ANALYZE tetap berapa pun besar tabelnya.
+        kolom yang nilainya tidak bisa diurutkan (campuran tipe) tidak punya histogram.
+        kalau pakai sketch, sketch-nya dibangun ulang dari seluruh record (nilai yang sudah dihapus tidak terhitung lagi)
+        """
+        sample_rows = sample_rows or TableStats.sample_rows
+        random = Random(seed)
+        sample = []
+        sketches = {column: HyperLogLog() for column in columns} if self.sketches is not None else None
+        n_r = 0
+        for row in rows:
+            n_r += 1
+            values = tuple(row.get(column) for column in columns)
+            if sketches is not None:
+                for column, value in zip(columns, values):
+                    if value is not None:
+                        sketches[column].add(value)
+            # tiap record punya peluang yang sama (sample_rows / n_r) untuk ada di sampel
+            if len(sample) < sample_rows:
+                sample.append(values)
+            else:
+                slot = random.randrange(n_r)
+                if slot < sample_rows:
+                    sample[slot] = values
+        if sketches is not None:
+            self.sketches.update(sketches)
+        self.histograms = {}
+        self.mcv = {}
+        for i, column in enumerate(columns):
+            column_values = [values[i] for values in sample if values[i] is not None]
+            counts = {}
+            for value in column_values:
+                counts[value] = counts.get(value, 0) + 1
+            # nilai yang cuma muncul sekali di sampel tidak ada gunanya masuk MCV
+            common = sorted(((count, value) for value, count in counts.items() if count > 1), key=lambda item: -item[0])[:n_mcv]
+            self.mcv[column] = [(value, count / len(sample)) for count, value in common]
+            try:
+                histogram = build_histogram(sorted(column_values), n_buckets)
+            except TypeError:
+                histogram = None
+            if histogram is not None:
+                self.histograms[column] = histogram
+
+    @staticmethod
+    def from_rows(rows) -> "TableStats":
+        stats = TableStats()
+        for row in rows:
+            stats.add(row)
+        return stats
+
+    @staticmethod
+    def load(path:str) -> "TableStats|None":
+        if not os.path.isfile(path):
+            return None
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    def save(self, path:str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path + ".tmp", "wb") as file:
+            pickle.dump(self, file)
+        os.replace(path + ".tmp", path)
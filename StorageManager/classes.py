@@ -1,8 +1,17 @@
 import pickle
 import os
-import copyhttps://github.com/evelynnn04/postgreysiaSQL/pull/54/conflict?name=StorageManager%252Fclasses.py&ancestor_oid=c7a81f15c66fd8fff068119c334a1688e303dade&base_oid=9c355de1224293603b7e387fcf67ae0c31ac92f5&head_oid=9710a9cba9b4b4cf0138f208d36010315e9bc609
-from .Bplus import BPlusTree
-from .Hash import HashTable
+import math
+from operator import itemgetter
+from .Bplus import BPlusTree, PagedNodeStore as BPlusNodeStore, order_for_page
+from .Hash import HashTable, BucketStore, bucket_capacity_for_page
+from .NodeStore import PagedNodeStore
+from .HeapFile import HeapFile, COMPRESSION_METHODS, records_per_page
+from .Record import Record, Schema
+from .Columnar import ColumnBlock, column_kind, column_mask, combine_masks, selected_offsets, OPERATORS
+from .BufferPool import BufferPool
+from .TableStats import TableStats, histogram_fraction
+from .Cursor import Cursor
+from .ExternalSort import external_sort
 from QueryProcessor.Rows import Rows
 
 class Condition:
@@ -28,11 +37,93 @@ class Condition:
         else:
             return item <= self.operand
 
+    @staticmethod
+    def evaluate_block(conditions:list["Condition"], block, any_of:bool = False) -> list[bool]:
+        """
+        ngevaluasi semua kondisi untuk satu block sekaligus, mengembalikan mask (True = record memenuhi)\n
+        kondisi di-AND, atau di-OR kalau any_of = True\n
+        block columnar dievaluasi per kolom (pakai numpy kalau kolomnya angka),
+        block biasa dievaluasi dengan operator yang sudah di-resolve di awal, tanpa manggil evaluate per record
+        """
+        if isinstance(block, ColumnBlock):
+            mask = None
+            for kondisi in conditions:
+                hasil = column_mask(block.column(kondisi.column), kondisi.operation, kondisi.operand)
+                mask = hasil if mask is None else combine_masks(mask, hasil, any_of)
+            return mask if mask is not None else [True] * len(block)
+        operasi = [(kondisi.column, OPERATORS[kondisi.operation], kondisi.operand) for kondisi in conditions]
+        if not operasi:
+            return [True] * len(block)
+        if any_of:
+            return [any(compare(record[column], operand) for column, compare, operand in operasi) for record in block]
+        return [all(compare(record[column], operand) for column, compare, operand in operasi) for record in block]
+
+class _KeyMax:
+    """nilai yang lebih besar dari nilai apa pun, dipakai sebagai batas atas prefix key index komposit"""
+    __slots__ = ()
+
+    def __lt__(self, other):
+        return False
+
+    def __le__(self, other):
+        return self is other
+
+    def __gt__(self, other):
+        return self is not other
+
+    def __ge__(self, other):
+        return True
+
+KEY_MAX = _KeyMax()
+
+class KeyRange:
+    def __init__(self, column:tuple[str, ...], low:tuple, high:tuple, exact:bool = False) -> None:
+        """
+        pencarian ke index komposit (key-nya tuple nilai kolom-kolom index) : semua key di antara low dan high (inklusif).
+        exact = semua kolom index dicari dengan "=", low == high adalah key-nya (bisa lewat hash index)
+        """
+        self.column = column
+        self.low = low
+        self.high = high
+        self.exact = exact
+
+    @staticmethod
+    def from_conditions(columns:tuple[str, ...], conditions:list[Condition]) -> tuple["KeyRange", str]|None:
+        """
+        KeyRange untuk index komposit di columns dari kondisi yang di-AND : prefix kolom index yang dicari dengan "=",
+        ditambah kondisi range (>, >=, <, <=) di kolom berikutnya kalau ada. None kalau kolom pertama tidak punya kondisi.
+        dikembalikan bersama nama kolom yang dicari dengan range (None kalau tidak ada)
+        """
+        prefix = []
+        for column in columns:
+            operand = next((kondisi.operand for kondisi in conditions if kondisi.column == column and kondisi.operation == "="), None)
+            if operand is None:
+                break
+            prefix.append(operand)
+        prefix = tuple(prefix)
+        if len(prefix) == len(columns):
+            return KeyRange(columns, prefix, prefix, exact=True), None
+        column = columns[len(prefix)]
+        low = high = None
+        # cukup satu batas bawah dan satu batas atas, record hasil index tetap dicek ulang dengan semua kondisinya
+        for kondisi in conditions:
+            if kondisi.column != column or kondisi.operand is None:
+                continue
+            if kondisi.operation in (">", ">=") and low is None:
+                low = prefix + ((kondisi.operand, KEY_MAX) if kondisi.operation == ">" else (kondisi.operand,))
+            elif kondisi.operation in ("<", "<=") and high is None:
+                high = prefix + ((kondisi.operand, KEY_MAX) if kondisi.operation == "<=" else (kondisi.operand,))
+        ranged = low is not None or high is not None
+        if not prefix and not ranged:
+            return None
+        return KeyRange(columns, low or prefix, high or prefix + (KEY_MAX,)), column if ranged else None
+
 class DataRetrieval:
-    def __init__(self, tables:list[str], columns:list[str], conditions:list[Condition]) -> None:
+    def __init__(self, tables:list[str], columns:list[str], conditions:list[Condition], all_of:bool = False) -> None:
         self.table = tables
         self.column = columns
         self.conditions = conditions
+        self.all_of = all_of  # True = kondisi di-AND, False = di-OR (WHERE ... OR ...)
 
 class DataWrite:
     def __init__(self, table:list[str], column:list[str], conditions:list[Condition], new_value:object) -> None:
@@ -47,7 +138,7 @@ class DataDeletion:
         self.conditions = conditions
 
 class Statistic:
-    def __init__(self, n_r:int, b_r:int, l_r:int, f_r:int, V_a_r:dict[str, int], col_data_type:dict[str, str] = None, col_index:dict[str,(int, int)] = None, col_bplus_tree_level:dict[str, int] = None) -> None:
+    def __init__(self, n_r:int, b_r:int, l_r:int, f_r:int, V_a_r:dict[str, int], col_data_type:dict[str, str] = None, col_index:dict[str,(int, int)] = None, col_bplus_tree_level:dict[str, int] = None, col_histogram:dict[str, list] = None, col_mcv:dict[str, list[tuple]] = None, col_composite_index:dict[tuple[str, ...], (int, int)] = None, col_index_include:dict[str|tuple[str, ...], list[str]] = None, compression_ratio:float = 1.0) -> None:
         """
         Mengembalikan statistik dari sebuah tabel
         Param : database_name (string), table_name (string)
@@ -71,6 +162,19 @@ class Statistic:
                             contoh keluaran : {"id_user" : (1,1), "nama_user" : (0,1)}
         8. col_bplus_tree_level : dict[str, int] ==> level dari B+ tree yang ada pada setiap kolom dalam tabel
                             contoh keluaran : {"id_user" : 2, "nama_user" : 3}
+        9. col_histogram : dict[str, list] ==> batas bucket histogram equi-depth tiap kolom (hasil ANALYZE)
+                            contoh keluaran : {"id_user" : [1, 25, 50, 75, 100]}
+        10. col_mcv : dict[str, list[tuple]] ==> most common values tiap kolom beserta frekuensi relatifnya (hasil ANALYZE)
+                            contoh keluaran : {"nama_user" : [("agus", 0.2), ("budi", 0.1)]}
+        11. col_composite_index : dict[tuple[str, ...], (int, int)] ==> index komposit (multi kolom) yang ada pada tabel
+                            format keluaran sama dengan col_index, key-nya tuple kolom sesuai urutan di index
+                            contoh keluaran : {("kota", "umur") : (1,0)}
+        12. col_index_include : dict[str|tuple[str, ...], list[str]] ==> kolom include tiap B+ tree (CREATE INDEX ... INCLUDE (...)),
+                            list kosong kalau tidak ada, key-nya sama dengan col_index / col_composite_index. query yang cuma butuh
+                            kolom index dan kolom include bisa dijawab lewat index-only scan (lihat StorageEngine.covering_index)
+                            contoh keluaran : {"id_user" : ["nama_user"], ("kota", "umur") : []}
+        13. compression_ratio : float ==> ukuran block tabel sebelum dibanding sesudah dikompresi di heap file (1.0 = tidak dikompresi)
+                            contoh keluaran : 3.2
         """
         self.n_r = n_r
         self.b_r = b_r
@@ -80,6 +184,11 @@ class Statistic:
         self.col_data_type = col_data_type 
         self.col_index = col_index
         self.col_bplus_tree_level = col_bplus_tree_level
+        self.col_histogram = col_histogram if col_histogram is not None else {}
+        self.col_mcv = col_mcv if col_mcv is not None else {}
+        self.col_composite_index = col_composite_index if col_composite_index is not None else {}
+        self.col_index_include = col_index_include if col_index_include is not None else {}
+        self.compression_ratio = compression_ratio
 
     @staticmethod
     def print_statistics(self):
@@ -90,12 +199,52 @@ class Statistic:
         print(f"Number of distinct values that appear in r for attribute A: {self.V_a_r}")
 
 
+class TableWorkspace:
+    def __init__(self, n_blocks:int) -> None:
+        """
+        Perubahan sebuah transaksi pada satu tabel (copy-on-write).
+        Hanya block yang diubah transaksi yang dicopy ke `blocks`, block lain tetap dibaca dari buffer pool.
+        Record di dalam block tidak pernah diubah in-place, record yang diupdate diganti dengan Record baru (Record.replace).
+        """
+        self.n_blocks = n_blocks
+        self.blocks = {}  # block_index -> salinan block milik transaksi
+        self.free_blocks = None  # salinan free-space map tabel versi transaksi, baru dibuat saat insert pertama
+        self.stats = TableStats()  # perubahan statistik tabel oleh transaksi, digabung saat commit
+
+
 class StorageEngine:
+    # folder tempat heap file tiap tabel, data.dat sekarang cuma nyimpen katalog (metadata tabel)
+    data_dir = "data"
+    # jumlah maksimal page (block) yang ditahan di memori oleh buffer pool
+    buffer_pool_pages = 1024
+    # scan (read_block, get_stats) tabel dengan minimal sekian block dibaca lewat mmap tanpa lewat buffer pool, None = tidak pernah
+    mmap_scan_blocks = 256
+    # tabel dengan minimal sekian record V(A,r)-nya diperkirakan dari sketch HyperLogLog (memori tetap), None = selalu exact
+    sketch_stats_rows = 100_000
+    # bagian node B+ tree yang diisi saat index dibangun (sisanya untuk insert berikutnya)
+    index_fill_factor = 0.9
+    # jumlah entry index yang diurutkan di memori sekaligus saat membangun B+ tree, lebih dari itu diurutkan lewat file sementara
+    index_sort_run = 500_000
+    # tabel dengan page terkompresi menampung sekian kali lipat record per block (page-nya tetap PAGE_SIZE byte di disk),
+    # block yang tidak cukup mengecil tetap benar tapi disambung ke overflow chain
+    compressed_block_factor = 4
+
     def __init__(self) -> None:
+        self.heap_files = {}
+        self.table_stats = {}
+        self.pool = BufferPool(self.buffer_pool_pages)
+        # yang berubah sejak save terakhir, cuma itu yang ditulis ulang saat save
+        self.dirty_tables = set()
+        self.catalog_dirty = False
         self.load()
         self.load_indexes()
         self.buffer = {}
         self.buffer_index = {}
+        # index yang dibuat tiap transaksi (database, tabel, kolom, jenis), dipasang ke self.indexes saat commit
+        self.created_indexes = {}
+        # operasi index manual (insert/delete per key) tiap transaksi, dipasang ke index saat commit
+        self.index_ops = {}
+        self.indexes_dirty = False
 
     def get_database_names(self) -> list[str]:
         """
@@ -175,24 +324,613 @@ class StorageEngine:
             if not (os.path.isfile("data.dat")):
                 pickle.dump({}, open("data.dat", "wb"))
             self.blocks = pickle.load(open("data.dat", "rb"))
+            for database_name in self.blocks:
+                for table_name, table in self.blocks[database_name].items():
+                    heap = self.get_heap_file(database_name, table_name)
+                    if "values" in table:
+                        # data.dat format lama masih nyimpen "values", dimasukin ke buffer pool sebagai page dirty
+                        values = table.pop("values")
+                        for block_index, block in enumerate(values):
+                            self.pool.put(heap, block_index, heap.to_page(block))
+                        table["n_blocks"] = len(values)
+                        self.dirty_tables.add((database_name, table_name))
+                        self.catalog_dirty = True
+                    elif "n_blocks" not in table:
+                        table["n_blocks"] = heap.n_blocks
         except Exception as e:
             print(f"error, {str(e)}")
 
-    def commit_buffer(self, transaction_id:int) -> None:
+    def get_heap_file(self, database_name:str, table_name:str) -> HeapFile:
+        """
+        heap file (data/<database>/<tabel>.tbl) milik sebuah tabel, dibuka sekali lalu dicache
+        """
+        key = (database_name, table_name)
+        if key not in self.heap_files:
+            table = self.blocks[database_name][table_name]
+            columns = [column["name"] for column in table["columns"]]
+            column_kinds = None
+            if table.get("layout", "row") == "columnar":
+                column_kinds = {column["name"]: column_kind(column["type"]) for column in table["columns"]}
+            path = os.path.join(self.data_dir, database_name, f"{table_name}.tbl")
+            self.heap_files[key] = HeapFile(path, columns, column_kinds, table.get("compression"))
+            if key in self.table_stats:
+                # ukuran page terkompresi dicatat heap file langsung ke statistik tabel, ikut tersimpan di file .stats
+                self.heap_files[key].page_bytes = self.table_stats[key].page_bytes
+        return self.heap_files[key]
+
+    def get_table_stats(self, database_name:str, table_name:str) -> TableStats:
+        """
+        statistik tabel (versi yang sudah di-commit), disimpan di data/<database>/<tabel>.stats.
+        tabel yang belum punya file statistik dihitung sekali dengan scan
         """
-        fungsi untuk commit transaction_id buat disave ke file utama
+        key = (database_name, table_name)
+        if key not in self.table_stats:
+            path = os.path.join(self.data_dir, database_name, f"{table_name}.stats")
+            stats = TableStats.load(path)
+            if stats is None:
+                stats = TableStats.from_rows(self.iter_rows(database_name, table_name, -1, mapped=self.use_mmap_scan(database_name, table_name)))
+                self.dirty_tables.add(key)
+            stats.use_sketches(self.sketch_stats_rows)
+            if key in self.heap_files:
+                heap = self.heap_files[key]
+                stats.page_bytes.update(heap.page_bytes)
+                heap.page_bytes = stats.page_bytes
+            self.table_stats[key] = stats
+        return self.table_stats[key]
+
+    def get_workspace(self, database_name:str, table_name:str, transaction_id:int, create:bool = False) -> TableWorkspace|None:
         """
+        workspace copy-on-write transaction_id untuk sebuah tabel, None kalau transaksinya belum mengubah tabel tersebut
+        """
+        tables = self.buffer.get(transaction_id, {}).get(database_name, {})
+        if table_name not in tables and create:
+            tables = self.buffer.setdefault(transaction_id, {}).setdefault(database_name, {})
+            tables[table_name] = TableWorkspace(self.blocks[database_name][table_name]["n_blocks"])
+        return tables.get(table_name)
+
+    def use_mmap_scan(self, database_name:str, table_name:str) -> bool:
+        """
+        scan penuh tabel ini dibaca lewat mmap atau tidak (lihat mmap_scan_blocks)
+        """
+        return self.mmap_scan_blocks is not None and self.blocks[database_name][table_name]["n_blocks"] >= self.mmap_scan_blocks
+
+    def iter_blocks(self, database_name:str, table_name:str, transaction_id:int, mapped:bool = False, block_indexes:list[int] = None):
+        """
+        ngeiterasi block-block sebuah tabel versi transaction_id. block yang sudah diubah transaksi diambil dari workspace-nya,
+        sisanya dibaca lewat buffer pool (page di-pin selama block dipakai, jangan diubah isinya).
+        kalau mapped, block yang belum ada di buffer pool di-decode langsung dari mmap heap file dan tidak masuk buffer pool.
+        kalau block_indexes diisi cukup block-block itu saja yang dibaca (urut sesuai block_indexes)
+        """
+        workspace = self.get_workspace(database_name, table_name, transaction_id)
+        n_blocks = workspace.n_blocks if workspace else self.blocks[database_name][table_name]["n_blocks"]
+        heap = self.get_heap_file(database_name, table_name)
+        reader = heap.map() if mapped else None
         try:
-            tempBlocks = self.buffer.get(transaction_id, [])
-            if tempBlocks != []:
-                self.blocks = tempBlocks
-                self.buffer.pop(transaction_id)
-            tempIndexes = self.buffer_index.get(transaction_id, [])
-            if tempIndexes != []:
-                self.indexes = tempIndexes
-                self.buffer_index.pop(transaction_id)
-        except Exception as e:
-            print(f"error, {str(e)}")
+            for block_index in range(n_blocks) if block_indexes is None else block_indexes:
+                if workspace and block_index in workspace.blocks:
+                    yield workspace.blocks[block_index]
+                    continue
+                if reader is not None and not self.pool.is_cached(heap, block_index):
+                    yield reader.read_block(block_index)
+                    continue
+                block = self.pool.fetch(heap, block_index)
+                try:
+                    yield block
+                finally:
+                    self.pool.unpin(heap, block_index)
+        finally:
+            if reader is not None:
+                reader.close()
+
+    def iter_rows(self, database_name:str, table_name:str, transaction_id:int, columns:set[str] = None, mapped:bool = False):
+        """
+        ngeiterasi record tabel versi transaction_id langsung dari block-nya (tanpa dicopy), jangan diubah isinya.
+        untuk tabel columnar cukup kolom di columns saja yang dibentuk jadi record (None = semua kolom)
+        """
+        for block in self.iter_blocks(database_name, table_name, transaction_id, mapped):
+            if isinstance(block, ColumnBlock):
+                yield from block.iter_rows(columns)
+            else:
+                yield from block
+
+    def iter_filtered_rows(self, database_name:str, table_name:str, transaction_id:int, conditions:list[Condition], any_of:bool = False, columns:set[str] = None, mapped:bool = False):
+        """
+        seperti iter_rows, tapi kondisi dievaluasi per block sekaligus (Condition.evaluate_block)
+        dan hanya record yang memenuhi yang dibentuk. block yang dibaca dipilih lewat iter_matching_blocks
+        """
+        for _, block, offsets in self.iter_matching_blocks(database_name, table_name, transaction_id, conditions, any_of, mapped):
+            if isinstance(block, ColumnBlock):
+                yield from block.iter_rows(columns, offsets)
+            else:
+                for offset in offsets:
+                    yield block[offset]
+
+    def iter_matching_blocks(self, database_name:str, table_name:str, transaction_id:int, conditions:list[Condition], any_of:bool = False, mapped:bool = False):
+        """
+        ngeiterasi (block_index, block, offsets) untuk block yang punya record memenuhi kondisi (di-AND, atau di-OR kalau any_of).
+        kalau index lebih murah (lihat choose_access_path) cuma block di posisi hasil index yang dibaca,
+        record di posisi itu tetap dicek ulang dengan kondisinya. selain itu scan penuh
+        """
+        positions = self.index_positions(database_name, table_name, transaction_id, conditions, any_of)
+        if positions is None:
+            for block_index, block in enumerate(self.iter_blocks(database_name, table_name, transaction_id, mapped)):
+                offsets = selected_offsets(Condition.evaluate_block(conditions, block, any_of))
+                if offsets:
+                    yield block_index, block, offsets
+            return
+        block_indexes = sorted(positions)
+        for block_index, block in zip(block_indexes, self.iter_blocks(database_name, table_name, transaction_id, block_indexes=block_indexes)):
+            kandidat = [offset for offset in sorted(positions[block_index]) if offset < len(block)]
+            mask = Condition.evaluate_block(conditions, [block[offset] for offset in kandidat], any_of)
+            offsets = [kandidat[i] for i in selected_offsets(mask)]
+            if offsets:
+                yield block_index, block, offsets
+
+    def table_indexes(self, database_name:str, table_name:str, transaction_id:int) -> dict[str, dict]:
+        """
+        index tabel yang terlihat oleh transaction_id : {kolom : {"bplus" : BPlusTree|None, "hash" : HashTable|None}},
+        index yang sudah di-commit ditimpa index yang dibuat transaksi itu sendiri (belum di-commit)
+        """
+        committed = self.indexes.get(database_name, {}).get(table_name, {})
+        pending = self.buffer_index.get(transaction_id, {}).get(database_name, {}).get(table_name)
+        if not pending:
+            return committed
+        merged = dict(committed)
+        for column, entry in pending.items():
+            merged[column] = {**committed.get(column, {}), **entry}
+        return merged
+
+    def choose_access_path(self, database_name:str, table_name:str, transaction_id:int, conditions:list[Condition], any_of:bool = False) -> list[tuple[Condition|KeyRange, str]]|None:
+        """
+        milih cara baca record yang memenuhi kondisi : list (kondisi, "hash"/"bplus") yang dicari lewat index, None = scan penuh.
+        untuk index komposit (kolomnya tuple) kondisinya berupa KeyRange.
+        biaya dihitung dalam page : scan = jumlah block, index = page index yang dibaca (1 untuk hash, tinggi tree untuk B+ tree)
+        ditambah perkiraan jumlah record yang cocok (tiap record paling buruk ada di block berbeda, maksimal semua block).
+        kondisi "=" bisa lewat hash atau B+ tree, kondisi range hanya lewat B+ tree, "<>" tidak bisa lewat index.
+        index komposit : hash kalau semua kolomnya dicari dengan "=", B+ tree kalau kolom pertamanya punya kondisi
+        (prefix kolom dengan "=" lalu range di kolom berikutnya, lihat KeyRange.from_conditions).
+        AND : cukup satu kondisi (yang paling murah), OR : semua kondisi harus bisa lewat index dan biayanya dijumlah.
+        transaksi yang sudah mengubah tabel ini selalu scan (index cuma mencakup versi yang sudah di-commit)
+        """
+        indexes = self.table_indexes(database_name, table_name, transaction_id)
+        if not conditions or not indexes or self.get_workspace(database_name, table_name, transaction_id) is not None:
+            return None
+        n_blocks = self.blocks[database_name][table_name]["n_blocks"]
+        stats = self.get_table_stats(database_name, table_name)
+        composite = {columns: entry for columns, entry in indexes.items() if isinstance(columns, tuple)}
+
+        def fraksi_range(kondisi:Condition, bplus:BPlusTree, leading:bool) -> float:
+            # tanpa histogram (belum ANALYZE), key terkecil dan terbesar di tree dipakai sebagai histogram satu bucket
+            # (untuk index komposit cukup nilai kolom pertamanya, kolom lain tidak terurut di tree)
+            histogram = stats.histograms.get(kondisi.column)
+            if not histogram and leading:
+                histogram = [key[0] if isinstance(key, tuple) else key for key in (bplus.min_key(), bplus.max_key())]
+            fraksi = None
+            if histogram and None not in histogram:
+                fraksi = histogram_fraction(histogram, kondisi.operand, inclusive=kondisi.operation in ("<=", ">", "!"))
+            if fraksi is not None and kondisi.operation in (">", ">="):
+                fraksi = 1 - fraksi
+            return fraksi if fraksi is not None else 0.5
+
+        def kandidat_komposit(kondisi_and:list[Condition]) -> list[tuple]:
+            kandidat = []
+            for columns, entry in composite.items():
+                probe = KeyRange.from_conditions(columns, kondisi_and)
+                if probe is None:
+                    continue
+                key_range, kolom_range = probe
+                n_prefix = len(key_range.low) if kolom_range is None else columns.index(kolom_range)
+                distinct = stats.distinct(list(columns[:n_prefix]))
+                perkiraan = stats.n_r / max(math.prod(max(distinct[column], 1) for column in columns[:n_prefix]), 1)
+                if key_range.exact and entry.get("hash") is not None:
+                    kandidat.append((1 + min(perkiraan, n_blocks), key_range, "hash"))
+                if entry.get("bplus") is not None:
+                    if kolom_range is not None:
+                        kondisi_range = [kondisi for kondisi in kondisi_and if kondisi.column == kolom_range and kondisi.operation in (">", ">=", "<", "<=")]
+                        perkiraan *= min(fraksi_range(kondisi, entry["bplus"], n_prefix == 0) for kondisi in kondisi_range)
+                    kandidat.append((entry["bplus"].get_bplus_tree_level() + min(perkiraan, n_blocks), key_range, "bplus"))
+            return kandidat
+
+        pilihan = []
+        for kondisi in conditions:
+            index = indexes.get(kondisi.column, {})
+            kandidat = []
+            if kondisi.operation == "=":
+                perkiraan = stats.n_r / max(stats.distinct([kondisi.column])[kondisi.column], 1)
+                if index.get("hash") is not None:
+                    kandidat.append((1 + min(perkiraan, n_blocks), kondisi, "hash"))
+                if index.get("bplus") is not None:
+                    kandidat.append((index["bplus"].get_bplus_tree_level() + min(perkiraan, n_blocks), kondisi, "bplus"))
+            elif kondisi.operation not in ("<>",) and index.get("bplus") is not None:
+                perkiraan = stats.n_r * fraksi_range(kondisi, index["bplus"], True)
+                kandidat.append((index["bplus"].get_bplus_tree_level() + min(perkiraan, n_blocks), kondisi, "bplus"))
+            if kondisi.operation != "<>":
+                # index komposit yang kolom pertamanya kolom kondisi ini juga bisa dipakai untuk kondisi ini saja
+                kandidat.extend(kandidat_komposit([kondisi]))
+            if kandidat:
+                pilihan.append(min(kandidat, key=lambda item: item[0]))
+            elif any_of:
+                # satu kondisi OR yang tidak bisa lewat index berarti tetap harus scan
+                return None
+        if not any_of:
+            # kondisi AND di beberapa kolom sekaligus lewat index komposit
+            pilihan.extend(kandidat_komposit(conditions))
+        if not pilihan:
+            return None
+        if any_of:
+            biaya = sum(item[0] for item in pilihan)
+        else:
+            pilihan = [min(pilihan, key=lambda item: item[0])]
+            biaya = pilihan[0][0]
+        if biaya >= n_blocks:
+            return None
+        return [(kondisi, jenis) for _, kondisi, jenis in pilihan]
+
+    def index_positions(self, database_name:str, table_name:str, transaction_id:int, conditions:list[Condition], any_of:bool = False) -> dict[int, set[int]]|None:
+        """
+        posisi record (block_index -> set offset) hasil pencarian index sesuai choose_access_path,
+        None kalau harus scan penuh (termasuk kalau operand tidak bisa dibandingkan dengan key index)
+        """
+        plan = self.choose_access_path(database_name, table_name, transaction_id, conditions, any_of)
+        if plan is None:
+            return None
+        indexes = self.table_indexes(database_name, table_name, transaction_id)
+        n_blocks = self.blocks[database_name][table_name]["n_blocks"]
+        positions = {}
+        try:
+            for kondisi, jenis in plan:
+                index = indexes[kondisi.column][jenis]
+                if isinstance(kondisi, KeyRange):
+                    if jenis == "hash":
+                        hasil = index.get(kondisi.low)
+                    elif kondisi.exact:
+                        hasil = index.search(kondisi.low)
+                    else:
+                        hasil = index.search_range(kondisi.low, kondisi.high)
+                elif jenis == "hash":
+                    hasil = index.get(kondisi.operand)
+                elif kondisi.operation == "=":
+                    hasil = index.search(kondisi.operand)
+                elif kondisi.operation in (">", ">="):
+                    maksimum = index.max_key()
+                    hasil = index.search_range(kondisi.operand, maksimum) if maksimum is not None else None
+                else:
+                    minimum = index.min_key()
+                    hasil = index.search_range(minimum, kondisi.operand) if minimum is not None else None
+                if isinstance(hasil, tuple):
+                    hasil = [hasil]
+                # value B+ tree covering index berupa (block_index, offset, nilai include)
+                for posisi in hasil or []:
+                    if posisi[0] < n_blocks:
+                        positions.setdefault(posisi[0], set()).add(posisi[1])
+        except TypeError:
+            return None
+        return positions
+
+    def choose_index_only_scan(self, database_name:str, table_name:str, transaction_id:int, columns:set[str], conditions:list[Condition], any_of:bool = False) -> tuple[str|tuple[str, ...], object, object]|None:
+        """
+        milih B+ tree yang bisa menjawab query tanpa baca heap (index-only scan, lihat covering_index) :
+        (kolom index, batas bawah, batas atas), None kalau tidak ada. kondisi OR cuma boleh satu
+        """
+        if not conditions or (any_of and len(conditions) > 1) or self.get_workspace(database_name, table_name, transaction_id) is not None:
+            return None
+        dibandingkan = {kondisi.column for kondisi in conditions if kondisi.operation in ("=", ">", ">=", "<", "<=") and kondisi.operand is not None}
+        trees = {key: entry.get("include", ()) for key, entry in self.table_indexes(database_name, table_name, transaction_id).items() if entry.get("bplus") is not None}
+        key = StorageEngine.covering_index(trees, columns, dibandingkan)
+        if key is None:
+            return None
+        if isinstance(key, tuple):
+            key_range, _ = KeyRange.from_conditions(key, conditions)
+            return key, key_range.low, key_range.high
+        low = high = None
+        # cukup satu batas bawah dan satu batas atas, entry hasilnya tetap dicek ulang dengan semua kondisinya
+        for kondisi in conditions:
+            if kondisi.column != key or kondisi.operand is None:
+                continue
+            if kondisi.operation in ("=", ">", ">=") and low is None:
+                low = kondisi.operand
+            if kondisi.operation in ("=", "<", "<=") and high is None:
+                high = kondisi.operand
+        return key, low, high if high is not None else KEY_MAX
+
+    @staticmethod
+    def covering_index(trees:dict, columns:set[str], compared:set[str]) -> str|tuple[str, ...]|None:
+        """
+        aturan index-only scan (dipakai juga QueryOptimizer) : dari trees {key : kolom include} B+ tree tabel, key tree yang
+        semua kolom columns (proyeksi dan kondisi) ada di key atau kolom include-nya, dan tiap kolom key-nya ada di compared
+        (kolom yang dibandingkan dengan =, >, >=, <, <= ke konstanta; record dengan key NULL tidak masuk index, tapi juga
+        tidak mungkin memenuhi kondisi itu). kalau ada beberapa dipilih yang entry-nya paling kecil, None kalau tidak ada
+        """
+        kandidat = []
+        for key, include in trees.items():
+            key_columns = StorageEngine.index_columns(key)
+            if set(key_columns) <= compared and columns <= set(key_columns) | set(include):
+                kandidat.append((len(key_columns) + len(include), key))
+        if not kandidat:
+            return None
+        return min(kandidat, key=lambda item: item[0])[1]
+
+    def index_only_rows(self, database_name:str, table_name:str, transaction_id:int, columns:list[str], conditions:list[Condition], any_of:bool = False) -> list[Record]|None:
+        """
+        index-only scan (lihat choose_index_only_scan) : record hasil query (sudah diproyeksikan ke columns) dibentuk dari key dan nilai
+        kolom include di leaf B+ tree, page heap tabel tidak dibaca sama sekali. None kalau tidak bisa (harus lewat heap)
+        """
+        plan = self.choose_index_only_scan(database_name, table_name, transaction_id, set(columns) | {kondisi.column for kondisi in conditions}, conditions, any_of)
+        if plan is None:
+            return None
+        key, low, high = plan
+        entry = self.table_indexes(database_name, table_name, transaction_id)[key]
+        bplus, include = entry["bplus"], entry.get("include", ())
+        composite = isinstance(key, tuple)
+        try:
+            if low is None:
+                low = bplus.min_key()
+                if low is None:
+                    return []
+            items = bplus.items_range(low, high)
+        except TypeError:
+            return None  # operand tidak bisa dibandingkan dengan key index
+        schema = Schema.of(StorageEngine.index_columns(key) + include)
+        records = [Record(schema, (key_value if composite else (key_value,)) + (value[2] if include else ())) for key_value, value in items]
+        try:
+            mask = Condition.evaluate_block(conditions, records, any_of)
+        except TypeError:
+            return None
+        return [records[i].project(columns) for i in selected_offsets(mask)]
+
+    @staticmethod
+    def cross_rows(left, right:list):
+        for row_left in left:
+            for row_right in right:
+                yield row_left | row_right
+
+    def free_space_map(self, database_name:str, table_name:str) -> set[int]:
+        """
+        free-space map tabel (versi yang sudah di-commit) : index block yang masih punya tempat kosong.
+        katalog lama yang belum punya free-space map dihitung sekali dengan scan
+        """
+        table = self.blocks[database_name][table_name]
+        if "free_blocks" not in table:
+            table["free_blocks"] = {block_index for block_index, block in enumerate(self.iter_blocks(database_name, table_name, -1)) if len(block) < table["max_record"]}
+            self.catalog_dirty = True
+        return table["free_blocks"]
+
+    def workspace_free_space_map(self, database_name:str, table_name:str, transaction_id:int) -> set[int]:
+        """
+        free-space map versi transaction_id, dicopy dari free_space_map saat pertama dibutuhkan
+        lalu disesuaikan dengan block yang sudah diubah transaksi
+        """
+        workspace = self.get_workspace(database_name, table_name, transaction_id, create=True)
+        if workspace.free_blocks is None:
+            max_record = self.blocks[database_name][table_name]["max_record"]
+            workspace.free_blocks = set(self.free_space_map(database_name, table_name))
+            for block_index, block in workspace.blocks.items():
+                if len(block) < max_record:
+                    workspace.free_blocks.add(block_index)
+                else:
+                    workspace.free_blocks.discard(block_index)
+        return workspace.free_blocks
+
+    def writable_block(self, database_name:str, table_name:str, block_index:int, transaction_id:int) -> list[Record]:
+        """
+        block milik workspace transaksi yang boleh diubah. saat pertama kali diubah, hanya list record block itu yang dicopy
+        (Record-nya sendiri read-only dan dipakai bersama, record yang diubah diganti dengan Record.replace)
+        """
+        workspace = self.get_workspace(database_name, table_name, transaction_id, create=True)
+        if block_index not in workspace.blocks:
+            if block_index < self.blocks[database_name][table_name]["n_blocks"]:
+                heap = self.get_heap_file(database_name, table_name)
+                workspace.blocks[block_index] = list(self.pool.fetch(heap, block_index))
+                self.pool.unpin(heap, block_index)
+            else:
+                workspace.blocks[block_index] = []
+            workspace.n_blocks = max(workspace.n_blocks, block_index + 1)
+        return workspace.blocks[block_index]
+
+    def commit_buffer(self, transaction_id:int) -> None:
+        """
+        fungsi untuk commit transaction_id, block tabel yang diubah masuk ke buffer pool sebagai page dirty
+        (baru ditulis ke heap file saat save atau saat dievict).
+        semua yang bisa gagal (tabel tidak ada, block tidak bisa dijadikan page, key yang tidak bisa masuk B+ tree) dicek dulu
+        sebelum ada yang diubah, kalau gagal error-nya dilempar dan transaksi tetap belum di-commit
+        """
+        rencana = []
+        for database_name, tables in self.buffer.get(transaction_id, {}).items():
+            for table_name, workspace in tables.items():
+                if table_name not in self.blocks.get(database_name, {}):
+                    raise ValueError(f"Tidak ada table dengan nama {table_name} di database {database_name}")
+                heap = self.get_heap_file(database_name, table_name)
+                pages = {block_index: heap.to_page(block) for block_index, block in workspace.blocks.items()}
+                # index yang dibuat transaksi ini masih ada di buffer_index, jadi ikut dihitung lewat maintained_indexes
+                changes = [change for block_index, block in workspace.blocks.items()
+                           for change in self.index_changes(database_name, table_name, block_index, block)]
+                StorageEngine.check_index_keys(changes)
+                # diambil sebelum block transaksi masuk buffer pool (kalau perlu dihitung dengan scan, hasilnya versi sebelum commit)
+                free_blocks = self.free_space_map(database_name, table_name)
+                rencana.append((database_name, table_name, workspace, heap, pages, changes, free_blocks))
+        # index tujuan operasi index manual dicari sekarang, index yang dibuat transaksi ini masih ada di buffer_index
+        operasi_index = [(database_name, table_name, self.table_indexes(database_name, table_name, transaction_id)[column], index_type, op, key, value)
+                         for database_name, table_name, column, index_type, op, key, value in self.index_ops.get(transaction_id, ())]
+        StorageEngine.check_index_keys([(entry["bplus"], None, None, key, value) for _, _, entry, index_type, op, key, value in operasi_index
+                                        if index_type == "bplus" and op == "insert"])
+
+        buffer_index = self.buffer_index.pop(transaction_id, {})
+        self.buffer.pop(transaction_id, None)
+        for database_name, table_name, column, index_type in self.created_indexes.pop(transaction_id, ()):
+            self.initialize_index_structure(database_name, table_name, column)
+            entry = self.indexes[database_name][table_name][column]
+            entry.setdefault("bplus", None)
+            entry.setdefault("hash", None)
+            index = buffer_index[database_name][table_name][column][index_type]
+            if entry[index_type] is not None and entry[index_type] is not index and isinstance(getattr(entry[index_type], "store", None), PagedNodeStore):
+                # index lama di kolom yang sama diganti, file-nya dibuang
+                entry[index_type].store.drop()
+            entry[index_type] = index
+            if index_type == "bplus":
+                entry["include"] = buffer_index[database_name][table_name][column].get("include", ())
+            self.indexes_dirty = True
+        for database_name, table_name, workspace, heap, pages, changes, free_blocks in rencana:
+            table = self.blocks[database_name][table_name]
+            self.apply_index_changes(changes)
+            for block_index, block in workspace.blocks.items():
+                self.pool.put(heap, block_index, pages[block_index])
+                # free-space map cukup diperbarui untuk block yang diubah transaksi
+                punya_tempat = len(block) < table["max_record"]
+                if punya_tempat != (block_index in free_blocks):
+                    if punya_tempat:
+                        free_blocks.add(block_index)
+                    else:
+                        free_blocks.discard(block_index)
+                    self.catalog_dirty = True
+            if workspace.n_blocks > table["n_blocks"]:
+                table["n_blocks"] = workspace.n_blocks
+                self.catalog_dirty = True
+            if workspace.blocks:
+                self.dirty_tables.add((database_name, table_name))
+                stats = self.get_table_stats(database_name, table_name)
+                stats.apply(workspace.stats)
+                stats.use_sketches(self.sketch_stats_rows)
+        self.index_ops.pop(transaction_id, None)
+        for database_name, table_name, entry, index_type, op, key, value in operasi_index:
+            self.apply_index_op(database_name, table_name, entry, index_type, op, key, value)
+
+    def discard_buffer(self, transaction_id:int) -> None:
+        """
+        fungsi untuk rollback transaction_id, semua yang belum di-commit dibuang : block di buffer, operasi index manual,
+        dan index yang dibuat transaksi itu (file .bpt/.hash-nya ikut dihapus)
+        """
+        self.buffer.pop(transaction_id, None)
+        self.index_ops.pop(transaction_id, None)
+        self.created_indexes.pop(transaction_id, None)
+        for tables in self.buffer_index.pop(transaction_id, {}).values():
+            for columns in tables.values():
+                for entry in columns.values():
+                    for index_type in ("bplus", "hash"):
+                        if isinstance(getattr(entry.get(index_type), "store", None), PagedNodeStore):
+                            entry[index_type].store.drop()
+
+    def index_changes(self, database_name:str, table_name:str, block_index:int, block) -> list[tuple]:
+        """
+        perubahan semua index tabel (lihat maintained_indexes) untuk satu block yang diubah transaksi,
+        list (index, key_lama, value_lama, key_baru, value_baru), key None = tidak ada yang dihapus/ditambah.
+        dibandingkan per offset dengan block lama di buffer pool, karena delete menggeser offset record sesudahnya;
+        hanya posisi yang key-nya berubah yang dihapus/ditambah ke index. nilai NULL tidak masuk index.
+        B+ tree covering index juga diperbarui kalau yang berubah cuma nilai kolom include-nya.
+        tidak mengubah index, perubahannya dipasang lewat apply_index_changes
+        """
+        struktur = self.maintained_indexes(database_name, table_name)
+        if not struktur:
+            return []
+        lama = []
+        if block_index < self.blocks[database_name][table_name]["n_blocks"]:
+            heap = self.get_heap_file(database_name, table_name)
+            lama = self.pool.fetch(heap, block_index)
+            self.pool.unpin(heap, block_index)
+        changes = []
+        for column, entry in struktur:
+            bplus, hash_index = entry.get("bplus"), entry.get("hash")
+            include = entry.get("include", ()) if bplus is not None else ()
+            nilai_lama = StorageEngine.column_values(lama, column)
+            nilai_baru = StorageEngine.column_values(block, column)
+            include_lama = StorageEngine.include_values(lama, include)
+            include_baru = StorageEngine.include_values(block, include)
+            for offset in range(max(len(nilai_lama), len(nilai_baru))):
+                # None = tidak ada entry index di posisi ini (tidak ada record atau nilainya NULL)
+                key_lama = nilai_lama[offset] if offset < len(nilai_lama) else None
+                key_baru = nilai_baru[offset] if offset < len(nilai_baru) else None
+                extra_lama = include_lama[offset] if offset < len(include_lama) else None
+                extra_baru = include_baru[offset] if offset < len(include_baru) else None
+                if key_lama == key_baru and extra_lama == extra_baru:
+                    continue
+                posisi = (block_index, offset)
+                if bplus is not None:
+                    changes.append((bplus, key_lama, posisi + (extra_lama,) if include else posisi, key_baru, posisi + (extra_baru,) if include else posisi))
+                if hash_index is not None and key_lama != key_baru:
+                    changes.append((hash_index, key_lama, posisi, key_baru, posisi))
+        return changes
+
+    @staticmethod
+    def check_index_keys(changes:list[tuple]) -> None:
+        """key baru untuk B+ tree harus bisa dibandingkan dengan key lain di tree yang sama, dicek sebelum commit mengubah apa pun"""
+        per_tree = {}
+        for index, key_lama, value_lama, key_baru, value_baru in changes:
+            if key_baru is not None and isinstance(index, BPlusTree):
+                per_tree.setdefault(id(index), (index, []))[1].append(key_baru)
+        for tree, keys in per_tree.values():
+            terkecil = tree.min_key()
+            try:
+                sorted(keys if terkecil is None else keys + [terkecil])
+            except TypeError as e:
+                raise ValueError(f"Nilai key tidak bisa dimasukkan ke index B+ tree : {e}") from e
+
+    def apply_index_changes(self, changes:list[tuple]) -> None:
+        """memasang perubahan index hasil index_changes"""
+        for index, key_lama, value_lama, key_baru, value_baru in changes:
+            if key_lama is not None:
+                index.remove(key_lama, value_lama)
+            if key_baru is not None:
+                try:
+                    index.insert(key_baru, value_baru)
+                except ValueError:
+                    pass  # pasangan key-posisi sudah ada di hash index
+            self.indexes_dirty = True
+
+    def apply_index_op(self, database_name:str, table_name:str, entry:dict, index_type:str, op:str, key, value) -> None:
+        """memasang satu operasi index manual dari index_ops ke index entry[index_type]"""
+        index = entry[index_type]
+        if op == "delete":
+            if index_type == "bplus":
+                index.delete(key)
+            elif index.get(key) is not None:
+                index.delete_key(key)
+        elif index_type == "bplus":
+            include = entry.get("include", ())
+            if include:
+                # covering index : nilai kolom include dibaca dari record di posisi itu, NULL kalau posisinya kosong
+                row = None
+                if value[0] < self.blocks[database_name][table_name]["n_blocks"]:
+                    try:
+                        row = self.get_value_for_position(database_name, table_name, value[0], value[1], -1)
+                    except IndexError:
+                        pass
+                value = StorageEngine.index_value(row, value[0], value[1], include) if row is not None else value + ((None,) * len(include),)
+            index.insert(key, value)
+        else:
+            try:
+                index.insert(key, value)
+            except ValueError:
+                pass  # pasangan key-posisi sudah ada di hash index
+        self.indexes_dirty = True
+
+    def maintained_indexes(self, database_name:str, table_name:str) -> list[tuple]:
+        """
+        list (kolom, entry) semua index tabel yang diperbarui saat commit : index yang sudah di-commit, ditambah index yang
+        dibuat transaksi yang belum commit (dibangun dari data yang sudah di-commit, jadi harus ikut perubahan commit lain)
+        """
+        daftar = list(self.indexes.get(database_name, {}).get(table_name, {}).items())
+        for pending in self.buffer_index.values():
+            daftar.extend(pending.get(database_name, {}).get(table_name, {}).items())
+        return [(column, entry) for column, entry in daftar if entry.get("bplus") is not None or entry.get("hash") is not None]
+
+    @staticmethod
+    def include_values(block, include:tuple[str, ...]) -> list:
+        """tuple nilai kolom include (boleh NULL) untuk semua record di block, list kosong kalau tidak ada kolom include"""
+        if not include:
+            return []
+        return list(zip(*(StorageEngine.column_values(block, name) for name in include)))
+
+    @staticmethod
+    def column_values(block, column:str|tuple[str, ...]) -> list:
+        """
+        nilai satu kolom untuk semua record di block (None kalau kolomnya tidak ada di record),
+        untuk tuple kolom (index komposit) tuple nilainya, None kalau salah satunya NULL
+        """
+        if isinstance(column, tuple):
+            values = zip(*(StorageEngine.column_values(block, name) for name in column))
+            return [None if None in key else key for key in values]
+        if isinstance(block, ColumnBlock):
+            return block.column(column).to_list()
+        return [record.get(column) for record in block]
 
     def load_indexes(self) -> None:
         """
@@ -205,13 +943,49 @@ class StorageEngine:
         except Exception as e:
             print(f"Error initializing indexes: {str(e)}")
             self.indexes = {}
+        # node B+ tree di disk dibaca lewat buffer pool engine
+        for store in self.index_stores():
+            store.attach(self.pool)
+
+    def index_stores(self):
+        """
+        node store semua index (B+ tree dan hash) yang disimpan per page di disk (index yang di-load dari indexes.dat format lama tetap di memori)
+        """
+        for tables in self.indexes.values():
+            for columns in tables.values():
+                for entry in columns.values():
+                    for index in (entry.get("bplus"), entry.get("hash")):
+                        store = getattr(index, "store", None)
+                        if isinstance(store, PagedNodeStore):
+                            yield store
 
     def save(self) -> None:
         """
-        bakal ngedump file utama di variabel ke file binary (data.dat)
+        bakal nulis page dirty di buffer pool ke heap file masing-masing (1 block = 1 page, ditulis in-place),
+        hanya tabel yang berubah sejak save terakhir yang disentuh dan katalog (data.dat) hanya ditulis ulang kalau berubah
         """
         try:
-            pickle.dump(self.blocks, open("data.dat", "wb"))
+            self.pool.flush()
+            for database_name, table_name in sorted(self.dirty_tables):
+                heap = self.get_heap_file(database_name, table_name)
+                n_blocks = self.blocks[database_name][table_name]["n_blocks"]
+                if heap.n_blocks > n_blocks:
+                    heap.truncate(n_blocks)
+                heap.flush()
+                if (database_name, table_name) in self.table_stats:
+                    self.table_stats[(database_name, table_name)].save(os.path.join(self.data_dir, database_name, f"{table_name}.stats"))
+            self.dirty_tables.clear()
+            for store in self.index_stores():
+                store.flush()
+            if self.indexes_dirty:
+                self.save_indexes()
+                self.indexes_dirty = False
+            if self.catalog_dirty or not os.path.isfile("data.dat"):
+                # ditulis ke file sementara dulu biar data.dat tidak pernah setengah jadi
+                with open("data.dat.tmp", "wb") as file:
+                    pickle.dump(self.blocks, file)
+                os.replace("data.dat.tmp", "data.dat")
+                self.catalog_dirty = False
         except Exception as e:
             print(f"error, {str(e)}")
 
@@ -231,39 +1005,49 @@ class StorageEngine:
         if database_name in self.blocks:
             return Exception(f"Sudah ada database dengan nama {database_name}")
         self.blocks[database_name] = {}
+        self.catalog_dirty = True
         return True
     
-    def create_table(self, database_name:str, table_name:str, column_type:dict[str, str], informasi_tambahan:dict[str, list[str]]) -> bool|Exception:
+    def create_table(self, database_name:str, table_name:str, column_type:dict[str, str], informasi_tambahan:dict[str, list[str]], layout:str = "row", compression:str = None) -> bool|Exception:
         """
         bikin tabel baru\n
         database_name tinggal string, misal "database1"\n
         table_name tinggal string, misal "id_user"\n
         column_type isinya dict[nama_column, tipe_column], misal {"id_user" : "INTEGER", "nama_user" : "VARCHAR(255)"} (tolong caps untuk tipenya, biar bisa diitung bytenya)\n
         buat type nya, khusus VARCHAR harus pake argumen angka, misal "VARCHAR(100)"\n
-        informasi_tambahan misal {"id_user" : ["PRIMARY KEY", "UNIQUE"], "nama_user" : ["UNIQUE", "FOREIGN KEY"]} 
+        informasi_tambahan misal {"id_user" : ["PRIMARY KEY", "UNIQUE"], "nama_user" : ["UNIQUE", "FOREIGN KEY"]}\n
+        layout "row" (default) atau "columnar", tabel columnar nyimpen tiap block per kolom (INTEGER/FLOAT jadi array numpy kalau ada)\n
+        compression None (default) atau "zlib", page tabel terkompresi dikompresi saat ditulis ke heap file dan di-decompress saat masuk buffer pool,
+        satu block-nya menampung compressed_block_factor kali lipat record
         """
+        if layout not in ("row", "columnar"):
+            return Exception(f"Layout tabel {layout} tidak dikenal")
+        if compression is not None and compression not in COMPRESSION_METHODS:
+            return Exception(f"Kompresi tabel {compression} tidak dikenal")
         if database_name in self.blocks:
             if table_name not in self.blocks[database_name]:
                 self.blocks[database_name][table_name] = {
                     "columns" : [{"name" : nama_col, "type" : tipe_col} for nama_col, tipe_col in column_type.items()],
-                    "values" : [[]],
+                    "n_blocks" : 0,
+                    "free_blocks" : set(),
+                    "layout" : layout,
+                    "compression" : compression,
                 } 
                 for info in informasi_tambahan:
                     for i in range(len(self.blocks[database_name][table_name]["columns"])):
                         if self.blocks[database_name][table_name]["columns"][i]["name"] == info:
                             self.blocks[database_name][table_name]["columns"][i]["constraints"] = informasi_tambahan[info]
-                # 1 block berkapasitas 4096 byte, asumsi setiap record perlu 4 byte untuk overhead
-                byte_per_record = 4
-                for column in self.blocks[database_name][table_name]["columns"]:
-                    if column["type"] == "INTEGER" or column["type"] == "FLOAT":
-                        byte_per_record+=4
-                    elif column["type"] == "CHAR":
-                        byte_per_record+=1
-                    elif "VARCHAR" in column["type"] or "CHAR" in column["type"]: # VARCHAR atau CHAR
-                        byte_per_record += int(column["type"][8:(len(column["type"])-1)])
-                    else:
-                        return Exception("Ada tipe bentukan yang tidak cocok,", column["type"])
-                self.blocks[database_name][table_name]["max_record"] = 4096//byte_per_record
+                # 1 block = 1 page, max_record dihitung dari ukuran encoding record di page (string sepanjang batas VARCHAR-nya)
+                tipe_kolom = [column["type"] for column in self.blocks[database_name][table_name]["columns"]]
+                try:
+                    record_per_page = records_per_page(tipe_kolom, layout == "columnar")
+                except ValueError as e:
+                    del self.blocks[database_name][table_name]
+                    return Exception(str(e))
+                self.blocks[database_name][table_name]["max_record"] = record_per_page * (self.compressed_block_factor if compression else 1)
+                self.table_stats[(database_name, table_name)] = TableStats()
+                self.dirty_tables.add((database_name, table_name))
+                self.catalog_dirty = True
                 return True
             return Exception(f"Sudah ada table dengan nama {table_name} di database {database_name}")
         return Exception(f"Tidak ada database dengan nama {database_name}")
@@ -277,17 +1061,20 @@ class StorageEngine:
         """
         if database_name in self.blocks:
             if table_name in self.blocks[database_name]:
-                self.buffer[transaction_id] = self.buffer.get(transaction_id, copy.deepcopy(self.blocks))
-                temp = self.buffer[transaction_id][database_name][table_name]["values"]
-                dimasukin = False
-                for block in temp:
-                    if len(block) < self.buffer[transaction_id][database_name][table_name]["max_record"]:
-                        block.append(data_insert)
-                        dimasukin = True
-                        break
-                if not dimasukin:
-                    temp.append([data_insert]) 
-                self.buffer[transaction_id][database_name][table_name]["values"] = temp
+                # block tujuan diambil dari free-space map, kalau semua penuh bikin block baru di akhir tabel
+                max_record = self.blocks[database_name][table_name]["max_record"]
+                free_blocks = self.workspace_free_space_map(database_name, table_name, transaction_id)
+                target = next(iter(free_blocks), None)
+                if target is None:
+                    target = self.get_workspace(database_name, table_name, transaction_id).n_blocks
+                block = self.writable_block(database_name, table_name, target, transaction_id)
+                record = self.get_heap_file(database_name, table_name).schema.record(data_insert)
+                block.append(record)
+                self.get_workspace(database_name, table_name, transaction_id).stats.add(record)
+                if len(block) < max_record:
+                    free_blocks.add(target)
+                else:
+                    free_blocks.discard(target)
                 return True
             return Exception(f"Tidak ada table dengan nama {table_name} di database {database_name}")
         return Exception(f"Tidak ada database dengan nama {database_name}")
@@ -307,12 +1094,29 @@ class StorageEngine:
         if column not in self.indexes[database_name][table_name]:
             self.indexes[database_name][table_name][column] = {}
 
-    def read_block(self, data_retrieval:DataRetrieval, database_name:str, transaction_id:int) -> Rows|Exception:
+    def read_block(self, data_retrieval:DataRetrieval, database_name:str, transaction_id:int) -> Rows[Record]|Exception:
         """
         Bakal ngeread block dan akan mereturn tipe bentukan Row (liat QueryProcessor/Rows.py)\n
         untuk argumennya silahkan liat tipe bentukan DataRetrieval di atas\n
         akan mencoba mereturn data hasil edit transaction_id, jika tidak ada, akan direturn data default.\n
-        kalo mau ngambil data default, kasih transaction_id = -1 (atau angka apapun yang gaakan dipakai untuk transaction_id)
+        kalo mau ngambil data default, kasih transaction_id = -1 (atau angka apapun yang gaakan dipakai untuk transaction_id)\n
+        semua record hasilnya dibaca sekaligus, untuk hasil yang besar pakai open_cursor
+        """
+        cursor = self.open_cursor(data_retrieval, database_name, transaction_id)
+        if isinstance(cursor, Exception):
+            return cursor
+        with cursor:
+            hasil_akhir = list(cursor)
+        # return akhir
+        return Rows(hasil_akhir, len(hasil_akhir), cursor.identifier)
+
+    def open_cursor(self, data_retrieval:DataRetrieval, database_name:str, transaction_id:int, on_close = None) -> Cursor|Exception:
+        """
+        sama seperti read_block, tapi record hasilnya dibaca dari block sedikit-sedikit lewat Cursor (lihat StorageManager/Cursor.py).
+        cursor yang tidak dibaca sampai habis harus ditutup, on_close dipanggil saat cursor ditutup
+
+        Contoh : with storageEngine.open_cursor(DataRetrieval(["users"], [], []), "database1", -1) as cursor:
+                    sepuluh_pertama = cursor.fetch(10)
         """
         # error handling
         if database_name not in self.blocks:
@@ -334,42 +1138,58 @@ class StorageEngine:
 
         # di bawah ini, udah pasti tidak ada error dari input
 
-        # cross terlebih dahulu dari tabel-tabel yang dipilih
+        # query satu tabel yang semua kolomnya ada di satu B+ tree (covering index) dijawab dari index saja tanpa baca heap
+        if len(data_retrieval.table) == 1 and data_retrieval.column and data_retrieval.conditions:
+            hasil_index = self.index_only_rows(database_name, data_retrieval.table[0], transaction_id, data_retrieval.column, data_retrieval.conditions, any_of=not data_retrieval.all_of)
+            if hasil_index is not None:
+                return Cursor(iter(hasil_index), str(data_retrieval.table), on_close)
 
-        data_dibaca = self.buffer.get(transaction_id, copy.deepcopy(self.blocks))
+        # cross terlebih dahulu dari tabel-tabel yang dipilih
 
-        hasil_cross = []
-        for blocks in data_dibaca[database_name][data_retrieval.table[0]]["values"]:
-            for records in blocks:
-                hasil_cross.append(records) 
+        # record dibaca langsung dari block (snapshot read-only, tanpa dicopy),
+        # hasil cross berupa Record gabungan (kolom tabel yang belakangan menang)
+        # kalau ada proyeksi, tabel columnar cukup membentuk kolom yang diproyeksikan dan dipakai kondisi
+        kolom_dibutuhkan = None
+        if data_retrieval.column:
+            kolom_dibutuhkan = set(data_retrieval.column) | {kondisi.column for kondisi in data_retrieval.conditions or []}
+        tabel_utama = data_retrieval.table[0]
+        hasil_cross = self.iter_rows(database_name, tabel_utama, transaction_id, kolom_dibutuhkan, self.use_mmap_scan(database_name, tabel_utama))
         for tabel_lainnya in data_retrieval.table[1:]:
-            temp = []
-            for blocks in data_dibaca[database_name][tabel_lainnya]["values"]:
-                for records in blocks:
-                    temp.append(records)
-            temp_hasil = []
-            for row_hasil_cross in hasil_cross:
-                for row_hasil_temp in temp:
-                    temp_hasil.append({**row_hasil_cross, **row_hasil_temp})
-            hasil_cross = temp_hasil
-
-        # lalu hapus data dari hasil_cross yang tidak memenuhi kondisi
-        hasil_operasi = []
-        if data_retrieval.conditions:
-            for kondisi in data_retrieval.conditions:
-                for row in hasil_cross:
-                    if kondisi.evaluate(row[kondisi.column]):
-                        hasil_operasi.append(row)
+            temp = list(self.iter_rows(database_name, tabel_lainnya, transaction_id, kolom_dibutuhkan, self.use_mmap_scan(database_name, tabel_lainnya)))
+            hasil_cross = StorageEngine.cross_rows(hasil_cross, temp)
+
+        # lalu buang data dari hasil_cross yang tidak memenuhi kondisi (kondisinya di-OR seperti WHERE ... OR ..., di-AND kalau all_of)
+        # untuk satu tabel kondisinya langsung dievaluasi per block
+        all_of = data_retrieval.all_of
+        if data_retrieval.conditions and len(data_retrieval.table) == 1:
+            hasil_operasi = self.iter_filtered_rows(database_name, tabel_utama, transaction_id, data_retrieval.conditions, any_of=not all_of, columns=kolom_dibutuhkan, mapped=self.use_mmap_scan(database_name, tabel_utama))
+        elif data_retrieval.conditions:
+            gabung = all if all_of else any
+            hasil_operasi = (row for row in hasil_cross if gabung(kondisi.evaluate(row[kondisi.column]) for kondisi in data_retrieval.conditions))
         else:
             hasil_operasi = hasil_cross
 
-        # lalu ambil hanya kolom yang diinginkan
+        # lalu ambil hanya kolom yang diinginkan (proyeksi = ambil posisi di tuple record)
         if data_retrieval.column:
-            hasil_akhir = [{key: d[key] for key in data_retrieval.column if key in d} for d in hasil_operasi]
+            hasil_akhir = (d.project(data_retrieval.column) for d in hasil_operasi)
         else: 
+            # Record read-only, jadi record aslinya (yang masih dipakai buffer pool) bisa langsung dikembalikan
             hasil_akhir = hasil_operasi
-        # return akhir
-        return Rows(hasil_akhir, len(hasil_akhir), str(data_retrieval.table))
+        return Cursor(StorageEngine.closing_rows(hasil_akhir, hasil_cross), str(data_retrieval.table), on_close)
+
+    @staticmethod
+    def closing_rows(rows, *sources):
+        """
+        ngeiterasi rows, saat selesai atau ditutup di tengah jalan generator-generator sources ikut ditutup
+        (scan tabel yang belum habis melepas pin page dan mmap-nya)
+        """
+        try:
+            yield from rows
+        finally:
+            for source in sources:
+                close = getattr(source, "close", None)
+                if close is not None:
+                    close()
 
     def write_block(self, data_write: DataWrite, database_name: str, transaction_id: int) -> int | Exception:
         """
@@ -397,31 +1217,17 @@ class StorageEngine:
             
             # Tidak ada error, lanjutkan proses untuk tabel ini
             affected_rows = 0
-            data_baru = []
-            tempData = self.buffer.get(transaction_id, copy.deepcopy(self.blocks))
-            for block in tempData[database_name][table]["values"]:
-                block_baru = []
-                for record in block:
-                    update_row = False
-                    recordBaru = copy.deepcopy(record)
-                    if data_write.conditions:
-                        # Cek apakah row memenuhi semua kondisi
-                        update_row = all(kondisi.evaluate(recordBaru[kondisi.column]) for kondisi in data_write.conditions)
-                    else:
-                        # Jika tidak ada kondisi, semua baris akan diupdate
-                        update_row = True
-
-                    # Update nilai jika memenuhi kondisi
-                    if update_row:
-                        for col, value in zip(data_write.column, data_write.new_value):
-                            recordBaru[col] = value
-                        affected_rows += 1
-
-                    block_baru.append(recordBaru)
-                data_baru.append(block_baru)
-
-            tempData[database_name][table]["values"] = data_baru
-            self.buffer[transaction_id] = tempData
+            # block dan offset row yang memenuhi semua kondisi (jika tidak ada kondisi, semua baris akan diupdate)
+            for block_index, block, offsets in self.iter_matching_blocks(database_name, table, transaction_id, data_write.conditions or []):
+                # Update nilai yang memenuhi kondisi, hanya block dan record yang berubah yang dicopy
+                block_baru = self.writable_block(database_name, table, block_index, transaction_id)
+                stats = self.get_workspace(database_name, table, transaction_id).stats
+                perubahan = dict(zip(data_write.column, data_write.new_value))
+                for offset in offsets:
+                    stats.add(block_baru[offset], -1)
+                    block_baru[offset] = block_baru[offset].replace(perubahan)
+                    stats.add(block_baru[offset])
+                    affected_rows += 1
 
             affected_rows_total += affected_rows  # Tambahkan jumlah baris yang diubah untuk tabel ini
         
@@ -452,25 +1258,27 @@ class StorageEngine:
                     return Exception(f"Tidak ada kolom dengan nama {kondisi.column}")
                 
         # seharusnya tidak ada error di sini
-        data_baru = []
         affected_row = 0
-        tempData = self.buffer.get(transaction_id, copy.deepcopy(self.blocks))
-        for block in tempData[database_name][data_deletion.table]["values"]:
-            block_baru = []
-            for record in block:
-                if data_deletion.conditions:
-                    if not (all(kondisi.evaluate(record[kondisi.column]) for kondisi in data_deletion.conditions)):
-                        # berarti tidak memenuhi kondisi, bakal dicopy
-                        block_baru.append(record)
-                    else:
-                        affected_row += 1
+        if not data_deletion.conditions:
+            # tanpa kondisi tidak ada record yang dihapus
+            print(f"Data berhasil dihapus, {affected_row} baris dihapus")
+            return affected_row
+        # hanya block yang kehilangan record yang masuk workspace transaksi
+        for block_index, block, offsets in self.iter_matching_blocks(database_name, data_deletion.table, transaction_id, data_deletion.conditions):
+            block_baru = self.writable_block(database_name, data_deletion.table, block_index, transaction_id)
+            workspace = self.get_workspace(database_name, data_deletion.table, transaction_id)
+            hapus = set(offsets)
+            sisa = []
+            for offset, record in enumerate(block_baru):
+                if offset in hapus:
+                    workspace.stats.add(record, -1)
                 else:
-                    block_baru.append(record)
-            data_baru.append(block_baru)
+                    sisa.append(record)
+            block_baru[:] = sisa
+            affected_row += len(hapus)
+            if workspace.free_blocks is not None:
+                workspace.free_blocks.add(block_index)
         
-        # self.buffer[transaction_id] = copy.deepcopy(self.blocks)
-        tempData[database_name][data_deletion.table]["values"] = data_baru 
-        self.buffer[transaction_id] = tempData
         print(f"Data berhasil dihapus, {affected_row} baris dihapus")
         return affected_row
     
@@ -486,7 +1294,7 @@ class StorageEngine:
         2. b_r : int ==> jumlah blok yang berisi tuple dalam tabel
         3. l_r : int ==> ukuran satu tuple dalam tabel
         4. f_r : int ==> blocking factor (jumlah tuple dalam satu blok)
-        5. V_a_r : dict[str, int] ==> jumlah nilai unik dari setiap atribut dalam tabel
+        5. V_a_r : dict[str, int] ==> jumlah nilai unik dari setiap atribut dalam tabel (perkiraan HyperLogLog kalau n_r >= sketch_stats_rows)
                             contoh keluaran : {"id_user" : 100, "nama_user" : 50}
         6. col_data_type: dict[str, str]  ==> tipe data dari setiap kolom dalam tabel
                             contoh keluaran : {"id_user" : "INTEGER", "nama_user" : "TEXT"}
@@ -498,6 +1306,12 @@ class StorageEngine:
                             contoh keluaran : {"id_user" : [1,1], "nama_user" : [0,1]}
         8. col_bplus_tree_level : dict[str, int] ==> level dari B+ tree yang ada pada setiap kolom dalam tabel
                             contoh keluaran : {"id_user" : 2, "nama_user" : 3}
+        9. col_histogram : dict[str, list] ==> histogram equi-depth tiap kolom, kosong kalau tabel belum di-ANALYZE
+        10. col_mcv : dict[str, list[tuple]] ==> most common values tiap kolom, kosong kalau tabel belum di-ANALYZE
+        11. col_composite_index : dict[tuple[str, ...], [int, int]] ==> index komposit (bplus, hash) per tuple kolom,
+                            kolom pertama B+ tree komposit juga ditandai punya index bplus di col_index
+        12. col_index_include : dict[str|tuple[str, ...], list[str]] ==> kolom include tiap B+ tree (list kosong kalau tidak ada)
+        13. compression_ratio : float ==> ukuran block sebelum / sesudah dikompresi untuk block yang sudah ditulis ke heap file
         """
 
         if database_name not in self.blocks:
@@ -506,11 +1320,12 @@ class StorageEngine:
             raise ValueError(f"Tidak ada table dengan nama {table_name}")
         
         table = self.blocks[database_name][table_name]
-        rows = table["values"]
         columns = table["columns"]
+        # statistik diperbarui tiap commit (lihat TableStats), jadi di sini tidak perlu scan tabel
+        stats = self.get_table_stats(database_name, table_name)
 
         # 1. nr
-        nr = sum(len(block) for block in rows)
+        nr = stats.n_r
 
         # 2. lr
         type_size = {
@@ -528,63 +1343,144 @@ class StorageEngine:
         br = (nr + fr -1) // fr if fr > 0 else 0
 
         # 5. V(A,r)
-        V_a_r = {}
+        V_a_r = stats.distinct([col["name"] for col in columns])
+
+        # 7-8. index tiap kolom dan tinggi B+ tree-nya
+        col_index = {}
+        col_bplus_tree_level = {}
+        indexes = self.indexes.get(database_name, {}).get(table_name, {})
+        for column in [col["name"] for col in columns]:
+            entry = indexes.get(column, {})
+            bplus, hash_index = entry.get("bplus"), entry.get("hash")
+            col_index[column] = [int(bplus is not None), int(hash_index is not None)]
+            if bplus is not None:
+                col_bplus_tree_level[column] = bplus.get_bplus_tree_level()
+
+        # 11. index komposit, B+ tree komposit juga terhitung index bplus untuk kolom pertamanya
+        col_composite_index = {}
+        for key, entry in indexes.items():
+            if not isinstance(key, tuple):
+                continue
+            bplus, hash_index = entry.get("bplus"), entry.get("hash")
+            if bplus is None and hash_index is None:
+                continue
+            col_composite_index[key] = [int(bplus is not None), int(hash_index is not None)]
+            if bplus is not None and key[0] in col_index and not col_index[key[0]][0]:
+                col_index[key[0]][0] = 1
+                col_bplus_tree_level[key[0]] = bplus.get_bplus_tree_level()
+
+        # 12. kolom include tiap B+ tree
+        col_index_include = {key: list(entry.get("include", ())) for key, entry in indexes.items() if entry.get("bplus") is not None}
+
+        # 13. rasio kompresi page, dari ukuran block yang dicatat saat ditulis ke heap file (tidak perlu baca page)
+        compression_ratio = self.get_heap_file(database_name, table_name).compression_ratio() if table.get("compression") else 1.0
+
+        return Statistic(n_r=nr, b_r=br, l_r=lr, f_r=fr, V_a_r=V_a_r, col_index=col_index, col_bplus_tree_level=col_bplus_tree_level, col_histogram=stats.histograms, col_mcv=stats.mcv, col_composite_index=col_composite_index, col_index_include=col_index_include, compression_ratio=compression_ratio)
 
-        for col in columns:
-            attribute = col["name"]
-            V_a_r[attribute] = len(set(row[attribute] for row in rows if attribute in row))
+    def analyze(self, database_name:str, table_name:str = None) -> list[str]:
+        """
+        ANALYZE : ngebangun histogram equi-depth dan MCV list tiap kolom (lihat TableStats.analyze) dari data yang sudah di-commit,
+        hasilnya ikut tersimpan di file statistik tabel saat save dan dipakai get_stats.
+        Param : database_name (string), table_name (string, None = semua tabel di database)
 
-        return Statistic(n_r=nr, b_r=br, l_r=lr, f_r=fr, V_a_r=V_a_r)
+        Contoh : storageEngine.analyze("database1", "users")
+        """
+        if database_name not in self.blocks:
+            raise ValueError(f"Tidak ada database dengan nama {database_name}")
+        if table_name is not None and table_name not in self.blocks[database_name]:
+            raise ValueError(f"Tidak ada table dengan nama {table_name}")
+        tables = [table_name] if table_name is not None else list(self.blocks[database_name])
+        for table in tables:
+            columns = [column["name"] for column in self.blocks[database_name][table]["columns"]]
+            rows = self.iter_rows(database_name, table, -1, mapped=self.use_mmap_scan(database_name, table))
+            self.get_table_stats(database_name, table).analyze(rows, columns)
+            self.dirty_tables.add((database_name, table))
+        return tables
     
     """
     ==============  INDEX FOR USE   ========================================================================================
     """
     
      # setindex ke buffer
-    def set_index(self, database_name: str, table_name: str, column: str, transaction_id:int,index_type) -> None:
-        if transaction_id not in self.buffer_index:
-            self.buffer_index[transaction_id] = copy.deepcopy(self.indexes)
-        if database_name not in self.buffer_index[transaction_id]:
-            self.buffer_index[transaction_id][database_name] = {}
-        if table_name not in self.buffer_index[transaction_id][database_name]:
-            self.buffer_index[transaction_id][database_name][table_name] = {}
-        if column not in self.buffer_index[transaction_id][database_name][table_name]:
-            self.buffer_index[transaction_id][database_name][table_name][column] = {}
-        if "bplus" not in self.buffer_index[transaction_id][database_name][table_name][column]:
-            self.buffer_index[transaction_id][database_name][table_name][column]["bplus"] = None
-        if "hash" not in self.buffer_index[transaction_id][database_name][table_name][column]:  
-            self.buffer_index[transaction_id][database_name][table_name][column]["hash"] = None
+    def set_index(self, database_name: str, table_name: str, column: str|list[str]|tuple[str, ...], transaction_id:int,index_type, order:int = None, include:list[str]|tuple[str, ...] = None) -> None:
+        """
+        membuat index hash atau bplus di kolom tabel, baru terpasang saat transaksi di-commit.
+        column : satu kolom, atau list/tuple kolom untuk index komposit (key-nya tuple nilai kolom-kolom itu sesuai urutannya,
+                 B+ tree komposit juga bisa dipakai untuk kondisi di prefix kolomnya)
+        order : order B+ tree, None = dipilih dari ukuran page dan lebar kolom (lihat bplus_order)
+        include : kolom tambahan yang nilainya ikut disimpan di leaf B+ tree (covering index, CREATE INDEX ... INCLUDE (...)),
+                  query yang cuma butuh kolom index dan kolom include dibaca dari index saja tanpa baca heap (lihat index_only_rows)
+        """
+        if order is not None and index_type != "bplus":
+            raise ValueError("order hanya berlaku untuk index bplus")
+        if include and index_type != "bplus":
+            raise ValueError("include hanya berlaku untuk index bplus")
+        column = StorageEngine.index_key(column)
+        self.key_width(database_name, table_name, column)  # semua kolomnya harus ada
+        include = tuple(include or ())
+        if include:
+            self.key_width(database_name, table_name, include)
+            sudah_di_key = [name for name in include if name in StorageEngine.index_columns(column)]
+            if sudah_di_key or len(set(include)) != len(include):
+                raise ValueError(f"Kolom include harus berbeda dan bukan kolom index : {', '.join(sudah_di_key or include)}")
+        # buffer_index transaksi cuma berisi index yang dibuat transaksi itu, index yang sudah di-commit tetap dipakai bersama
+        if index_type not in ("bplus", "hash"):
+            raise ValueError("Invalid index type. Only 'bplus' and 'hash' are supported.")
+        pending = self.buffer_index.setdefault(transaction_id, {}).setdefault(database_name, {}).setdefault(table_name, {}).setdefault(column, {})
+        if isinstance(getattr(pending.get(index_type), "store", None), PagedNodeStore):
+            # index yang dibuat transaksi ini sebelumnya di kolom yang sama diganti, file-nya dibuang
+            pending[index_type].store.drop()
 
-        table = self.blocks[database_name][table_name]
+        # dibangun dari data yang sudah di-commit, perubahan transaksi ini masuk ke index lewat commit_buffer
+        blocks = self.iter_blocks(database_name, table_name, -1)
         if index_type == "bplus":
-            bplus_tree = self.create_bplus_index(table, column)
-            self.buffer_index[transaction_id][database_name][table_name][column]["bplus"] = bplus_tree
-        elif index_type == "hash":
-            hash_index = self.create_hash_index(table, column)
-            self.buffer_index[transaction_id][database_name][table_name][column]["hash"] = hash_index
+            order = order if order is not None else self.bplus_order(database_name, table_name, column, include)
+            pending["bplus"] = self.create_bplus_index(blocks, column, self.index_path(database_name, table_name, column), order, include)
+            pending["include"] = include
         else:
-            raise ValueError("Invalid index type. Only 'bplus' and 'hash' are supported.")
-        print(f"Index of type '{index_type}' created for column '{column}' in table '{table_name}'.")
+            pending["hash"] = self.create_hash_index(blocks, column, self.index_path(database_name, table_name, column, "hash"), self.hash_bucket_capacity(database_name, table_name, column))
+        self.created_indexes.setdefault(transaction_id, set()).add((database_name, table_name, column, index_type))
+        print(f"Index of type '{index_type}' created for column '{', '.join(StorageEngine.index_columns(column))}' in table '{table_name}'.")
 
     def insert_key_value_to_index(self, database_name:str, table_name:str, column:str, key, block_index, offset, transaction_id:int) -> None:
         if self.is_bplus_index_exist(database_name, table_name, column, transaction_id):
             self.insert_bplus_index(database_name, table_name, column, key, block_index, offset, transaction_id)
         if self.is_hash_index_exist(database_name, table_name, column, transaction_id):
             self.insert_hash_index(database_name, table_name, column, key, block_index, offset, transaction_id)
-    
-    
-    # def update_key_to_index(self, database_name:str, table_name:str, column:str, key, block_index, offset, transaction_id:int) -> None:
-    #     if self.is_bplus_index_exist(database_name, table_name, column):
-    #         self.update_bplus_index(database_name, table_name, column, key, block_index, offset, transaction_id)
-    #     if self.is_hash_index_exist(database_name, table_name, column):
-    #         self.update_key_hash_index(database_name, table_name, column, old_key, block_index, offset, transaction_id)
 
     def delete_key_value_from_index(self, database_name:str, table_name:str, column:str, key, transaction_id:int) -> None:
-        if self.is_bplus_index_exist(database_name, table_name, column):
+        if self.is_bplus_index_exist(database_name, table_name, column, transaction_id):
             self.delete_bplus_index(database_name, table_name, column, key, transaction_id)
-        if self.is_hash_index_exist(database_name, table_name, column):
+        if self.is_hash_index_exist(database_name, table_name, column, transaction_id):
             self.delete_hash_index(database_name, table_name, column, key, transaction_id)
 
+    def add_index_op(self, database_name:str, table_name:str, column:str, index_type:str, op:str, key, value, transaction_id:int) -> None:
+        """
+        operasi index manual ("insert" posisi value = (block, offset) ke key, atau "delete" semua posisi key) dicatat di index_ops,
+        index-nya sendiri baru diubah saat commit_buffer. sebelum commit operasinya cuma terlihat lewat search index transaksi itu
+        """
+        locator = self.bplus_locator if index_type == "bplus" else self.hash_locator
+        locator(database_name, table_name, column, transaction_id)  # error kalau index-nya tidak ada
+        self.index_ops.setdefault(transaction_id, []).append((database_name, table_name, column, index_type, op, key, value))
+
+    def pending_index_ops(self, database_name:str, table_name:str, column:str, index_type:str, transaction_id:int) -> list[tuple]:
+        """list (op, key, value) operasi index manual transaksi yang belum di-commit untuk satu index"""
+        return [(op, key, value) for op_database, op_table, op_column, op_type, op, key, value in self.index_ops.get(transaction_id, ())
+                if (op_database, op_table, op_column, op_type) == (database_name, table_name, column, index_type)]
+
+    @staticmethod
+    def buffered_positions(positions:list, key, ops:list[tuple]) -> list[tuple]:
+        """posisi (block, offset) key di index setelah ops (hasil pending_index_ops) dipasang"""
+        positions = [position[:2] for position in positions]
+        for op, op_key, value in ops:
+            if op_key != key:
+                continue
+            if op == "delete":
+                positions = []
+            elif value not in positions:
+                positions.append(value)
+        return positions
+
     def print_index_structure(self, database_name: str, table_name: str, column: str, transaction_id: int) -> None:
         # Check if a hash index exists in the block
         if self.is_hash_index_in_block(database_name, table_name, column):
@@ -630,17 +1526,11 @@ class StorageEngine:
     ==========================================================================================================================
     """
     def validate_column_buffer(self, database_name: str, table_name: str, column: str, trancaction_id:int) -> None:
-        temp = self.buffer.get(trancaction_id, self.blocks)
-        if database_name not in temp:
-            if database_name not in self.blocks :
-                raise ValueError(f"Database '{database_name}' does not exist.")
-        if table_name not in temp[database_name] :
-            if table_name not in self.blocks[database_name]:
-                raise ValueError(f"Table '{table_name}' does not exist.")
-            else :
-                table = self.blocks[database_name][table_name]
-        else :
-            table = temp[database_name][table_name] 
+        if database_name not in self.blocks :
+            raise ValueError(f"Database '{database_name}' does not exist.")
+        if table_name not in self.blocks[database_name]:
+            raise ValueError(f"Table '{table_name}' does not exist.")
+        table = self.blocks[database_name][table_name]
         if not any(col["name"] == column for col in table["columns"]):
             raise ValueError(f"Column '{column}' does not exist in table '{table_name}'.")
         
@@ -669,7 +1559,7 @@ class StorageEngine:
                 database_name in self.buffer_index[transaction_id] and
                 table_name in self.buffer_index[transaction_id][database_name] and
                 column in self.buffer_index[transaction_id][database_name][table_name] and
-                "hash" in self.buffer_index[transaction_id][database_name][table_name][column]
+                self.buffer_index[transaction_id][database_name][table_name][column].get("hash") is not None
             )
         except KeyError:
             return False
@@ -689,7 +1579,7 @@ class StorageEngine:
                 database_name in self.buffer_index[transaction_id] and
                 table_name in self.buffer_index[transaction_id][database_name] and
                 column in self.buffer_index[transaction_id][database_name][table_name] and
-                "bplus" in self.buffer_index[transaction_id][database_name][table_name][column]
+                self.buffer_index[transaction_id][database_name][table_name][column].get("bplus") is not None
             )
         except KeyError:
             return False
@@ -697,72 +1587,141 @@ class StorageEngine:
     def is_bplus_index_in_block(self, database_name: str, table_name: str, column: str) -> bool:
         return self.indexes[database_name][table_name][column]["bplus"] is not None
 
-    def create_bplus_index(self, table : dict, column: str):
-        bplus_tree = BPlusTree(order=4)
-        for block_index, block in enumerate(table["values"]):
-            for offset, row in enumerate(block):
-                if column not in row:
-                    raise ValueError(f"Column '{column}' is missing in a row of the table.")
-                key = row[column]
-                bplus_tree.insert(key,(block_index,offset))
-        return bplus_tree
-    
-    # setelah insert delete
-    def is_bplus_index_exist(self, database_name: str, table_name: str, column: str, transaction_id: int) -> bool:
-        temp = self.buffer_index.get(transaction_id, self.indexes)
-        # for _, dbs in self.buffer_index.items():
-        #     if database_name not in dbs:
-        #         continue
-        #     if table_name not in dbs[database_name]:
-        #         continue
-        #     if column not in dbs[database_name][table_name]:
-        #         continue
-        #     if "bplus" in dbs[database_name][table_name][column]:
-        #         if dbs[database_name][table_name][column]["bplus"] is not None:
-        #             return True
-        for _, dbs in temp.items():
-            if table_name not in dbs:
-                continue
-            if column not in dbs[table_name]:
+    def is_composite_index_usable(self, database_name: str, table_name: str, column: str, equal_columns: set[str]) -> bool:
+        """
+        apakah kondisi di column bisa dicari lewat index komposit yang sudah di-commit, kalau kolom-kolom equal_columns
+        dicari dengan "=" (di-AND) di query yang sama : B+ tree yang kolom sebelum column semuanya ada di equal_columns,
+        atau hash index yang semua kolomnya ada di equal_columns
+        """
+        for key, entry in self.indexes.get(database_name, {}).get(table_name, {}).items():
+            if not isinstance(key, tuple) or column not in key:
                 continue
-            if "bplus" in dbs[table_name][column]:
-                if dbs[table_name][column]["bplus"] is not None:
-                    return True
+            if entry.get("bplus") is not None and set(key[:key.index(column)]) <= equal_columns:
+                return True
+            if entry.get("hash") is not None and column in equal_columns and set(key) <= equal_columns:
+                return True
         return False
+
+    @staticmethod
+    def index_columns(column:str|tuple[str, ...]) -> tuple[str, ...]:
+        """kolom-kolom yang diindex : index satu kolom disimpan dengan nama kolomnya, index komposit dengan tuple nama kolom"""
+        return column if isinstance(column, tuple) else (column,)
+
+    @staticmethod
+    def index_key(column:str|list[str]|tuple[str, ...]) -> str|tuple[str, ...]:
+        """
+        key index di self.indexes untuk kolom (atau list kolom) yang diberikan user : nama kolom untuk satu kolom, tuple untuk komposit
+        """
+        if isinstance(column, str):
+            return column
+        columns = tuple(column)
+        if not columns or len(set(columns)) != len(columns):
+            raise ValueError("Kolom index komposit harus berbeda dan tidak boleh kosong")
+        return columns[0] if len(columns) == 1 else columns
+
+    def index_path(self, database_name:str, table_name:str, column:str|tuple[str, ...], extension:str = "bpt") -> str:
+        """
+        path file baru untuk index kolom tabel (data/<database>/<tabel>.<kolom>.<n>.bpt, .hash untuk hash index,
+        kolom index komposit digabung dengan "+"), n dicari yang belum dipakai biar index lama tetap utuh sampai index baru di-commit
+        """
+        name = "+".join(StorageEngine.index_columns(column))
+        n = 0
+        while True:
+            path = os.path.join(self.data_dir, database_name, f"{table_name}.{name}.{n}.{extension}")
+            if not os.path.exists(path):
+                return path
+            n += 1
+
+    @staticmethod
+    def column_width(column_type:str) -> int:
+        """perkiraan ukuran nilai sebuah kolom dalam byte, untuk menghitung ukuran entry index"""
+        if column_type in ("INTEGER", "FLOAT"):
+            return 4
+        if column_type == "CHAR":
+            return 1
+        if "CHAR" in column_type:
+            return int(column_type[column_type.index("(") + 1:-1])
+        return 8
+
+    def key_width(self, database_name:str, table_name:str, column:str|tuple[str, ...]) -> int:
+        """ukuran key index dalam byte, untuk index komposit jumlah ukuran semua kolomnya"""
+        types = {column_info["name"]: column_info["type"] for column_info in self.blocks[database_name][table_name]["columns"]}
+        width = 0
+        for name in StorageEngine.index_columns(column):
+            if name not in types:
+                raise ValueError(f"Tidak ada kolom {name} di tabel {table_name}")
+            width += StorageEngine.column_width(types[name])
+        return width
+
+    def bplus_order(self, database_name:str, table_name:str, column:str|tuple[str, ...], include:tuple[str, ...] = ()) -> int:
+        """
+        order B+ tree untuk kolom tabel : sebanyak mungkin entry yang muat di satu page (lihat order_for_page),
+        kolom include ikut disimpan di tiap entry leaf jadi lebarnya ikut dihitung
+        """
+        width = self.key_width(database_name, table_name, column)
+        if include:
+            width += self.key_width(database_name, table_name, include)
+        return order_for_page(width)
+
+    def hash_bucket_capacity(self, database_name:str, table_name:str, column:str|tuple[str, ...]) -> int:
+        """
+        jumlah key per bucket hash index untuk kolom tabel : sebanyak mungkin yang muat di satu page
+        """
+        return bucket_capacity_for_page(self.key_width(database_name, table_name, column))
+
+    def create_bplus_index(self, blocks, column: str|tuple[str, ...], path: str = None, order: int = None, include: tuple[str, ...] = ()):
+        """
+        bangun B+ tree dari blocks, disimpan per node di file path (node dibaca lewat buffer pool) atau di memori kalau path None.
+        order None = order untuk key 8 byte (lihat order_for_page). nilai kolom include ikut disimpan di value leaf-nya
+        """
+        store = BPlusNodeStore(path, self.pool) if path is not None else None
+        entries = external_sort(StorageEngine.index_entries(blocks, column, include), key=itemgetter(0), run_size=self.index_sort_run)
+        order = order if order is not None else order_for_page(8)
+        return BPlusTree.bulk_load(entries, order=order, fill_factor=self.index_fill_factor, store=store)
+
+    @staticmethod
+    def index_entries(blocks, column:str|tuple[str, ...], include:tuple[str, ...] = ()):
+        """
+        pasangan (key, (block_index, offset)) untuk semua record di blocks, nilai NULL tidak masuk index.
+        key index komposit berupa tuple nilai kolom-kolomnya, record yang salah satu kolomnya NULL tidak masuk index.
+        kalau ada kolom include value-nya (block_index, offset, tuple nilai kolom include), nilai include boleh NULL
+        """
+        if isinstance(column, tuple):
+            for block_index, block in enumerate(blocks):
+                for offset, row in enumerate(block):
+                    missing = [name for name in column + include if name not in row]
+                    if missing:
+                        raise ValueError(f"Column '{missing[0]}' is missing in a row of the table.")
+                    key = tuple(row[name] for name in column)
+                    if None not in key:
+                        yield key, StorageEngine.index_value(row, block_index, offset, include)
+            return
+        for block_index, block in enumerate(blocks):
+            for offset, row in enumerate(block):
+                missing = [name for name in (column,) + include if name not in row]
+                if missing:
+                    raise ValueError(f"Column '{missing[0]}' is missing in a row of the table.")
+                if row[column] is not None:
+                    yield row[column], StorageEngine.index_value(row, block_index, offset, include)
+
+    @staticmethod
+    def index_value(row, block_index:int, offset:int, include:tuple[str, ...] = ()) -> tuple:
+        """value entry index untuk record row : posisinya, ditambah tuple nilai kolom include kalau ada"""
+        if not include:
+            return (block_index, offset)
+        return (block_index, offset, tuple(row[name] for name in include))
     
+    def is_bplus_index_exist(self, database_name: str, table_name: str, column: str, transaction_id: int) -> bool:
+        return self.table_indexes(database_name, table_name, transaction_id).get(column, {}).get("bplus") is not None
+
     def is_hash_index_exist(self, database_name: str, table_name: str, column: str, transaction_id: int) -> bool:
-        temp = self.buffer_index.get(transaction_id, self.indexes)
-        # for transaction_id, dbs in self.buffer_index.items():
-        #     if database_name not in dbs:
-        #         continue
-        #     if table_name not in dbs[database_name]:
-        #         continue
-        #     if column not in dbs[database_name][table_name]:
-        #         continue
-        #     if "bplus" in dbs[database_name][table_name][column]:
-        #         if dbs[database_name][table_name][column]["hash"] is not None:
-        #             return True
-        for _, dbs in temp.items():
-            if table_name not in dbs:
-                continue
-            if column not in dbs[table_name]:
-                continue
-            if "bplus" in dbs[table_name][column]:
-                if dbs[table_name][column]["bplus"] is not None:
-                    return True
-        return False
-    
+        return self.table_indexes(database_name, table_name, transaction_id).get(column, {}).get("hash") is not None
+
     def insert_bplus_index(self,database_name:str,table_name:str,column:str,key,block_index,offset,transaction_id : int):
-        if transaction_id not in self.buffer_index:
-            self.buffer_index[transaction_id] = copy.deepcopy(self.indexes)
-        index : BPlusTree = self.buffer_index[transaction_id][database_name][table_name][column]['bplus']
-        index.insert(key,(block_index,offset))
+        self.add_index_op(database_name, table_name, column, "bplus", "insert", key, (block_index, offset), transaction_id)
 
     def delete_bplus_index(self,database_name:str,table_name:str,column:str,key,transaction_id : int):
-        if transaction_id not in self.buffer_index:
-            self.buffer_index[transaction_id] = copy.deepcopy(self.indexes)
-        index : BPlusTree = self.buffer_index[transaction_id][database_name][table_name][column]['bplus']
-        index.delete(key)
+        self.add_index_op(database_name, table_name, column, "bplus", "delete", key, None, transaction_id)
 
     # panggil kalau yang diupdate search keynya
     def update_bplus_index(self,database_name:str,table_name:str,column:str,key,block_index,offset,transaction_id : int):
@@ -770,24 +1729,38 @@ class StorageEngine:
         self.insert_bplus_index(database_name,table_name,column,key,block_index,offset,transaction_id)
 
     def search_bplus_index(self,database_name:str,table_name:str,column:str,key,transaction_id : int) -> list:
-        self.validate_column_buffer(database_name,table_name,column,transaction_id)
-        if transaction_id not in self.buffer_index:
-            self.buffer_index[transaction_id] = copy.deepcopy(self.indexes)
-        index : BPlusTree = self.buffer_index[transaction_id][database_name][table_name][column]['bplus']
+        index : BPlusTree = self.bplus_locator(database_name, table_name, column, transaction_id)
         result_indices = index.search(key)
-        if result_indices :
-            real_value = self.get_value_for_position(database_name, table_name, result_indices[0], result_indices[1], transaction_id)
-            return real_value
-        else :
+        # key duplikat -> search balikin list posisi, ambil semua recordnya
+        if result_indices is None :
+            result_indices = []
+        elif not isinstance(result_indices, list) :
+            result_indices = [result_indices]
+        ops = self.pending_index_ops(database_name, table_name, column, "bplus", transaction_id)
+        if ops :
+            result_indices = StorageEngine.buffered_positions(result_indices, key, ops)
+        if not result_indices :
             return None
-        # return result_indices
+        real_values = []
+        for result in result_indices:
+            real_value = self.get_value_for_position(database_name, table_name, result[0], result[1], transaction_id)
+            real_values.append(real_value)
+        return real_values
 
     def search_bplus_index_range(self, database_name:str,table_name:str, column:str,  transaction_id:int,start,end) -> list:
-        self.validate_column_buffer(database_name,table_name,column,transaction_id)
-        if transaction_id not in self.buffer_index:
-            self.buffer_index[transaction_id] = copy.deepcopy(self.indexes)
-        index : BPlusTree = self.buffer_index[transaction_id][database_name][table_name][column]['bplus']
-        result_indices = index.search_range(start, end)
+        index : BPlusTree = self.bplus_locator(database_name, table_name, column, transaction_id)
+        ops = self.pending_index_ops(database_name, table_name, column, "bplus", transaction_id)
+        if ops :
+            per_key = {}
+            for key, value in index.items_range(start, end):
+                per_key.setdefault(key, []).append(value)
+            # key yang di-insert transaksi ini (belum di-commit) ikut dicari
+            for op, key, value in ops:
+                if op == "insert" and start <= key <= end:
+                    per_key.setdefault(key, [])
+            result_indices = [position for key in sorted(per_key) for position in StorageEngine.buffered_positions(per_key[key], key, ops)]
+        else :
+            result_indices = index.search_range(start, end)
         if result_indices :
             real_values = []
             for result in result_indices:
@@ -797,25 +1770,30 @@ class StorageEngine:
         else :
             return None
     
-    def create_hash_index(self, table: dict, column: str):
-        hash_index = HashTable(size=10)
-        for block_index, block in enumerate(table["values"]):
-            for offset, row in enumerate(block):
-                if column not in row:
-                    raise ValueError(f"Column '{column}' is missing in a row of the table.")
-                key = row[column]
-                hash_index.insert(key,(block_index,offset))
+    def create_hash_index(self, blocks, column: str|tuple[str, ...], path: str = None, bucket_capacity: int = None):
+        """
+        bangun hash index (extendible hashing) dari blocks, bucket disimpan per page di file path
+        (dibaca lewat buffer pool) atau di memori kalau path None
+        """
+        store = BucketStore(path, self.pool) if path is not None else None
+        hash_index = HashTable(size=1, bucket_capacity=bucket_capacity, store=store)
+        for key, position in StorageEngine.index_entries(blocks, column):
+            hash_index.insert(key, position)
         return hash_index
     
     def insert_hash_index(self, database_name:str, table_name:str, column:str, key, block_index, offset, transaction_id : int):
         index = self.hash_locator(database_name, table_name, column, transaction_id)
-        index.insert(key, (block_index, offset))
-        if index.search(key).count((block_index, offset)) == 0:
+        ops = self.pending_index_ops(database_name, table_name, column, "hash", transaction_id)
+        if (block_index, offset) in StorageEngine.buffered_positions(index.get(key, []), key, ops):
             raise ValueError("Error in inserting to hash index")
+        self.add_index_op(database_name, table_name, column, "hash", "insert", key, (block_index, offset), transaction_id)
 
     def search_hash_index(self,database_name:str,table_name:str,column:str,key,transaction_id : int):  
         index = self.hash_locator(database_name, table_name, column, transaction_id)
         result_indices = index.search(key)
+        ops = self.pending_index_ops(database_name, table_name, column, "hash", transaction_id)
+        if ops:
+            result_indices = StorageEngine.buffered_positions(result_indices or [], key, ops)
         if result_indices:
             real_values = []
             for result in result_indices:
@@ -827,19 +1805,28 @@ class StorageEngine:
 
     def delete_hash_index(self, database_name:str, table_name:str, column:str, key, transaction_id : int):
         index = self.hash_locator(database_name, table_name, column, transaction_id)
-        removed_value = index.delete_key(key)
+        ops = self.pending_index_ops(database_name, table_name, column, "hash", transaction_id)
+        removed_value = StorageEngine.buffered_positions(index.get(key, []), key, ops)
+        if not removed_value:
+            raise ValueError("Key not found in hash table.")
+        self.add_index_op(database_name, table_name, column, "hash", "delete", key, None, transaction_id)
         return removed_value
 
     def update_key_hash_index(self,database_name:str,table_name:str,column:str, old_key, new_key, transaction_id : int):
         removed_value = self.delete_hash_index(database_name,table_name,column, old_key,transaction_id)
         for value in removed_value :
             self.insert_hash_index(database_name, table_name, column, new_key, value[0], value[1], transaction_id)
-    
+
     def get_value_for_position(self, database_name:str, table_name:str, block_index, offset, transaction_id:int):
-        if transaction_id not in self.buffer_index:
-            self.buffer_index[transaction_id] = copy.deepcopy(self.indexes)
-        data = self.buffer[transaction_id][database_name][table_name]["values"]
-        return data[block_index][offset]
+        workspace = self.get_workspace(database_name, table_name, transaction_id)
+        if workspace and block_index in workspace.blocks:
+            return workspace.blocks[block_index][offset]
+        heap = self.get_heap_file(database_name, table_name)
+        block = self.pool.fetch(heap, block_index)
+        try:
+            return block[offset]
+        finally:
+            self.pool.unpin(heap, block_index)
 
     def debug(self):
         """cuma fungsi debug, literally ngeprint variabel"""
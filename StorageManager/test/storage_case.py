@@ -0,0 +1,22 @@
+import os
+import tempfile
+import unittest
+from StorageManager.classes import StorageEngine
+
+
+class StorageTestCase(unittest.TestCase):
+    """
+    Runs each test in its own temporary working directory, where StorageEngine keeps its files.
+    engine_settings overrides StorageEngine class attributes for the test; they are restored afterwards.
+    """
+    engine_settings = {}
+
+    def setUp(self):
+        cwd = os.getcwd()
+        tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(tmpdir.name)
+        self.addCleanup(tmpdir.cleanup)
+        self.addCleanup(os.chdir, cwd)
+        for name, value in self.engine_settings.items():
+            self.addCleanup(setattr, StorageEngine, name, getattr(StorageEngine, name))
+            setattr(StorageEngine, name, value)
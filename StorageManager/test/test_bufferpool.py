@@ -0,0 +1,91 @@
+import os
+import unittest
+from StorageManager.BufferPool import BufferPool
+from StorageManager.classes import StorageEngine, DataRetrieval, DataWrite, Condition
+from .storage_case import StorageTestCase
+
+class FakeFile:
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        self.reads = 0
+        self.writes = 0
+
+    def read_block(self, page_id):
+        self.reads += 1
+        return list(self.pages.get(page_id, []))
+
+    def write_block(self, page_id, page):
+        self.writes += 1
+        self.pages[page_id] = list(page)
+
+class TestBufferPool(unittest.TestCase):
+    def test_eviction_writes_back_dirty_pages(self):
+        file = FakeFile("fake.tbl")
+        pool = BufferPool(capacity=2)
+        pool.put(file, 0, [1])
+        pool.put(file, 1, [2])
+        pool.put(file, 2, [3])
+        self.assertEqual(len(pool.frames), 2, "Pool should never hold more than its capacity.")
+        self.assertEqual(file.writes, 1, "The evicted dirty page should be written back.")
+        self.assertEqual(pool.fetch(file, 0), [1])
+        pool.unpin(file, 0)
+
+    def test_pinned_pages_are_not_evicted(self):
+        file = FakeFile("fake.tbl")
+        pool = BufferPool(capacity=1)
+        pool.fetch(file, 0)
+        with self.assertRaises(RuntimeError):
+            pool.fetch(file, 1)
+        pool.unpin(file, 0)
+        pool.fetch(file, 1)
+        pool.unpin(file, 1)
+        self.assertFalse(pool.is_cached(file, 0))
+
+class TestStorageEngineBufferPool(StorageTestCase):
+    engine_settings = {"buffer_pool_pages": 2}
+
+    def test_table_larger_than_pool(self):
+        storage = StorageEngine()
+        storage.create_database("test_db")
+        storage.create_table("test_db", "numbers", {"id": "INTEGER"}, {})
+        max_record = storage.blocks["test_db"]["numbers"]["max_record"]
+        for i in range(max_record * 5):
+            storage.insert_data("test_db", "numbers", {"id": i}, 1)
+        storage.commit_buffer(1)
+        self.assertLessEqual(len(storage.pool.frames), 2)
+
+        result = storage.read_block(DataRetrieval(["numbers"], ["id"], []), "test_db", -1)
+        self.assertEqual(result.rows_count, max_record * 5)
+        storage.save()
+
+        reloaded = StorageEngine()
+        result = reloaded.read_block(DataRetrieval(["numbers"], ["id"], []), "test_db", -1)
+        self.assertEqual(sorted(row["id"] for row in result.data), list(range(max_record * 5)))
+
+    def test_save_writes_only_dirty_blocks(self):
+        storage = StorageEngine()
+        storage.create_database("test_db")
+        for table in ("numbers", "others"):
+            storage.create_table("test_db", table, {"id": "INTEGER"}, {})
+            max_record = storage.blocks["test_db"][table]["max_record"]
+            for i in range(max_record * 3):
+                storage.insert_data("test_db", table, {"id": i}, 1)
+        storage.commit_buffer(1)
+        storage.save()
+        self.assertEqual(len(storage.pool.dirty), 0)
+
+        catalog_mtime = os.stat("data.dat").st_mtime_ns
+        storage.write_block(DataWrite(["numbers"], ["id"], [Condition("id", "=", 0)], [-1]), "test_db", 2)
+        storage.commit_buffer(2)
+        self.assertEqual(len(storage.pool.dirty), 1, "Only the updated block should be dirty.")
+        self.assertEqual(storage.dirty_tables, {("test_db", "numbers")})
+        storage.save()
+        self.assertEqual(os.stat("data.dat").st_mtime_ns, catalog_mtime, "An unchanged catalog should not be rewritten.")
+
+        reloaded = StorageEngine()
+        result = reloaded.read_block(DataRetrieval(["numbers"], ["id"], [Condition("id", "<", 1)]), "test_db", -1)
+        self.assertEqual(result.data, [{"id": -1}])
+
+if __name__ == '__main__':
+    unittest.main()
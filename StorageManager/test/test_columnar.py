@@ -0,0 +1,67 @@
+import unittest
+from StorageManager.Columnar import ColumnBlock, encode_column_block, decode_column_block
+from StorageManager.classes import StorageEngine, DataRetrieval, DataWrite, DataDeletion, Condition
+from .storage_case import StorageTestCase
+
+class TestColumnBlock(unittest.TestCase):
+    def test_encode_roundtrip(self):
+        columns = ["id", "score", "name", "extra"]
+        kinds = {"id": "int", "score": "float", "name": "str", "extra": "int"}
+        rows = [
+            {"id": 1, "score": 1.5, "name": "Alice", "extra": 7},
+            {"id": 2, "score": None, "name": "Bob", "extra": "tujuh"},
+            {"id": 3, "score": 2, "name": None, "extra": None},
+        ]
+        block = ColumnBlock.from_rows(rows, columns, kinds)
+        self.assertEqual(block.column("id").kind, "int")
+        self.assertEqual(block.column("extra").kind, "object", "Values that do not fit the column type should fall back.")
+
+        decoded = decode_column_block(encode_column_block(block), columns)
+        self.assertEqual(len(decoded), 3)
+        self.assertEqual(list(decoded), [
+            {"id": 1, "score": 1.5, "name": "Alice", "extra": 7},
+            {"id": 2, "score": None, "name": "Bob", "extra": "tujuh"},
+            {"id": 3, "score": 2.0, "name": None, "extra": None},
+        ])
+        self.assertEqual(decoded[1]["name"], "Bob")
+        self.assertEqual(list(decoded.iter_rows({"id"})), [{"id": 1}, {"id": 2}, {"id": 3}])
+
+    def test_evaluate_block(self):
+        rows = [{"id": i, "score": None if i == 2 else i * 1.5, "name": f"user{i}"} for i in range(5)]
+        block = ColumnBlock.from_rows(rows, ["id", "score", "name"], {"id": "int", "score": "float", "name": "str"})
+        mask = Condition.evaluate_block([Condition("id", ">=", 1), Condition("score", "<", 5)], block)
+        self.assertEqual(list(mask), [False, True, False, True, False], "NULL should never satisfy a condition.")
+        mask = Condition.evaluate_block([Condition("id", "=", 0), Condition("name", "=", "user4")], block, any_of=True)
+        self.assertEqual(list(mask), [True, False, False, False, True])
+        self.assertEqual(list(mask), list(Condition.evaluate_block([Condition("id", "=", 0), Condition("name", "=", "user4")], rows, any_of=True)))
+
+class TestColumnarTable(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.storage = StorageEngine()
+        self.storage.create_database("test_db")
+        self.storage.create_table("test_db", "scores", {"id": "INTEGER", "score": "FLOAT", "name": "VARCHAR(20)"}, {}, layout="columnar")
+        for i in range(300):
+            self.storage.insert_data("test_db", "scores", {"id": i, "score": i / 2, "name": f"user{i % 10}"}, 1)
+        self.storage.commit_buffer(1)
+
+    def test_read_write_delete(self):
+        result = self.storage.read_block(DataRetrieval(["scores"], ["id"], [Condition("score", ">=", 149)]), "test_db", -1)
+        self.assertEqual(sorted(row["id"] for row in result.data), [298, 299])
+
+        self.storage.write_block(DataWrite(["scores"], ["name"], [Condition("id", "=", 5)], ["lima"]), "test_db", 2)
+        self.storage.delete_block(DataDeletion("scores", [Condition("id", "<", 5)]), "test_db", 2)
+        self.storage.commit_buffer(2)
+        self.storage.save()
+
+        reloaded = StorageEngine()
+        result = reloaded.read_block(DataRetrieval(["scores"], [], [Condition("id", "<", 6)]), "test_db", -1)
+        self.assertEqual([dict(row) for row in result.data], [{"id": 5, "score": 2.5, "name": "lima"}])
+
+    def test_stats(self):
+        stats = self.storage.get_stats("test_db", "scores")
+        self.assertEqual(stats.n_r, 300)
+        self.assertEqual(stats.V_a_r, {"id": 300, "score": 300, "name": 10})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import os
+import tempfile
+import unittest
+from StorageManager.HeapFile import HeapFile, PageFile, PAGE_SIZE, PAGE_HEADER, FLAG_COMPRESSED
+from StorageManager.classes import StorageEngine, DataRetrieval, DataWrite, Condition
+from .storage_case import StorageTestCase
+
+class TestHeapFile(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "db", "users.tbl")
+        self.heap = HeapFile(self.path, ["id", "name", "score"])
+
+    def tearDown(self):
+        self.heap.close()
+        self.tmpdir.cleanup()
+
+    def test_block_roundtrip(self):
+        block = [{"id": 1, "name": "Alice", "score": 1.5}, {"id": 2**40, "name": "Bob", "score": None}, {"id": 3}]
+        self.heap.write_block(0, block)
+        self.heap.write_block(1, [{"id": 4, "name": "Dave", "score": 2.0}])
+        self.assertEqual(self.heap.n_blocks, 2)
+        self.assertEqual(os.path.getsize(self.path), 2 * PAGE_SIZE, "Each block should occupy exactly one page.")
+        self.assertEqual(self.heap.read_block(0), block)
+        self.assertEqual(self.heap.read_block(1), [{"id": 4, "name": "Dave", "score": 2.0}])
+
+    def test_overflow_block(self):
+        block = [{"id": i, "name": "x" * 500, "score": 0.0} for i in range(20)]
+        self.heap.write_block(0, block)
+        self.assertEqual(self.heap.n_blocks, 1, "Overflow pages should not shift block positions.")
+        self.assertEqual(self.heap.read_block(0), block)
+
+        # menulis ulang block yang lebih kecil harus membebaskan overflow chain lama
+        self.heap.write_block(0, block[:1])
+        self.assertEqual(self.heap.read_block(0), block[:1])
+        self.heap.write_block(0, block)
+        self.assertEqual(self.heap.read_block(0), block)
+
+    def test_truncate(self):
+        for i in range(3):
+            self.heap.write_block(i, [{"id": i}])
+        self.heap.truncate(1)
+        self.assertEqual(self.heap.n_blocks, 1)
+        self.assertEqual(self.heap.read_block(0), [{"id": 0}])
+
+    def test_mapped_reads(self):
+        blocks = [[{"id": 1, "name": "Alice", "score": 1.5}], [{"id": i, "name": "x" * 500} for i in range(20)], []]
+        for block_index, block in enumerate(blocks):
+            self.heap.write_block(block_index, block)
+        with self.heap.map() as mapped:
+            self.assertEqual([mapped.read_block(i) for i in range(3)], blocks)
+
+    def test_compressed_blocks(self):
+        heap = HeapFile(os.path.join(self.tmpdir.name, "db", "logs.tbl"), ["id", "message"], compression="zlib")
+        block = [{"id": i, "message": f"request from user {i % 7} completed"} for i in range(150)]
+        heap.write_block(0, block)
+        heap.write_block(1, [{"id": 1, "message": "x"}])
+        self.assertEqual(heap.overflow.page_count(), 0, "A block that compresses into one page needs no overflow chain.")
+        self.assertTrue(PAGE_HEADER.unpack_from(heap.read_page(0), 0)[1] & FLAG_COMPRESSED)
+        self.assertFalse(PAGE_HEADER.unpack_from(heap.read_page(1), 0)[1] & FLAG_COMPRESSED, "Pages that would grow are stored as is.")
+        self.assertEqual(heap.read_block(0), block)
+        with heap.map() as mapped:
+            self.assertEqual(mapped.read_block(0), block)
+        self.assertGreater(heap.compression_ratio(), 3)
+        heap.close()
+
+class TestMappedScan(StorageTestCase):
+    engine_settings = {"mmap_scan_blocks": 0}
+
+    def test_scan_bypasses_buffer_pool(self):
+        storage = StorageEngine()
+        storage.create_database("test_db")
+        storage.create_table("test_db", "numbers", {"id": "INTEGER"}, {})
+        max_record = storage.blocks["test_db"]["numbers"]["max_record"]
+        for i in range(max_record * 4):
+            storage.insert_data("test_db", "numbers", {"id": i}, 1)
+        storage.commit_buffer(1)
+        storage.save()
+
+        reloaded = StorageEngine()
+        result = reloaded.read_block(DataRetrieval(["numbers"], ["id"], [Condition("id", "<", 2)]), "test_db", -1)
+        self.assertEqual(sorted(row["id"] for row in result.data), [0, 1])
+        self.assertEqual(reloaded.get_stats("test_db", "numbers").n_r, max_record * 4)
+        self.assertEqual(len(reloaded.pool.frames), 0, "Mapped scans should not fill the buffer pool.")
+
+        # block milik workspace transaksi tetap dibaca dari workspace-nya
+        reloaded.write_block(DataWrite(["numbers"], ["id"], [Condition("id", "=", 0)], [-1]), "test_db", 2)
+        result = reloaded.read_block(DataRetrieval(["numbers"], ["id"], [Condition("id", "<", 1)]), "test_db", 2)
+        self.assertEqual(result.data, [{"id": -1}])
+
+    def test_compressed_table(self):
+        storage = StorageEngine()
+        storage.create_database("test_db")
+        storage.create_table("test_db", "plain", {"id": "INTEGER", "city": "VARCHAR(50)"}, {})
+        storage.create_table("test_db", "packed", {"id": "INTEGER", "city": "VARCHAR(50)"}, {}, compression="zlib")
+        self.assertIsInstance(storage.create_table("test_db", "other", {"id": "INTEGER"}, {}, compression="lz4"), Exception)
+        for i in range(2000):
+            storage.insert_data("test_db", "plain", {"id": i, "city": f"kota nomor {i % 20}"}, 1)
+            storage.insert_data("test_db", "packed", {"id": i, "city": f"kota nomor {i % 20}"}, 1)
+        storage.commit_buffer(1)
+        storage.save()
+        plain, packed = storage.blocks["test_db"]["plain"]["n_blocks"], storage.blocks["test_db"]["packed"]["n_blocks"]
+        self.assertLessEqual(packed * StorageEngine.compressed_block_factor, plain + StorageEngine.compressed_block_factor, "Compressed blocks should hold more rows.")
+        self.assertEqual(storage.get_stats("test_db", "plain").compression_ratio, 1.0)
+
+        reloaded = StorageEngine()
+        self.assertGreater(reloaded.get_stats("test_db", "packed").compression_ratio, 2, "The ratio should survive a restart without reading pages.")
+        self.assertEqual(len(reloaded.pool.frames), 0)
+        result = reloaded.read_block(DataRetrieval(["packed"], ["id", "city"], [Condition("id", ">=", 1990)]), "test_db", -1)
+        self.assertEqual(sorted(row["id"] for row in result.data), list(range(1990, 2000)))
+        self.assertEqual(reloaded.get_heap_file("test_db", "packed").overflow.page_count(), 0)
+
+class TestTableBlocks(StorageTestCase):
+    def test_full_blocks_fit_one_page(self):
+        storage = StorageEngine()
+        storage.create_database("test_db")
+        columns = {"id": "INTEGER", "score": "FLOAT", "name": "VARCHAR(30)", "grade": "CHAR"}
+        storage.create_table("test_db", "rows", columns, {})
+        storage.create_table("test_db", "cols", columns, {}, layout="columnar")
+        self.assertIsInstance(storage.create_table("test_db", "other", {"id": "DATE"}, {}), Exception)
+        self.assertNotIn("other", storage.blocks["test_db"])
+        for table_name in ("rows", "cols"):
+            max_record = storage.blocks["test_db"][table_name]["max_record"]
+            for i in range(max_record * 2):
+                storage.insert_data("test_db", table_name, {"id": -2**31 + i, "score": i / 3, "name": "x" * 30, "grade": None if i % 2 else "A"}, 1)
+        storage.commit_buffer(1)
+        storage.save()
+        for table_name in ("rows", "cols"):
+            self.assertEqual(storage.blocks["test_db"][table_name]["n_blocks"], 2)
+            self.assertEqual(storage.get_heap_file("test_db", table_name).overflow.page_count(), 0, "Full blocks should not spill into the overflow file.")
+
+class TestPageFile(unittest.TestCase):
+    def test_allocate_reuses_freed_pages(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pages = PageFile(os.path.join(tmpdir, "pages.ovf"))
+            first = pages.allocate()
+            second = pages.allocate()
+            pages.write(second, b"hello")
+            self.assertEqual(pages.read(second)[0], b"hello")
+            pages.free(first)
+            self.assertEqual(pages.allocate(), first)
+            pages.close()
+
+if __name__ == '__main__':
+    unittest.main()
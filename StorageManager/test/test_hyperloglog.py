@@ -0,0 +1,54 @@
+import pickle
+import unittest
+from StorageManager.HyperLogLog import HyperLogLog
+from StorageManager.TableStats import TableStats
+
+class TestHyperLogLog(unittest.TestCase):
+    def test_estimate(self):
+        sketch = HyperLogLog()
+        sketch.update(f"user{i % 5000}" for i in range(20000))
+        self.assertAlmostEqual(len(sketch), 5000, delta=5000 * 0.05)
+        small = HyperLogLog()
+        small.update([1, 1.0, True, 2, "2"])
+        self.assertEqual(len(small), 3, "Values that are equal as dict keys should count once.")
+        self.assertEqual(pickle.loads(pickle.dumps(sketch)).registers, sketch.registers)
+
+    def test_merge(self):
+        left, right, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        left.update(range(0, 3000))
+        right.update(range(2000, 6000))
+        both.update(range(0, 6000))
+        self.assertEqual((left | right).registers, both.registers, "Merging should equal sketching the union.")
+        self.assertRaises(ValueError, left.merge, HyperLogLog(10))
+
+    def test_table_stats_switch_to_sketches(self):
+        stats = TableStats.from_rows({"id": i, "group": i % 7} for i in range(1000))
+        stats.use_sketches(2000)
+        self.assertIsNone(stats.sketches)
+        stats.use_sketches(1000)
+        self.assertEqual(stats.counts, {})
+        delta = TableStats()
+        for i in range(1000, 1500):
+            delta.add({"id": i, "group": 100})
+        stats.apply(delta)
+        self.assertEqual(stats.n_r, 1500)
+        distinct = stats.distinct(["id", "group", "missing"])
+        self.assertAlmostEqual(distinct["id"], 1500, delta=1500 * 0.05)
+        self.assertEqual(distinct["group"], 8)
+        self.assertEqual(distinct["missing"], 0)
+
+    def test_analyze_uses_sample(self):
+        stats = TableStats.from_rows({"id": i, "group": i % 4} for i in range(20000))
+        stats.use_sketches(1)
+        stats.analyze(({"id": i, "group": i % 4} for i in range(20000)), ["id", "group"], sample_rows=1000)
+        self.assertEqual(len(stats.histograms["id"]), 11)
+        self.assertEqual(stats.histograms["id"], sorted(stats.histograms["id"]))
+        self.assertAlmostEqual(stats.histograms["id"][5], 10000, delta=2000)
+        self.assertEqual(sorted(value for value, frequency in stats.mcv["group"]), [0, 1, 2, 3])
+        for value, frequency in stats.mcv["group"]:
+            self.assertAlmostEqual(frequency, 0.25, delta=0.05)
+        self.assertEqual(stats.mcv["id"], [], "Values seen once in the sample are not common.")
+        self.assertAlmostEqual(stats.distinct(["id"])["id"], 20000, delta=20000 * 0.05, msg="Sketches are rebuilt from every row.")
+
+if __name__ == '__main__':
+    unittest.main()
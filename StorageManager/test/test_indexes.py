@@ -1,6 +1,12 @@
 import unittest
+import os
+import pickle
+import random
+import tempfile
+from unittest import mock
 from StorageManager.Bplus import BPlusTree
-from StorageManager.Hash import HashTable
+from StorageManager.ExternalSort import external_sort
+from StorageManager.Hash import HashTable, BucketStore
 
 class TestBPlusTree(unittest.TestCase):
     def test_insert_and_search(self):
@@ -22,6 +28,49 @@ class TestBPlusTree(unittest.TestCase):
         result = tree.search_range(3,6)
         self.assertEqual(set(result), {3,4,5,6}, "Range search from 3 to 6 should return keys 3,4,5,6.")
 
+    def test_random_inserts_keep_order(self):
+        tree = BPlusTree(order=5)
+        keys = [random.randrange(200) for _ in range(1000)]
+        for position, key in enumerate(keys):
+            tree.insert(key, position)
+        self.assertEqual(tree.search_range(-1, 1000), sorted(range(1000), key=lambda position: keys[position]))
+        self.assertEqual(len(tree.search_range(20.5, 40)), sum(20.5 <= key <= 40 for key in keys))
+        for key in set(keys):
+            self.assertTrue(tree.delete(key))
+        self.assertEqual(tree.search_range(-1, 1000), [])
+        self.assertFalse(hasattr(tree.root, "__dict__"), "Nodes should use __slots__.")
+
+class TestBulkLoad(unittest.TestCase):
+    def test_bulk_load_matches_inserts(self):
+        keys = [random.randrange(300) for _ in range(1000)]
+        entries = external_sort(((key, position) for position, key in enumerate(keys)), key=lambda entry: entry[0], run_size=64)
+        tree = BPlusTree.bulk_load(entries, order=5, fill_factor=0.8)
+        for key in range(300):
+            expected = [position for position, other in enumerate(keys) if other == key]
+            found = tree.search(key)
+            found = [] if found is None else found if isinstance(found, list) else [found]
+            self.assertEqual(found, expected, "Duplicates should keep their scan order.")
+        self.assertEqual(len(tree.search_range(50, 99)), sum(50 <= key <= 99 for key in keys))
+        self.assertEqual(tree.min_key(), min(keys))
+        self.assertEqual(tree.max_key(), max(keys))
+
+        tree.insert(1000, "new")
+        self.assertEqual(tree.search(1000), "new")
+
+    def test_bulk_load_fill_factor(self):
+        packed = BPlusTree.bulk_load(((key, key) for key in range(1000)), order=8)
+        loose = BPlusTree.bulk_load(((key, key) for key in range(1000)), order=8, fill_factor=0.5)
+        self.assertLess(len(packed.store.nodes), len(loose.store.nodes))
+        self.assertEqual(packed.search_range(0, 999), list(range(1000)))
+        self.assertEqual(BPlusTree.bulk_load([], order=4).search(1), None)
+        with self.assertRaises(ValueError):
+            BPlusTree.bulk_load([], fill_factor=0)
+
+    def test_external_sort(self):
+        items = [random.random() for _ in range(1000)]
+        self.assertEqual(list(external_sort(items, run_size=100)), sorted(items))
+        self.assertEqual(list(external_sort(items[:10], run_size=100)), sorted(items[:10]))
+
 class TestHashTable(unittest.TestCase):
     def test_insert_search_delete(self):
         hash_table = HashTable(size=10)
@@ -30,5 +79,47 @@ class TestHashTable(unittest.TestCase):
         hash_table.delete("Alice", (0,0))
         self.assertIsNone(hash_table.search("Alice"), "Should return None after deletion of 'Alice'.")
 
+    def test_buckets_split_as_they_fill(self):
+        hash_table = HashTable(size=1, bucket_capacity=8)
+        for i in range(2000):
+            hash_table.insert(f"key{i}", (i, 0))
+            hash_table.insert(i, (i, 1))
+        self.assertGreaterEqual(hash_table.size, 4000 // 8, "The directory should grow with the table.")
+        buckets = hash_table.store.nodes.values()
+        self.assertTrue(all(len(bucket.keys) <= 8 for bucket in buckets))
+        for i in range(2000):
+            self.assertEqual(hash_table.get(f"key{i}"), [(i, 0)])
+            self.assertEqual(hash_table.get(float(i)), [(i, 1)], "Equal numbers should share a key.")
+        with self.assertRaises(ValueError):
+            hash_table.insert(5, (5, 1))
+        hash_table.remove("key5", (5, 0))
+        self.assertIsNone(hash_table.get("key5"))
+
+    def test_paged_buckets_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            hash_table = HashTable(size=1, bucket_capacity=16, store=BucketStore(os.path.join(directory, "t.hash")))
+            for i in range(500):
+                hash_table.insert(i % 100, i)
+            hash_table.store.flush()
+            reloaded = pickle.loads(pickle.dumps(hash_table))
+            self.assertEqual(reloaded.size, hash_table.size)
+            self.assertEqual(reloaded.get(42), [42, 142, 242, 342, 442])
+            reloaded.store.file.close()
+            hash_table.store.file.close()
+
+    def test_old_fixed_size_table_is_rebuilt(self):
+        hash_table = HashTable.__new__(HashTable)
+        hash_table.__setstate__({"size": 2, "table": [[["b", [(0, 1)]]], [["a", [(0, 0), (1, 0)]]]]})
+        self.assertEqual(hash_table.get("a"), [(0, 0), (1, 0)])
+        self.assertEqual(hash_table.get("b"), [(0, 1)])
+
+    def test_keys_are_hashed_once(self):
+        hash_table = HashTable(size=1, bucket_capacity=4, seed=b"test")
+        with mock.patch.object(hash_table, "hash_function", wraps=hash_table.hash_function) as hash_function:
+            for i in range(1000):
+                hash_table.insert(f"key{i}", i)
+        self.assertEqual(hash_function.call_count, 1000, "Splits should reuse the cached hashes.")
+        self.assertNotEqual(HashTable(seed=b"other").hash_function("key1"), hash_table.hash_function("key1"))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,34 @@
+import pickle
+import unittest
+from StorageManager.Record import Record, Schema
+
+class TestRecord(unittest.TestCase):
+    def setUp(self):
+        self.schema = Schema.of(["id", "name", "score"])
+
+    def test_behaves_like_read_only_dict(self):
+        record = self.schema.record({"id": 1, "name": "Alice"})
+        self.assertEqual(record, {"id": 1, "name": "Alice"}, "Missing columns should not show up as keys.")
+        self.assertNotIn("score", record)
+        self.assertIsNone(record.get("score"))
+        with self.assertRaises(TypeError):
+            record["id"] = 2
+        self.assertEqual(record.replace({"name": "Bob"}), {"id": 1, "name": "Bob"})
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+
+    def test_schemas_are_shared(self):
+        first = self.schema.record({"id": 1, "name": "Alice", "score": 1.0})
+        second = self.schema.record({"id": 2, "name": "Bob", "score": 2.0})
+        self.assertIs(first.prefixed("users.").schema, second.prefixed("users.").schema)
+        self.assertIs(first.project(["score", "id"]).schema, second.project(["score", "id"]).schema)
+        self.assertEqual(list(first.project(["score", "id"]).keys()), ["score", "id"])
+        self.assertEqual(list(first.project(["score", "id"], keep_order=True).keys()), ["id", "score"])
+
+    def test_join(self):
+        left = self.schema.record({"id": 1, "name": "Alice", "score": 1.0})
+        right = Schema.of(["id", "city"]).record({"id": 9, "city": "Bandung"})
+        self.assertEqual(left | right, {"id": 9, "name": "Alice", "score": 1.0, "city": "Bandung"})
+        self.assertEqual(left.join(right, overwrite=False), {"id": 1, "name": "Alice", "score": 1.0, "city": "Bandung"})
+
+if __name__ == '__main__':
+    unittest.main()
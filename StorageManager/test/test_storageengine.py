@@ -1,15 +1,16 @@
+import copy
 import os
 import unittest
-from StorageManager.classes import StorageEngine, DataRetrieval, DataWrite, DataDeletion, Condition
+from unittest import mock
+from StorageManager.classes import StorageEngine, DataRetrieval, DataWrite, DataDeletion, Condition, KeyRange
+from QueryOptimizer.QueryCost import QueryCost
+from QueryOptimizer.QueryOptimizer import QueryOptimizer
+from QueryOptimizer.QueryTree import QueryTree
+from .storage_case import StorageTestCase
 
-class TestStorageEngine(unittest.TestCase):
+class TestStorageEngine(StorageTestCase):
     def setUp(self):
-        # # Ensure no leftover files
-        # if os.path.exists("data.dat"):
-        #     os.remove("data.dat")
-        # if os.path.exists("indexes.dat"):
-        #     os.remove("indexes.dat")
-
+        super().setUp()
         self.storage = StorageEngine()
         
         # Create a test database and table
@@ -85,5 +86,353 @@ class TestStorageEngine(unittest.TestCase):
         for row in result.data:
             self.assertNotEqual(row["id"], 2, "Row with id=2 should be deleted.")
 
+    def test_select_returns_read_only_rows(self):
+        data_retrieval = DataRetrieval(["test_table"], [], [Condition("id", "=", 1)])
+        result = self.storage.read_block(data_retrieval, "test_db", -1)
+        self.assertEqual(result.data[0], {"id": 1, "name": "Alice"})
+        with self.assertRaises(TypeError, msg="Unprojected rows should be read-only views."):
+            result.data[0]["name"] = "Mallory"
+
+    def test_uncommitted_changes_are_isolated(self):
+        condition = Condition("id", "=", 1)
+        self.storage.write_block(DataWrite(["test_table"], ["name"], [condition], ["Eve"]), "test_db", 2)
+
+        committed = self.storage.read_block(DataRetrieval(["test_table"], ["name"], [condition]), "test_db", -1)
+        self.assertEqual(committed.data[0]["name"], "Alice", "Other transactions should not see uncommitted writes.")
+        own = self.storage.read_block(DataRetrieval(["test_table"], ["name"], [condition]), "test_db", 2)
+        self.assertEqual(own.data[0]["name"], "Eve", "A transaction should see its own writes.")
+
+        workspace = self.storage.get_workspace("test_db", "test_table", 2)
+        self.assertEqual(len(workspace.blocks), 1, "Only the modified block should be copied.")
+        self.storage.commit_buffer(2)
+
+    def test_insert_uses_free_space_map(self):
+        max_record = self.storage.blocks["test_db"]["test_table"]["max_record"]
+        for i in range(4, max_record + 1):
+            self.storage.insert_data("test_db", "test_table", {"id": i, "name": "x"}, 3)
+        self.storage.commit_buffer(3)
+        self.assertEqual(self.storage.blocks["test_db"]["test_table"]["n_blocks"], 1)
+        self.assertEqual(self.storage.free_space_map("test_db", "test_table"), set(), "A full block should leave the free-space map.")
+
+        self.storage.insert_data("test_db", "test_table", {"id": max_record + 1, "name": "x"}, 3)
+        self.storage.commit_buffer(3)
+        self.assertEqual(self.storage.free_space_map("test_db", "test_table"), {1})
+
+        self.storage.delete_block(DataDeletion("test_table", [Condition("id", "=", 1)]), "test_db", 3)
+        self.storage.insert_data("test_db", "test_table", {"id": 1, "name": "Alice"}, 3)
+        self.storage.commit_buffer(3)
+        self.assertEqual(self.storage.blocks["test_db"]["test_table"]["n_blocks"], 2)
+
+    def test_stats_are_maintained_incrementally(self):
+        stats = self.storage.get_stats("test_db", "test_table")
+        n_r, distinct_names = stats.n_r, stats.V_a_r["name"]
+
+        self.storage.insert_data("test_db", "test_table", {"id": 100, "name": "Zed"}, 4)
+        self.storage.write_block(DataWrite(["test_table"], ["name"], [Condition("id", "=", 100)], ["Yan"]), "test_db", 4)
+        self.assertEqual(self.storage.get_stats("test_db", "test_table").n_r, n_r, "Uncommitted changes should not be counted.")
+        self.storage.commit_buffer(4)
+
+        misses = self.storage.pool.misses
+        stats = self.storage.get_stats("test_db", "test_table")
+        self.assertEqual(self.storage.pool.misses, misses, "get_stats should not read table blocks.")
+        self.assertEqual(stats.n_r, n_r + 1)
+        self.assertEqual(stats.V_a_r["name"], distinct_names + 1)
+
+        self.storage.delete_block(DataDeletion("test_table", [Condition("id", "=", 100)]), "test_db", 4)
+        self.storage.commit_buffer(4)
+        self.assertEqual(self.storage.get_stats("test_db", "test_table").n_r, n_r)
+        self.assertEqual(self.storage.get_stats("test_db", "test_table").V_a_r["name"], distinct_names)
+
+    def test_analyze(self):
+        for i in range(10, 50):
+            self.storage.insert_data("test_db", "test_table", {"id": i, "name": "Dave" if i % 4 == 0 else f"user{i}"}, 5)
+        self.storage.commit_buffer(5)
+        self.assertEqual(self.storage.analyze("test_db", "test_table"), ["test_table"])
+
+        stats = self.storage.get_stats("test_db", "test_table")
+        histogram = stats.col_histogram["id"]
+        self.assertEqual(histogram, sorted(histogram))
+        self.assertEqual(histogram[-1], max(row["id"] for row in self.storage.iter_rows("test_db", "test_table", -1)))
+        self.assertEqual(stats.col_mcv["name"][0][0], "Dave", "The most common value should come first.")
+        self.assertRaises(ValueError, self.storage.analyze, "test_db", "no_table")
+
+    def test_stats_use_sketches_on_large_tables(self):
+        exact = self.storage.get_stats("test_db", "test_table").V_a_r
+        self.storage.sketch_stats_rows = 1
+        self.storage.insert_data("test_db", "test_table", {"id": 200, "name": "Zed"}, 6)
+        self.storage.commit_buffer(6)
+        self.assertIsNotNone(self.storage.get_table_stats("test_db", "test_table").sketches)
+        self.assertEqual(self.storage.get_stats("test_db", "test_table").V_a_r, {"id": exact["id"] + 1, "name": exact["name"] + 1})
+
+    def test_cursor(self):
+        for i in range(10, 40):
+            self.storage.insert_data("test_db", "test_table", {"id": i, "name": f"user{i}"}, 7)
+        self.storage.commit_buffer(7)
+        expected = self.storage.read_block(DataRetrieval(["test_table"], ["id"], [Condition("id", ">=", 10)]), "test_db", -1).data
+
+        closed = []
+        cursor = self.storage.open_cursor(DataRetrieval(["test_table"], ["id"], [Condition("id", ">=", 10)]), "test_db", -1, on_close=lambda: closed.append(True))
+        self.assertEqual(cursor.fetch(5), expected[:5])
+        self.assertEqual([len(batch) for batch in cursor.batches(10)], [10, 10, 5])
+        self.assertEqual(closed, [True], "The close hook should run once the cursor is exhausted.")
+
+        with self.storage.open_cursor(DataRetrieval(["test_table"], [], []), "test_db", -1) as cursor:
+            next(cursor)
+            self.assertTrue(any(frame.pin_count for frame in self.storage.pool.frames.values()), "An open scan keeps its current page pinned.")
+        self.assertFalse(any(frame.pin_count for frame in self.storage.pool.frames.values()), "Closing the cursor early should unpin the page.")
+        self.assertIsInstance(self.storage.open_cursor(DataRetrieval(["no_table"], [], []), "test_db", -1), Exception)
+
+class TestIndexAccessPath(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.storage = StorageEngine()
+        self.storage.create_database("test_db")
+        self.storage.create_table("test_db", "users", {"id": "INTEGER", "city": "VARCHAR(20)"}, {"id": ["PRIMARY KEY"], "city": []})
+        for i in range(2000):
+            self.storage.insert_data("test_db", "users", {"id": i, "city": f"city{i % 50}"}, 1)
+        self.storage.commit_buffer(1)
+        self.storage.set_index("test_db", "users", "id", 2, "bplus")
+        self.storage.set_index("test_db", "users", "id", 2, "hash")
+        self.storage.commit_buffer(2)
+        self.assertGreater(self.storage.blocks["test_db"]["users"]["n_blocks"], 10)
+
+    def test_choose_access_path(self):
+        plan = self.storage.choose_access_path("test_db", "users", -1, [Condition("id", "=", 5)])
+        self.assertEqual([(kondisi.column, jenis) for kondisi, jenis in plan], [("id", "hash")], "Hash should win for equality.")
+        plan = self.storage.choose_access_path("test_db", "users", -1, [Condition("city", "=", "city1"), Condition("id", "<", 3)])
+        self.assertEqual([(kondisi.column, jenis) for kondisi, jenis in plan], [("id", "bplus")])
+        self.assertIsNone(self.storage.choose_access_path("test_db", "users", -1, [Condition("city", "=", "city1"), Condition("id", "=", 3)], any_of=True))
+        self.assertIsNone(self.storage.choose_access_path("test_db", "users", -1, [Condition("id", ">=", 0)]), "Reading most of the table should scan.")
+
+    def test_bplus_order_fits_page(self):
+        tree = self.storage.indexes["test_db"]["users"]["id"]["bplus"]
+        self.assertTrue(128 <= tree.order <= 256, "Integer keys should give a page-sized fanout.")
+        self.assertEqual(tree.get_bplus_tree_level(), 2)
+        index_file = tree.store.file
+        for page_id in range(2, index_file.page_count()):
+            self.storage.pool.flush(index_file)
+            self.assertEqual(index_file._overflow_head(page_id), -1, "Every node should fit in one page.")
+        stats = self.storage.get_stats("test_db", "users")
+        self.assertEqual(stats.col_bplus_tree_level, {"id": 2})
+        self.assertEqual(stats.col_index, {"id": [1, 1], "city": [0, 0]})
+        self.assertEqual(QueryCost(self.storage.get_stats, "test_db").indexScanKey("users", "users.id"), 6)
+
+        self.storage.set_index("test_db", "users", "id", 3, "bplus", order=8)
+        self.storage.commit_buffer(3)
+        self.assertEqual(self.storage.indexes["test_db"]["users"]["id"]["bplus"].order, 8)
+        self.assertEqual(self.storage.get_stats("test_db", "users").col_bplus_tree_level, {"id": 4})
+        self.assertFalse(os.path.exists(tree.store.path), "The replaced tree's file should be removed.")
+        with self.assertRaises(ValueError):
+            self.storage.set_index("test_db", "users", "id", 4, "hash", order=8)
+
+    def test_point_lookup_reads_one_block(self):
+        heap = self.storage.get_heap_file("test_db", "users")
+        with mock.patch.object(self.storage.pool, "fetch", wraps=self.storage.pool.fetch) as fetch:
+            result = self.storage.read_block(DataRetrieval(["users"], ["city"], [Condition("id", "=", 1234)]), "test_db", -1)
+        self.assertEqual(result.data, [{"city": "city34"}])
+        self.assertEqual(len([call for call in fetch.call_args_list if call.args[0] is heap]), 1, "Only the block holding the key should be read.")
+        result = self.storage.read_block(DataRetrieval(["users"], ["id"], [Condition("id", ">", 1995), Condition("id", "<", 2)]), "test_db", -1)
+        self.assertEqual(sorted(row["id"] for row in result.data), [0, 1, 1996, 1997, 1998, 1999])
+
+    def test_search_bplus_index_returns_every_match(self):
+        self.storage.set_index("test_db", "users", "city", 3, "bplus")
+        self.storage.commit_buffer(3)
+        rows = self.storage.search_bplus_index("test_db", "users", "city", "city7", -1)
+        self.assertEqual(sorted(row["id"] for row in rows), list(range(7, 2000, 50)), "Duplicate keys should return every row.")
+        self.assertEqual(self.storage.search_bplus_index("test_db", "users", "id", 5, -1), [{"id": 5, "city": "city5"}])
+        self.assertIsNone(self.storage.search_bplus_index("test_db", "users", "id", 5000, -1))
+
+    def test_index_mutators_are_buffered(self):
+        hash_index = self.storage.indexes["test_db"]["users"]["id"]["hash"]
+        self.storage.delete_key_value_from_index("test_db", "users", "id", 5, 3)
+        self.storage.update_key_hash_index("test_db", "users", "id", 6, 7000, 3)
+        self.storage.insert_bplus_index("test_db", "users", "id", 7000, 0, 6, 3)
+        self.assertIsNone(self.storage.search_bplus_index("test_db", "users", "id", 5, 3))
+        self.assertIsNone(self.storage.search_hash_index("test_db", "users", "id", 5, 3))
+        self.assertEqual(self.storage.search_hash_index("test_db", "users", "id", 7000, 3), [{"id": 6, "city": "city6"}])
+        self.assertEqual([row["id"] for row in self.storage.search_bplus_index_range("test_db", "users", "id", 3, 4, 7000)][:3], [4, 6, 7])
+        self.assertEqual(self.storage.search_bplus_index_range("test_db", "users", "id", 3, 1999, 7000)[-1], {"id": 6, "city": "city6"})
+        self.assertEqual(self.storage.search_bplus_index("test_db", "users", "id", 5, 4), [{"id": 5, "city": "city5"}], "Other transactions should not see the operations.")
+        self.assertEqual(hash_index.get(5), [(0, 5)], "Operations should only reach the index at commit.")
+        with self.assertRaises(ValueError):
+            self.storage.insert_hash_index("test_db", "users", "id", 7000, 0, 6, 3)
+        with self.assertRaises(ValueError):
+            self.storage.delete_hash_index("test_db", "users", "id", 5, 3)
+
+        self.storage.commit_buffer(3)
+        self.assertNotIn(3, self.storage.index_ops)
+        self.assertIsNone(hash_index.get(5))
+        self.assertIsNone(self.storage.indexes["test_db"]["users"]["id"]["bplus"].search(5))
+        self.assertEqual(hash_index.get(7000), [(0, 6)])
+        self.assertEqual(self.storage.search_bplus_index("test_db", "users", "id", 7000, -1), [{"id": 6, "city": "city6"}])
+
+    def test_write_and_delete_through_index(self):
+        self.assertEqual(self.storage.write_block(DataWrite(["users"], ["city"], [Condition("id", "=", 7), Condition("city", "=", "city7")], ["bandung"]), "test_db", 3), 1)
+        self.assertEqual(self.storage.delete_block(DataDeletion("users", [Condition("id", "<=", 3)]), "test_db", 3), 4)
+        self.storage.commit_buffer(3)
+        result = self.storage.read_block(DataRetrieval(["users"], [], [Condition("city", "=", "bandung")]), "test_db", -1)
+        self.assertEqual(result.data, [{"id": 7, "city": "bandung"}])
+        self.assertEqual(self.storage.get_stats("test_db", "users").n_r, 1996)
+
+    def assert_indexes_match_table(self, storage):
+        positions = {}
+        for block_index, block in enumerate(storage.iter_blocks("test_db", "users", -1)):
+            for offset, record in enumerate(block):
+                positions.setdefault(record["id"], []).append((block_index, offset))
+        indexes = storage.indexes["test_db"]["users"]["id"]
+        for key, expected in positions.items():
+            found = indexes["bplus"].search(key)
+            self.assertEqual(sorted(value[:2] for value in (found if isinstance(found, list) else [found])), expected)
+            self.assertEqual(sorted(indexes["hash"].get(key, [])), expected)
+        self.assertEqual(len(indexes["bplus"].search_range(indexes["bplus"].min_key(), indexes["bplus"].max_key())), sum(map(len, positions.values())))
+
+    def test_indexes_are_maintained_at_commit(self):
+        self.storage.insert_data("test_db", "users", {"id": 5000, "city": "baru"}, 4)
+        self.storage.write_block(DataWrite(["users"], ["id"], [Condition("id", "=", 10)], [10010]), "test_db", 4)
+        self.storage.delete_block(DataDeletion("users", [Condition("id", ">=", 40), Condition("id", "<", 45)]), "test_db", 4)
+        self.assertIsNone(self.storage.indexes["test_db"]["users"]["id"]["hash"].get(5000), "Changes should only reach the index at commit.")
+        self.storage.commit_buffer(4)
+        self.assert_indexes_match_table(self.storage)
+        result = self.storage.read_block(DataRetrieval(["users"], ["city"], [Condition("id", "=", 10010)]), "test_db", -1)
+        self.assertEqual(result.data, [{"city": "city10"}])
+
+        self.storage.save()
+        self.assert_indexes_match_table(StorageEngine())
+
+    def test_pending_index_is_private(self):
+        self.storage.set_index("test_db", "users", "city", 3, "hash")
+        self.assertEqual(list(self.storage.buffer_index[3]["test_db"]["users"]), ["city"], "Only the new index belongs to the transaction.")
+        self.assertTrue(self.storage.is_hash_index_exist("test_db", "users", "city", 3))
+        self.assertTrue(self.storage.is_bplus_index_exist("test_db", "users", "id", 3), "Committed indexes stay visible.")
+        self.assertFalse(self.storage.is_hash_index_exist("test_db", "users", "city", 4))
+        self.assertNotIn("city", self.storage.indexes["test_db"]["users"])
+
+    def test_pending_index_follows_other_commits(self):
+        self.storage.set_index("test_db", "users", "id", 3, "bplus", order=8)
+        self.storage.insert_data("test_db", "users", {"id": 100000, "city": "baru"}, 4)
+        self.storage.delete_block(DataDeletion("users", [Condition("id", "=", 3)]), "test_db", 4)
+        self.storage.commit_buffer(4)
+        self.storage.commit_buffer(3)
+        self.assertEqual(self.storage.indexes["test_db"]["users"]["id"]["bplus"].order, 8)
+        self.assert_indexes_match_table(self.storage)
+        result = self.storage.read_block(DataRetrieval(["users"], ["city"], [Condition("id", ">=", 100000)]), "test_db", -1)
+        self.assertEqual(result.data, [{"city": "baru"}])
+
+    def test_discard_buffer(self):
+        self.storage.set_index("test_db", "users", "city", 3, "bplus")
+        self.storage.set_index("test_db", "users", "city", 3, "hash")
+        paths = [self.storage.buffer_index[3]["test_db"]["users"]["city"][index_type].store.path for index_type in ("bplus", "hash")]
+        self.storage.insert_data("test_db", "users", {"id": 5000, "city": "baru"}, 3)
+        self.storage.delete_bplus_index("test_db", "users", "id", 5, 3)
+        self.storage.discard_buffer(3)
+        for store in (self.storage.buffer, self.storage.buffer_index, self.storage.created_indexes, self.storage.index_ops):
+            self.assertNotIn(3, store)
+        self.assertFalse(any(os.path.exists(path) for path in paths), "Index files of the transaction should be removed.")
+        self.storage.commit_buffer(3)
+        self.assertNotIn("city", self.storage.indexes["test_db"]["users"])
+        self.assertEqual(self.storage.get_stats("test_db", "users").n_r, 2000)
+        self.assert_indexes_match_table(self.storage)
+
+    def test_failed_commit_changes_nothing(self):
+        self.storage.set_index("test_db", "users", "city", 3, "bplus")
+        self.storage.insert_data("test_db", "users", {"id": "abc", "city": "baru"}, 3)
+        with self.assertRaises(ValueError):
+            self.storage.commit_buffer(3)
+        self.assertIn(3, self.storage.buffer)
+        self.assertIn(3, self.storage.buffer_index)
+        self.assertNotIn("city", self.storage.indexes["test_db"]["users"])
+        self.assertEqual(self.storage.get_stats("test_db", "users").n_r, 2000)
+        self.assert_indexes_match_table(self.storage)
+
+    def test_bplus_nodes_are_paged(self):
+        tree = self.storage.indexes["test_db"]["users"]["id"]["bplus"]
+        self.assertTrue(os.path.isfile(tree.store.path))
+        self.assertTrue(os.path.isfile(self.storage.indexes["test_db"]["users"]["id"]["hash"].store.path), "Hash buckets should be paged too.")
+        with self.assertRaises(TypeError):
+            copy.deepcopy(tree)
+        self.storage.save()
+        index_file = type(tree.store.file)
+        with mock.patch.object(index_file, "write_block", autospec=True, side_effect=index_file.write_block) as write_block:
+            self.storage.insert_data("test_db", "users", {"id": 5000, "city": "baru"}, 3)
+            self.storage.commit_buffer(3)
+            self.storage.save()
+        written = {page_id for file, page_id, node in (call.args for call in write_block.call_args_list)}
+        self.assertTrue(written)
+        self.assertLessEqual(len(written), tree.get_bplus_tree_level() + 1, "Only nodes on the modified path should be written.")
+
+        reopened = StorageEngine()
+        tree = reopened.indexes["test_db"]["users"]["id"]["bplus"]
+        self.assertIs(tree.store.pool, reopened.pool)
+        block_index, offset = tree.search(5000)
+        self.assertEqual(reopened.get_value_for_position("test_db", "users", block_index, offset, -1)["city"], "baru")
+        loaded = [frame for frame in reopened.pool.frames.values() if frame.file is tree.store.file]
+        self.assertEqual(len(loaded), tree.get_bplus_tree_level() + 1, "Only the metadata page and the search path should be loaded.")
+
+    def test_composite_index(self):
+        self.storage.set_index("test_db", "users", ["city", "id"], 3, "bplus")
+        self.storage.set_index("test_db", "users", ("city", "id"), 3, "hash")
+        self.storage.commit_buffer(3)
+        self.storage.insert_data("test_db", "users", {"id": 5001, "city": "city1"}, 4)
+        self.storage.commit_buffer(4)
+        self.storage.analyze("test_db", "users")
+        self.assertEqual(self.storage.get_stats("test_db", "users").col_composite_index, {("city", "id"): [1, 1]})
+
+        def plan(*conditions):
+            return [(kondisi.column, jenis) for kondisi, jenis in self.storage.choose_access_path("test_db", "users", -1, list(conditions))]
+        def ids(*conditions):
+            return sorted(row["id"] for row in self.storage.read_block(DataRetrieval(["users"], ["id"], list(conditions), all_of=True), "test_db", -1).data)
+
+        self.assertEqual(plan(Condition("city", "=", "city1"), Condition("id", "=", 51)), [(("city", "id"), "hash")])
+        self.assertEqual(plan(Condition("city", "=", "city1"), Condition("id", ">", 1900)), [(("city", "id"), "bplus")])
+        self.assertEqual(ids(Condition("city", "=", "city1"), Condition("id", ">", 1900)), [1901, 1951, 5001])
+        self.assertEqual(ids(Condition("city", "=", "city1"), Condition("id", "<=", 101)), [1, 51, 101])
+        self.assertEqual(ids(Condition("city", "=", "city1"), Condition("id", "=", 51)), [51])
+        self.assertEqual(ids(Condition("city", ">=", "city9")), [i for i in range(2000) if i % 50 == 9])
+
+        tree = self.storage.indexes["test_db"]["users"][("city", "id")]["bplus"]
+        for conditions, expected in (([Condition("city", "=", "city1")], 41), ([Condition("city", ">", "city8")], 40), ([Condition("city", "<", "city1")], 40)):
+            key_range, _ = KeyRange.from_conditions(("city", "id"), conditions)
+            self.assertEqual(len(tree.search_range(key_range.low, key_range.high)), expected, "Prefix and leading-column ranges should cover exactly their keys.")
+
+    def test_covering_index_only_scan(self):
+        self.storage.set_index("test_db", "users", "id", 3, "bplus", include=["city"])
+        self.storage.commit_buffer(3)
+        self.assertEqual(self.storage.get_stats("test_db", "users").col_index_include, {"id": ["city"]})
+        self.assertEqual(QueryCost(self.storage.get_stats, "test_db").indexOnlyScan("users", "users.id"), 4)
+
+        # the optimizer marks covered queries with the same rule and costs them as index-only scans
+        where = QueryTree("WHERE", "users.id >= 1990")
+        table = QueryTree("TABLE", "users", parent=where)
+        where.childs = [table]
+        QueryOptimizer().determine_scan_type(QueryTree("SELECT", ["users.city"]), [where], "test_db", self.storage.get_stats)
+        self.assertEqual(where.method, "INDEX ONLY SCAN")
+        query_cost = QueryCost(self.storage.get_stats, "test_db")
+        self.assertEqual(query_cost.scanCost("users", where), 4)
+        self.assertEqual(query_cost.calculate_time_cost(where), min(4, query_cost.linearScan("users")))
+        where.val = "users.id >= 1990 OR users.city = 'a'"
+        where.method = "FULL SCAN"
+        QueryOptimizer().determine_scan_type(QueryTree("SELECT", ["users.city"]), [where], "test_db", self.storage.get_stats)
+        self.assertEqual(where.method, "FULL SCAN")
+
+        heap = self.storage.get_heap_file("test_db", "users")
+        conditions = [Condition("id", ">=", 1990), Condition("city", "<>", "city45")]
+        with mock.patch.object(self.storage.pool, "fetch", wraps=self.storage.pool.fetch) as fetch:
+            result = self.storage.read_block(DataRetrieval(["users"], ["city", "id"], conditions, all_of=True), "test_db", -1)
+        self.assertEqual(result.data, [{"city": f"city{i % 50}", "id": i} for i in range(1990, 2000) if i % 50 != 45])
+        self.assertFalse([call for call in fetch.call_args_list if call.args[0] is heap], "A covered query should not read the table.")
+        self.assertIsNone(self.storage.choose_index_only_scan("test_db", "users", -1, {"id", "city"}, [Condition("city", "=", "city1")]), "Rows with a NULL key are not in the tree.")
+
+        # included values follow updates at commit
+        self.storage.write_block(DataWrite(["users"], ["city"], [Condition("id", "=", 1995)], ["bandung"]), "test_db", 4)
+        self.storage.commit_buffer(4)
+        result = self.storage.read_block(DataRetrieval(["users"], ["city"], [Condition("id", "=", 1995)]), "test_db", -1)
+        self.assertEqual(result.data, [{"city": "bandung"}])
+        self.assert_indexes_match_table(self.storage)
+
+        with self.assertRaises(ValueError):
+            self.storage.set_index("test_db", "users", "id", 5, "hash", include=["city"])
+        with self.assertRaises(ValueError):
+            self.storage.set_index("test_db", "users", "city", 5, "bplus", include=["city"])
+
 if __name__ == '__main__':
     unittest.main()